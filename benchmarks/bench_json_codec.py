@@ -0,0 +1,97 @@
+"""
+Benchmark of the JSON work done for a single participant with each available codec backend.
+
+For every valid input file under `data/inputs/valid` it times the three JSON touch points of the pipeline:
+reading the input JSON (Extractor), reading the metadata JSON (MetadataJsonProcessor) and serializing the
+stored result document (Loader). Nothing is written back to the participant directories.
+
+Usage:
+    python -m benchmarks.bench_json_codec [--inputs data/inputs/valid] [--repeat 200]
+"""
+import argparse
+import os
+import time
+from typing import Dict, List
+
+from utils.json_codec import create_codec, JsonCodec
+
+
+def _participant_payloads(inputs_dir: str) -> List[Dict[str, bytes]]:
+    """
+    Collects the raw JSON documents touched by the pipeline for every participant in the inputs directory.
+
+    :param inputs_dir: Directory containing `*_input.json` files.
+    :type inputs_dir: str
+    :return: A list of dictionaries with the raw "input", "metadata" and "result" documents.
+    :rtype: List[Dict[str, bytes]]
+    """
+    stdlib = create_codec("json")
+    payloads = []
+    for name in sorted(os.listdir(inputs_dir)):
+        if not name.endswith("_input.json"):
+            continue
+        with open(os.path.join(inputs_dir, name), "rb") as file:
+            input_bytes = file.read()
+        input_data = stdlib.loads(input_bytes)
+        participant_id = os.path.basename(os.path.normpath(input_data["context_path"]))
+        metadata_path = os.path.join(input_data["context_path"], f"{participant_id}_dna.json")
+        result_path = os.path.join(input_data["results_path"], f"{participant_id}_result.json")
+        if not (os.path.isfile(metadata_path) and os.path.isfile(result_path)):
+            continue
+        with open(metadata_path, "rb") as file:
+            metadata_bytes = file.read()
+        with open(result_path, "rb") as file:
+            result_bytes = file.read()
+        payloads.append({"input": input_bytes, "metadata": metadata_bytes, "result": result_bytes})
+    return payloads
+
+
+def _time_codec(codec: JsonCodec, payloads: List[Dict[str, bytes]], repeat: int) -> float:
+    """
+    Times the per-participant JSON work for a codec.
+
+    :return: The mean time per participant in microseconds.
+    :rtype: float
+    """
+    # Decode the result documents once, the Loader only ever serializes them
+    results = [codec.loads(payload["result"]) for payload in payloads]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload, result in zip(payloads, results):
+            codec.loads(payload["input"])
+            codec.loads(payload["metadata"])
+            codec.dumps(result, indent=True)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(payloads)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codec backends per participant.")
+    parser.add_argument("--inputs", type=str, default=os.path.join("data", "inputs", "valid"),
+                        help="Directory containing valid input JSON files.")
+    parser.add_argument("--repeat", type=int, default=200, help="Number of passes over all participants.")
+    args = parser.parse_args()
+
+    payloads = _participant_payloads(args.inputs)
+    if not payloads:
+        print(f"No participants with metadata and result files found in: {args.inputs}")
+        return
+
+    timings = {}
+    for name in ("json", "orjson"):
+        try:
+            codec = create_codec(name)
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+        timings[name] = _time_codec(codec, payloads, args.repeat)
+        print(f"{name:>8}: {timings[name]:10.1f} us/participant")
+
+    if "json" in timings and "orjson" in timings:
+        saved = timings["json"] - timings["orjson"]
+        print(f"  saving: {saved:10.1f} us/participant ({timings['json'] / timings['orjson']:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Microbenchmarks of the processor kernels over a grid of input sizes.
+
+Each kernel is timed on deterministic random inputs of growing size. For every size the best of several
+repeats is reported as operations per second, and the scaling exponent of the kernel is fitted over the grid
+(the slope of log(time) against log(size): about 1 for a linear kernel, 2 for a quadratic one).
+
+The results are written to a JSON file labelled with an engine name. Alternative implementations of the
+processors (e.g. a compiled engine) can be benchmarked with `--dna-processor` / `--metadata-processor`, which
+take a "module:Class" path like the processor registry, and two result files are compared side by side with
+`--compare`.
+
+Usage:
+    python -m benchmarks.bench_kernels [--quick] [--kernels gc_content,lcs_between_two] [--output kernels.json]
+    python -m benchmarks.bench_kernels --compare python.json other.json
+"""
+import argparse
+import copy
+import gc
+import importlib
+import itertools
+import math
+import platform
+import random
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
+from utils.json_codec import get_codec
+
+# The processor method called by each kernel, and the class whose instance it is called on
+DNA = "dna"
+METADATA = "metadata"
+
+
+class Kernel(NamedTuple):
+    """
+    A processor kernel and the grid of input sizes it is benchmarked on.
+
+    Attributes:
+        name (str): The kernel name used in the results.
+        processor (str): The processor the kernel belongs to, DNA or METADATA.
+        parameter (str): What the input size counts.
+        sizes (Tuple[int, ...]): The input sizes of the full grid.
+        quick_sizes (Tuple[int, ...]): The input sizes of the quick grid.
+        make_args (Callable[[int, random.Random], Tuple]): Returns the arguments of one call for an input size.
+        call (Callable[..., Any]): Calls the kernel on a processor instance with the arguments.
+        mutates (bool): Whether the kernel modifies its arguments, so each call needs fresh ones.
+    """
+    name: str
+    processor: str
+    parameter: str
+    sizes: Tuple[int, ...]
+    quick_sizes: Tuple[int, ...]
+    make_args: Callable[[int, random.Random], Tuple]
+    call: Callable[..., Any]
+    mutates: bool = False
+
+
+def _sequence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices("ACGT", k=length))
+
+
+def _codon_frequencies(n: int, rng: random.Random) -> Tuple:
+    codons = [a + b + c for a in "ACGT" for b in "ACGT" for c in "ACGT"]
+    return [{codon: rng.randint(1, 50) for codon in rng.sample(codons, 40)} for _ in range(n)],
+
+
+def _metadata(n: int, rng: random.Random) -> Tuple:
+    """
+    Returns a valid metadata document with `n` leaf fields, a tenth of them sensitive, in sections of 10.
+    """
+    document: Dict[str, Any] = {"individual_metadata": {"date_of_birth": "1960-05-01", "_name": "Jane Doe"}}
+    for section in range(max(n // 10, 1)):
+        fields = document[f"section_{section}"] = {"nested": {}}
+        for field in range(10):
+            target = fields if field % 2 else fields["nested"]
+            key = f"_field_{field}" if field == 0 else f"field_{field}"
+            target[key] = f"2020-01-{field + 10:02d}" if field % 3 == 0 else f"value {rng.randint(0, 9999)}"
+    return document,
+
+
+def _lcs_among_all(processor: DNASequenceTxtProcessor, sequences: List[str]) -> List:
+    processor.dna_sequences = sequences
+    return processor._longest_common_subsequence_among_all()
+
+
+KERNELS = (
+    Kernel("gc_content", DNA, "sequence length", (1_000, 10_000, 100_000, 1_000_000), (1_000, 10_000),
+           lambda n, rng: (_sequence(rng, n),), lambda processor, sequence: processor._gc_content(sequence)),
+    Kernel("codon_frequency", DNA, "sequence length", (1_000, 10_000, 100_000, 1_000_000), (1_000, 10_000),
+           lambda n, rng: (_sequence(rng, n),), lambda processor, sequence: processor._codon_frequency(sequence)),
+    Kernel("most_frequent_codons", DNA, "codon frequency dictionaries", (10, 100, 1_000, 10_000), (10, 100),
+           _codon_frequencies, lambda processor, freqs: processor._most_frequent_codons(freqs)),
+    Kernel("lcs_between_two", DNA, "sequence length", (50, 100, 200, 400), (25, 50),
+           lambda n, rng: (_sequence(rng, n), _sequence(rng, n)),
+           lambda processor, first, second: processor._lcs_between_two(first, second)),
+    Kernel("lcs_among_all", DNA, "sequences of length 100", (4, 8, 16, 32), (3, 6),
+           lambda n, rng: ([_sequence(rng, 100) for _ in range(n)],), _lcs_among_all),
+    Kernel("traverse_and_check_validations", METADATA, "metadata fields", (100, 1_000, 10_000, 100_000),
+           (100, 1_000), _metadata, lambda processor, data: processor._traverse_and_check_validations(data)),
+    Kernel("remove_sensitive_data", METADATA, "metadata fields", (100, 1_000, 10_000, 100_000), (100, 1_000),
+           _metadata, lambda processor, data: processor._remove_sensitive_data(data), mutates=True),
+)
+
+
+def _load_class(path: str) -> type:
+    """
+    Imports a class from a "module:Class" path.
+    """
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _run_loops(fn: Callable, processor: Any, args: Sequence[Tuple]) -> float:
+    """
+    Calls a kernel once per argument tuple with the garbage collector off and returns the elapsed time.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for call_args in args:
+            fn(processor, *call_args)
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def time_kernel(
+        kernel: Kernel, processor: Any, size: int, seed: int = 0, min_time: float = 0.2,
+        repeat: int = 5) -> Dict[str, float]:
+    """
+    Times a kernel on one input size.
+
+    The number of calls per measurement grows (1, 2, 5, 10, 20, ...) until a measurement takes at least
+    `min_time` seconds, and the best of `repeat` measurements is kept, as `timeit` does.
+
+    :param kernel: The kernel.
+    :type kernel: Kernel
+    :param processor: The processor instance the kernel is called on.
+    :param size: The input size.
+    :type size: int
+    :param seed: The seed of the random inputs. (optional)
+    :type seed: int
+    :param min_time: The minimum duration of a measurement in seconds. (optional)
+    :type min_time: float
+    :param repeat: The number of measurements. (optional)
+    :type repeat: int
+    :return: The size, the number of calls per measurement, the best time per call and the calls per second.
+    :rtype: Dict[str, float]
+    """
+    args = kernel.make_args(size, random.Random(f"{seed}:{kernel.name}:{size}"))
+
+    def measure(loops: int) -> float:
+        # Mutating kernels get a fresh copy of the arguments per call, made outside the timed loop
+        calls = [copy.deepcopy(args) for _ in range(loops)] if kernel.mutates else [args] * loops
+        return _run_loops(kernel.call, processor, calls)
+
+    loops = 1
+    for factor in itertools.cycle((2, 2.5, 2)):
+        elapsed = measure(loops)
+        if elapsed >= min_time:
+            break
+        loops = int(loops * factor)
+    best = min([elapsed] + [measure(loops) for _ in range(repeat - 1)]) / loops
+    return {"size": size, "loops": loops, "seconds_per_op": best, "ops_per_sec": 1 / best if best else math.inf}
+
+
+def scaling_exponent(points: List[Dict[str, float]]) -> Optional[float]:
+    """
+    Fits the exponent k of time ~ size^k over the measured sizes with least squares in log-log space.
+
+    :param points: The measurements returned by `time_kernel`.
+    :type points: List[Dict[str, float]]
+    :return: The scaling exponent, or None with fewer than two sizes.
+    :rtype: float
+    """
+    if len(points) < 2:
+        return None
+    xs = [math.log(point["size"]) for point in points]
+    ys = [math.log(point["seconds_per_op"]) for point in points]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / variance
+
+
+def run_suite(
+        kernels: Sequence[Kernel] = KERNELS, quick: bool = False, engine: str = "python",
+        dna_processor: type = DNASequenceTxtProcessor, metadata_processor: type = MetadataJsonProcessor,
+        seed: int = 0, min_time: float = 0.2, repeat: int = 5, report: Callable[[str], None] = print) -> Dict:
+    """
+    Benchmarks kernels over their grid of input sizes.
+
+    :param kernels: The kernels to benchmark. (optional)
+    :type kernels: Sequence[Kernel]
+    :param quick: Use the small grid of sizes, e.g. for a smoke test. (optional)
+    :type quick: bool
+    :param engine: The label of the benchmarked implementation in the results. (optional)
+    :type engine: str
+    :param dna_processor: The class the DNA kernels are called on. (optional)
+    :type dna_processor: type
+    :param metadata_processor: The class the metadata kernels are called on. (optional)
+    :type metadata_processor: type
+    :param seed: The seed of the random inputs. (optional)
+    :type seed: int
+    :param min_time: The minimum duration of a measurement in seconds. (optional)
+    :type min_time: float
+    :param repeat: The number of measurements per size. (optional)
+    :type repeat: int
+    :param report: Called with a line of progress per measurement. (optional)
+    :type report: Callable[[str], None]
+    :return: The results, as written to the JSON file.
+    :rtype: Dict
+    """
+    processors = {DNA: dna_processor("benchmark"), METADATA: metadata_processor("benchmark")}
+    results = {}
+    for kernel in kernels:
+        points = []
+        for size in kernel.quick_sizes if quick else kernel.sizes:
+            point = time_kernel(kernel, processors[kernel.processor], size, seed, min_time, repeat)
+            points.append(point)
+            report(f"{kernel.name:>32} {size:>9}: {point['ops_per_sec']:14.1f} ops/sec")
+        exponent = scaling_exponent(points)
+        results[kernel.name] = {"parameter": kernel.parameter, "points": points, "scaling_exponent": exponent}
+        if exponent is not None:
+            report(f"{kernel.name:>32}  scaling exponent {exponent:.2f}")
+    return {
+        "engine": engine,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "kernels": results,
+    }
+
+
+def compare(results: List[Dict]) -> str:
+    """
+    Formats benchmark results of several engines side by side, with the speedup of each over the first.
+
+    :param results: The results of each engine, as returned by `run_suite`.
+    :type results: List[Dict]
+    :return: The comparison table.
+    :rtype: str
+    """
+    engines = [result["engine"] for result in results]
+    lines = [f"{'kernel':>32} {'size':>9} " + " ".join(f"{engine:>20}" for engine in engines)]
+    for name, baseline in results[0]["kernels"].items():
+        for index, point in enumerate(baseline["points"]):
+            cells = []
+            for result in results:
+                other = result["kernels"].get(name)
+                matching = [p for p in other["points"] if p["size"] == point["size"]] if other else []
+                if not matching:
+                    cells.append(f"{'-':>20}")
+                    continue
+                ratio = matching[0]["ops_per_sec"] / point["ops_per_sec"]
+                cells.append(f"{matching[0]['ops_per_sec']:>12.1f} ({ratio:4.1f}x)")
+            lines.append(f"{name if index == 0 else '':>32} {point['size']:>9} " + " ".join(cells))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the processor kernels over a grid of input sizes.")
+    parser.add_argument("--kernels", type=str, default=None,
+                        help="Comma separated kernels to run (default: all of "
+                             f"{', '.join(kernel.name for kernel in KERNELS)}).")
+    parser.add_argument("--quick", action="store_true", help="Use a small grid of input sizes.")
+    parser.add_argument("--output", type=str, default="bench_kernels.json", help="The JSON results file.")
+    parser.add_argument("--engine", type=str, default=None,
+                        help="Label of the benchmarked implementation (default: the DNA processor class name).")
+    parser.add_argument("--dna-processor", type=str, default=None,
+                        help="'module:Class' path of an alternative DNA processor to benchmark.")
+    parser.add_argument("--metadata-processor", type=str, default=None,
+                        help="'module:Class' path of an alternative metadata processor to benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random inputs.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per measurement.")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per input size, the best is kept.")
+    parser.add_argument("--compare", type=str, nargs="+", default=None, metavar="RESULTS",
+                        help="Print earlier result files side by side instead of running the benchmarks.")
+    args = parser.parse_args()
+
+    codec = get_codec()
+    if args.compare:
+        print(compare([codec.load_file(path) for path in args.compare]))
+        return
+
+    kernels = KERNELS
+    if args.kernels:
+        names = args.kernels.split(",")
+        unknown = set(names) - {kernel.name for kernel in KERNELS}
+        if unknown:
+            parser.error(f"Unknown kernels: {', '.join(sorted(unknown))}")
+        kernels = [kernel for kernel in KERNELS if kernel.name in names]
+    dna_processor = _load_class(args.dna_processor) if args.dna_processor else DNASequenceTxtProcessor
+    metadata_processor = _load_class(args.metadata_processor) if args.metadata_processor else MetadataJsonProcessor
+
+    results = run_suite(
+        kernels, args.quick, args.engine or dna_processor.__name__, dna_processor, metadata_processor, args.seed,
+        args.min_time, args.repeat)
+    codec.dump_file(results, args.output, indent=True)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
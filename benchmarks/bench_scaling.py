@@ -0,0 +1,192 @@
+"""
+End-to-end throughput and core-scaling benchmark of the ETL pipeline.
+
+It runs `ETLManager.process_many` over a cohort at 1, 2, 4, ... up to N workers and records, for each worker
+count, the participants and megabytes of data files processed per second, the p50/p95/p99 latency of a
+participant (its "total" stage timing, measured in the worker) and the peak resident memory of the parent
+and of the largest worker (or processor pool) process. The report is the scaling curve: throughput, speedup
+and parallel efficiency per worker count.
+
+By default a synthetic cohort is generated in a temporary directory (see `utils.cohort_generator`), so it is
+in the page cache when the runs start. Each worker count runs in a fresh process, so the peak memory of one
+run does not carry over to the next.
+
+Usage:
+    python -m benchmarks.bench_scaling [--participants 2000] [--max-workers 8] [--output scaling.json]
+    python -m benchmarks.bench_scaling --inputs /data/cohort/inputs --workers 1 4 16
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Sequence
+
+from pipeline.counters import BYTES_READ
+from pipeline.etl_manager import ETLManager
+from pipeline.executors import shutdown_executors
+from pipeline.timings import TOTAL
+from utils.cohort_generator import generate_cohort
+from utils.json_codec import get_codec
+
+PERCENTILES = (50, 95, 99)
+
+
+def worker_counts(max_workers: int) -> List[int]:
+    """
+    Returns the powers of two up to `max_workers`, and `max_workers` itself.
+
+    :param max_workers: The largest worker count.
+    :type max_workers: int
+    :return: The worker counts to benchmark, in increasing order.
+    :rtype: List[int]
+    """
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    return counts + [max_workers]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values.
+
+    :param values: The values, in any order.
+    :type values: Sequence[float]
+    :param percent: The percentile, between 0 and 100.
+    :type percent: float
+    :return: The smallest value that at least `percent` percent of the values are less than or equal to.
+    :rtype: float
+    """
+    ordered = sorted(values)
+    rank = max(int(-(-percent * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+def _peak_rss_mb(who: int) -> float:
+    """
+    Returns the peak resident memory of this process or of its largest waited-for child in megabytes.
+    """
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(input_files: List[str], workers: int) -> Dict:
+    """
+    Processes the input files with a number of workers and measures the run. Module level so it can run in
+    a fresh process.
+
+    :param input_files: The input JSON files.
+    :type input_files: List[str]
+    :param workers: The number of worker processes.
+    :type workers: int
+    :return: The measurements of the run.
+    :rtype: Dict
+    """
+    latencies = []
+    bytes_read = 0
+    failed = 0
+    started = time.perf_counter()
+    try:
+        for result in ETLManager().process_many(input_files, workers=workers, ordered=False):
+            if not result.processed:
+                # Skipped participants did no work, only failures are reported
+                failed += not result.ok
+                continue
+            latencies.append(result.timings[TOTAL])
+            bytes_read += result.counters.get(BYTES_READ, 0)
+        elapsed = time.perf_counter() - started
+    finally:
+        # atexit handlers do not run in a multiprocessing child, the shared pools must be shut down here
+        shutdown_executors()
+
+    processed = len(latencies)
+    measured = {
+        "workers": workers,
+        "participants": processed,
+        "failed": failed,
+        "seconds": elapsed,
+        "participants_per_sec": processed / elapsed,
+        "mb_per_sec": bytes_read / 1024 / 1024 / elapsed,
+        "peak_rss_parent_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_rss_worker_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+    for percent in PERCENTILES:
+        measured[f"p{percent}_latency_ms"] = percentile(latencies, percent) * 1000 if latencies else None
+    return measured
+
+
+def run_scaling(input_files: List[str], counts: Sequence[int], report=print) -> Dict:
+    """
+    Runs the pipeline over the input files once per worker count, each run in a fresh process.
+
+    :param input_files: The input JSON files.
+    :type input_files: List[str]
+    :param counts: The worker counts.
+    :type counts: Sequence[int]
+    :param report: Called with each line of the report as the runs complete. (optional)
+    :return: The measurements of each run, with the speedup and efficiency relative to the first run.
+    :rtype: Dict
+    """
+    report(f"{'workers':>7} {'part/s':>9} {'speedup':>7} {'effic.':>6} {'MB/s':>8} "
+           f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>7} {'wkr MB':>7} {'failed':>6}")
+    runs = []
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as runner:
+            measured = runner.submit(run_config, input_files, workers).result()
+        baseline = runs[0] if runs else measured
+        measured["speedup"] = measured["participants_per_sec"] / baseline["participants_per_sec"]
+        measured["efficiency"] = measured["speedup"] * baseline["workers"] / workers
+        runs.append(measured)
+        report(f"{workers:>7} {measured['participants_per_sec']:>9.1f} {measured['speedup']:>6.2f}x "
+               f"{measured['efficiency']:>6.0%} {measured['mb_per_sec']:>8.2f} "
+               + " ".join(f"{measured[f'p{p}_latency_ms'] or 0:>8.1f}" for p in PERCENTILES)
+               + f" {measured['peak_rss_parent_mb']:>7.0f} {measured['peak_rss_worker_mb']:>7.0f}"
+               + f" {measured['failed']:>6}")
+    return {"cpu_count": os.cpu_count(), "inputs": len(input_files), "runs": runs}
+
+
+def _input_files(inputs_dir: str) -> List[str]:
+    return sorted(os.path.join(inputs_dir, name) for name in os.listdir(inputs_dir) if name.endswith(".json"))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure ETL throughput and scaling over worker counts.")
+    parser.add_argument("--inputs", type=str, default=None,
+                        help="Directory of input JSON files to process (default: generate a cohort).")
+    parser.add_argument("--participants", type=int, default=2000, help="Size of the generated cohort.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated cohort.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="Largest worker count; powers of two below it are run too (default: CPU count).")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Explicit worker counts, instead of the powers of two up to --max-workers.")
+    parser.add_argument("--output", type=str, default="bench_scaling.json", help="The JSON results file.")
+    args = parser.parse_args(argv)
+
+    counts = args.workers or worker_counts(args.max_workers)
+    if min(counts) < 1:
+        parser.error("Worker counts must be positive")
+
+    with tempfile.TemporaryDirectory(prefix="etl_cohort_") as cohort_dir:
+        if args.inputs:
+            input_files = _input_files(args.inputs)
+        else:
+            print(f"Generating {args.participants} participants in {cohort_dir}...")
+            input_files = generate_cohort(cohort_dir, args.participants, seed=args.seed,
+                                          workers=max(counts))
+        if not input_files:
+            parser.error(f"No input JSON files found in: {args.inputs}")
+        results = run_scaling(input_files, counts)
+
+    get_codec().dump_file(results, args.output, indent=True)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""
+Differential fuzzing of alternative engines against the reference pure Python implementation.
+
+A fast replacement of the DNA processor, the metadata processor or the JSON codec is only usable if it produces
+exactly the same output as the implementation it replaces. Each target below generates random and adversarial
+inputs (ties, empty lines, whitespace, non-ACGT and lower case bases, lengths not divisible by 3, deeply nested
+JSON, boundary dates and string lengths), runs the reference and the candidate engine on them and compares the
+outcomes: the repr of the returned value, so types and dictionary order count, or the type and message of the
+raised exception.
+
+When an input produces different outcomes it is shrunk to a minimal one that still does, by greedily removing
+parts of strings, lists and dictionaries and simplifying what is left.
+
+Alternative processors are given as "module:Class" paths like the processor registry. Without options every
+installed JSON codec is checked against the standard library one.
+
+Usage:
+    python -m benchmarks.equivalence [--cases 500] [--seed 0]
+    python -m benchmarks.equivalence --dna-processor my_engine:FastDNAProcessor --targets gc_content,lcs_among_all
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from benchmarks.bench_kernels import DNA, METADATA, _load_class
+from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
+from utils.json_codec import StdlibJsonCodec, create_codec
+
+CODEC = "codec"
+
+# Number of times the shrinker may run the engines on a candidate input
+DEFAULT_SHRINK_BUDGET = 2000
+
+
+class Target(NamedTuple):
+    """
+    A code path compared between engines, and how its inputs are generated.
+
+    Attributes:
+        name (str): The target name.
+        engine (str): The kind of engine the target runs on, DNA, METADATA or CODEC.
+        generate (Callable[[random.Random], Tuple]): Returns the arguments of one random call.
+        call (Callable[..., Any]): Runs the target on an engine (a processor class or a codec) with the arguments.
+    """
+    name: str
+    engine: str
+    generate: Callable[[random.Random], Tuple]
+    call: Callable[..., Any]
+
+
+class Mismatch(NamedTuple):
+    """
+    An input on which the candidate engine differs from the reference.
+
+    Attributes:
+        target (str): The target name.
+        case (int): The index of the generated case that first differed.
+        args (Tuple): The shrunk arguments.
+        expected (str): The outcome of the reference engine on the shrunk arguments.
+        actual (str): The outcome of the candidate engine on the shrunk arguments.
+        original_args (Tuple): The generated arguments before shrinking.
+    """
+    target: str
+    case: int
+    args: Tuple
+    expected: str
+    actual: str
+    original_args: Tuple
+
+
+# Input generators
+
+_BASES = ("ACGT", "ACGT", "ACGT", "GC", "ACGTN", "acgtACGT", "ACGTU-X ", "ACGTÅé")
+_CODONS = [a + b + c for a in "ACGT" for b in "ACGT" for c in "ACGT"]
+
+
+def _dna(rng: random.Random, max_length: int = 60) -> str:
+    """
+    Returns a DNA-like string: mostly ACGT, sometimes with other characters, a repeated motif or a length
+    around a multiple of 3.
+    """
+    length = rng.choice((0, 1, 2, 3, 4, 5, rng.randint(0, max_length), 3 * rng.randint(1, max_length // 3)))
+    alphabet = rng.choice(_BASES)
+    if rng.random() < 0.2:
+        motif = "".join(rng.choices(alphabet, k=rng.randint(1, 4)))
+        return (motif * (length // len(motif) + 1))[:length]
+    return "".join(rng.choices(alphabet, k=length))
+
+
+def _sequences(rng: random.Random, max_count: int = 8, max_length: int = 40) -> List[str]:
+    """
+    Returns DNA sequences drawn from a small pool, so duplicates and tied LCS lengths are common.
+    """
+    pool = [_dna(rng, max_length) for _ in range(rng.randint(1, 5))]
+    shared = _dna(rng, 8)
+    if shared and rng.random() < 0.5:
+        pool = [sequence[:len(sequence) // 2] + shared + sequence[len(sequence) // 2:] for sequence in pool]
+    return [rng.choice(pool) for _ in range(rng.randint(0, max_count))]
+
+
+def _codon_frequencies(rng: random.Random) -> Tuple:
+    keys = _CODONS[:rng.randint(1, 64)] + ["AC", "NNN", "acg"]
+    return [{key: rng.randint(1, 4) for key in rng.sample(keys, rng.randint(0, min(8, len(keys))))}
+            for _ in range(rng.randint(0, 5))],
+
+
+def _dna_file(rng: random.Random) -> Tuple:
+    lines = []
+    for sequence in _sequences(rng, max_count=6):
+        lines.append(rng.choice(("", "", " ", "\t")) + sequence + rng.choice(("", "", " ", "\r")))
+        if rng.random() < 0.2:
+            lines.append(rng.choice(("", " ", "\t")))
+    return "\n".join(lines) + rng.choice(("", "\n", "\n\n")),
+
+
+def _date(rng: random.Random) -> str:
+    return rng.choice((
+        "2014-01-01", "2024-12-31", "2013-12-31", "2025-01-01", f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-"
+        f"{rng.randint(1, 28):02d}", "2020-02-30", "2020-1-5", "2020/01/05", "2020-01-05T00:00:00"))
+
+
+def _scalar(rng: random.Random) -> Any:
+    return rng.choice((
+        lambda: _date(rng),
+        lambda: "x" * rng.choice((0, 1, 63, 64, 65)),
+        lambda: "".join(rng.choices("ab _-é中\U0001f600", k=rng.randint(0, 10))),
+        lambda: rng.randint(-2 ** 63, 2 ** 64 - 1),
+        lambda: rng.choice((2 ** 64, -2 ** 63 - 1, 10 ** 30)),
+        lambda: rng.randint(-3, 3),
+        lambda: rng.choice((0.0, -0.0, 0.1, 1e-7, 1.5e300, rng.uniform(-1e6, 1e6))),
+        lambda: rng.choice((True, False, None)),
+    ))()
+
+
+def _key(rng: random.Random) -> str:
+    return rng.choice(("field", "_secret", "_", "name", "date", "date_of_birth", "__x", "a_b", "", "é"))
+
+
+def _json_value(rng: random.Random, depth: int) -> Any:
+    """
+    Returns a random JSON value, nested up to `depth` levels.
+    """
+    kind = rng.random() if depth > 0 else 1.0
+    if kind < 0.3:
+        value = {}
+        for _ in range(rng.randint(0, 4)):
+            key = _key(rng)
+            if key == "date_of_birth":
+                value[key] = rng.choice(("1960-05-01", "2010-05-01", "1960-5-1", "1960-05-01 ", 1960))
+            else:
+                value[key] = _json_value(rng, depth - 1)
+        return value
+    if kind < 0.45:
+        return [_json_value(rng, depth - 1) for _ in range(rng.randint(0, 4))]
+    return _scalar(rng)
+
+
+def _metadata(rng: random.Random) -> Tuple:
+    """
+    Returns a metadata document, sometimes with a chain of nested objects hundreds of levels deep.
+    """
+    document = {"individual_metadata": {"date_of_birth": "1960-05-01"}} if rng.random() < 0.7 else {}
+    for _ in range(rng.randint(0, 4)):
+        document[_key(rng)] = _json_value(rng, rng.randint(0, 5))
+    if rng.random() < 0.1:
+        chain = _scalar(rng)
+        for _ in range(rng.randint(50, 300)):
+            chain = {_key(rng): chain} if rng.random() < 0.7 else [chain]
+        document["deep"] = chain
+    return document,
+
+
+# Target calls, each receiving a processor class or a codec
+
+def _lcs_among_all(processor_class: type, sequences: List[str]) -> List:
+    processor = processor_class("equivalence")
+    processor.dna_sequences = sequences
+    return processor._longest_common_subsequence_among_all()
+
+
+def _process_file(processor_class: type, content: str, suffix: str) -> Any:
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(content)
+        return processor_class(path).process()
+    finally:
+        os.remove(path)
+
+
+def _codec_round_trip(codec: Any, document: Any) -> Tuple:
+    # What the codec reads from a standard JSON document, and the exact bytes it writes, compact and indented
+    return codec.loads(json.dumps(document).encode("utf-8")), codec.dumps(document), codec.dumps(document, True)
+
+
+TARGETS = (
+    Target("gc_content", DNA, lambda rng: (_dna(rng, 300),),
+           lambda cls, sequence: cls("equivalence")._gc_content(sequence)),
+    Target("codon_frequency", DNA, lambda rng: (_dna(rng, 300),),
+           lambda cls, sequence: cls("equivalence")._codon_frequency(sequence)),
+    Target("most_frequent_codons", DNA, _codon_frequencies,
+           lambda cls, freqs: cls("equivalence")._most_frequent_codons(freqs)),
+    Target("lcs_between_two", DNA, lambda rng: tuple(_sequences(rng, max_count=2, max_length=80) + ["", ""])[:2],
+           lambda cls, first, second: cls("equivalence")._lcs_between_two(first, second)),
+    Target("lcs_among_all", DNA, lambda rng: (_sequences(rng),), _lcs_among_all),
+    Target("dna_process", DNA, _dna_file, lambda cls, content: _process_file(cls, content, ".txt")),
+    Target("traverse_and_check_validations", METADATA, _metadata,
+           lambda cls, document: cls("equivalence")._traverse_and_check_validations(document)),
+    Target("remove_sensitive_data", METADATA, _metadata,
+           lambda cls, document: cls("equivalence")._remove_sensitive_data(document)),
+    Target("metadata_process", METADATA, _metadata,
+           lambda cls, document: _process_file(cls, json.dumps(document), ".json")),
+    Target("codec_round_trip", CODEC, _metadata, _codec_round_trip),
+)
+
+REFERENCES = {DNA: DNASequenceTxtProcessor, METADATA: MetadataJsonProcessor, CODEC: StdlibJsonCodec()}
+
+
+def outcome(target: Target, engine: Any, args: Tuple) -> str:
+    """
+    Runs a target on an engine and describes the outcome exactly.
+
+    The arguments are copied first, since some targets modify them.
+
+    :param target: The target.
+    :type target: Target
+    :param engine: The processor class or codec to run the target on.
+    :param args: The arguments.
+    :type args: Tuple
+    :return: The repr of the returned value, or the type and message of the raised exception.
+    :rtype: str
+    """
+    try:
+        return repr(target.call(engine, *copy.deepcopy(args)))
+    except RecursionError:
+        return "raises RecursionError"
+    except Exception as e:
+        return f"raises {type(e).__name__}: {e}"
+
+
+def _nested(value: Any, kind: type) -> Iterator[Any]:
+    """
+    Yields the closest containers of a type nested in a list or dictionary. Replacing a container by one of
+    its nested containers of the same type removes levels of nesting.
+    """
+    for item in value.values() if isinstance(value, dict) else value:
+        if type(item) is kind:
+            yield item
+        elif isinstance(item, (dict, list)):
+            yield from _nested(item, kind)
+
+
+def _shrink_value(value: Any) -> Iterator[Any]:
+    """
+    Yields smaller or simpler variants of a value, the most aggressive first.
+    """
+    if isinstance(value, str):
+        if value:
+            yield ""
+        size = len(value) // 2
+        while size >= 1:
+            for start in range(0, len(value), size):
+                yield value[:start] + value[start + size:]
+            size //= 2
+        for index, char in enumerate(value):
+            if char != "A":
+                yield value[:index] + "A" + value[index + 1:]
+    elif isinstance(value, list):
+        if value:
+            yield []
+        yield from _nested(value, type(value))
+        size = len(value) // 2
+        while size >= 1:
+            for start in range(0, len(value), size):
+                yield value[:start] + value[start + size:]
+            size //= 2
+        for index, item in enumerate(value):
+            for smaller in _shrink_value(item):
+                yield value[:index] + [smaller] + value[index + 1:]
+    elif isinstance(value, dict):
+        if value:
+            yield {}
+        yield from _nested(value, type(value))
+        for key in value:
+            yield {k: v for k, v in value.items() if k != key}
+        for key, item in value.items():
+            for smaller in _shrink_value(item):
+                yield {k: smaller if k == key else v for k, v in value.items()}
+    elif isinstance(value, bool) or value is None:
+        return
+    elif isinstance(value, int):
+        if value:
+            yield 0
+            yield value // 2
+    elif isinstance(value, float):
+        if value:
+            yield 0.0
+            if value != int(value):
+                yield float(int(value))
+
+
+def shrink(args: Tuple, fails: Callable[[Tuple], bool], budget: int = DEFAULT_SHRINK_BUDGET) -> Tuple:
+    """
+    Greedily shrinks failing arguments: the first smaller variant of any argument that still fails replaces
+    it, until no variant fails or the budget runs out.
+
+    :param args: The failing arguments.
+    :type args: Tuple
+    :param fails: Whether arguments still fail.
+    :type fails: Callable[[Tuple], bool]
+    :param budget: The maximum number of calls of `fails`. (optional)
+    :type budget: int
+    :return: The smallest failing arguments found.
+    :rtype: Tuple
+    """
+    improved = True
+    while improved and budget > 0:
+        improved = False
+        for position, value in enumerate(args):
+            for smaller in _shrink_value(value):
+                candidate = args[:position] + (smaller,) + args[position + 1:]
+                budget -= 1
+                if fails(candidate):
+                    args, improved = candidate, True
+                    break
+                if budget <= 0:
+                    return args
+            if improved:
+                break
+    return args
+
+
+def check_target(
+        target: Target, candidate: Any, reference: Any = None, cases: int = 200, seed: int = 0,
+        shrink_budget: int = DEFAULT_SHRINK_BUDGET) -> Optional[Mismatch]:
+    """
+    Compares a candidate engine with the reference on generated inputs of a target.
+
+    :param target: The target.
+    :type target: Target
+    :param candidate: The processor class or codec under test.
+    :param reference: The engine the candidate must match, by default the one in REFERENCES. (optional)
+    :param cases: The number of generated inputs. (optional)
+    :type cases: int
+    :param seed: The seed of the generated inputs. (optional)
+    :type seed: int
+    :param shrink_budget: The maximum number of engine comparisons when shrinking a mismatch. (optional)
+    :type shrink_budget: int
+    :return: The first mismatch, shrunk, or None if the engines agree on every input.
+    :rtype: Optional[Mismatch]
+    """
+    if reference is None:
+        reference = REFERENCES[target.engine]
+
+    def fails(args: Tuple) -> bool:
+        return outcome(target, reference, args) != outcome(target, candidate, args)
+
+    for case in range(cases):
+        args = target.generate(random.Random(f"{seed}:{target.name}:{case}"))
+        if fails(args):
+            shrunk = shrink(args, fails, shrink_budget)
+            return Mismatch(target.name, case, shrunk, outcome(target, reference, shrunk),
+                            outcome(target, candidate, shrunk), args)
+    return None
+
+
+def _abbreviate(text: str, limit: int = 300) -> str:
+    return text if len(text) <= limit else f"{text[:limit // 2]} ... {text[-limit // 2:]} ({len(text)} characters)"
+
+
+def run(engines: Sequence[Tuple[str, Any]], targets: Sequence[Target] = TARGETS, cases: int = 200, seed: int = 0,
+        report: Callable[[str], None] = print) -> List[Mismatch]:
+    """
+    Checks candidate engines on every target of their kind.
+
+    :param engines: The kind (DNA, METADATA or CODEC) and the candidate engine of each engine to check.
+    :type engines: Sequence[Tuple[str, Any]]
+    :param targets: The targets to check. (optional)
+    :type targets: Sequence[Target]
+    :param cases: The number of generated inputs per target. (optional)
+    :type cases: int
+    :param seed: The seed of the generated inputs. (optional)
+    :type seed: int
+    :param report: Called with each line of the report as the targets complete. (optional)
+    :return: The mismatches found, at most one per target and engine.
+    :rtype: List[Mismatch]
+    """
+    mismatches = []
+    for kind, engine in engines:
+        label = getattr(engine, "__name__", None) or type(engine).__name__
+        for target in targets:
+            if target.engine != kind:
+                continue
+            mismatch = check_target(target, engine, cases=cases, seed=seed)
+            if mismatch is None:
+                report(f"{label:>28} {target.name:<32} ok ({cases} cases)")
+                continue
+            mismatches.append(mismatch)
+            report(f"{label:>28} {target.name:<32} MISMATCH at case {mismatch.case}\n"
+                   f"{'':>30}minimal input: {_abbreviate(repr(mismatch.args))}\n"
+                   f"{'':>30}reference:     {_abbreviate(mismatch.expected)}\n"
+                   f"{'':>30}candidate:     {_abbreviate(mismatch.actual)}")
+    return mismatches
+
+
+def _installed_codecs() -> List[Any]:
+    codecs = []
+    for name in ("orjson",):
+        try:
+            codecs.append(create_codec(name))
+        except ImportError:
+            continue
+    return codecs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fuzz alternative engines against the reference implementation.")
+    parser.add_argument("--dna-processor", type=str, default=None,
+                        help="'module:Class' path of an alternative DNA processor to check.")
+    parser.add_argument("--metadata-processor", type=str, default=None,
+                        help="'module:Class' path of an alternative metadata processor to check.")
+    parser.add_argument("--codec", type=str, nargs="*", default=None,
+                        help="JSON codecs to check against the standard library one (default: the installed "
+                             "ones, when no processor is given).")
+    parser.add_argument("--targets", type=str, default=None,
+                        help="Comma separated targets to check (default: all of "
+                             f"{', '.join(target.name for target in TARGETS)}).")
+    parser.add_argument("--cases", type=int, default=500, help="Generated inputs per target.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated inputs.")
+    args = parser.parse_args(argv)
+
+    targets = TARGETS
+    if args.targets:
+        names = args.targets.split(",")
+        unknown = set(names) - {target.name for target in TARGETS}
+        if unknown:
+            parser.error(f"Unknown targets: {', '.join(sorted(unknown))}")
+        targets = [target for target in TARGETS if target.name in names]
+
+    engines = []
+    if args.dna_processor:
+        engines.append((DNA, _load_class(args.dna_processor)))
+    if args.metadata_processor:
+        engines.append((METADATA, _load_class(args.metadata_processor)))
+    if args.codec is not None:
+        engines.extend((CODEC, create_codec(name)) for name in args.codec)
+    elif not engines:
+        engines.extend((CODEC, codec) for codec in _installed_codecs())
+    if not engines:
+        print("No alternative engines to check")
+        return 0
+
+    # The processors log every invalid sequence
+    logging.disable(logging.ERROR)
+    mismatches = run(engines, targets, args.cases, args.seed)
+    print(f"{len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Performance regression gate comparing benchmark timings against a committed baseline.
+
+Timings taken on different machines cannot be compared directly, so every timing is divided by the time of
+a fixed calibration workload measured on the same machine right after the benchmark, which also absorbs
+slower phases of a shared or frequency-scaled machine. The baseline stores these machine-normalized timings,
+and a benchmark fails the gate when its normalized time exceeds the baseline by more than its tolerance. The
+tolerance is stored per benchmark in the baseline, so noisy benchmarks can be given more slack by editing
+the file.
+
+The gate is used by the `perf` pytest marker (see `tests/conftest.py`):
+
+    python -m pytest -m perf --perf                  # check against tests/perf_baseline.json
+    python -m pytest -m perf --perf-update           # rewrite the baseline on this machine
+"""
+import os
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+from utils.json_codec import get_codec
+
+# Allowed slowdown of a benchmark whose baseline does not set its own tolerance
+DEFAULT_TOLERANCE = 0.5
+# Measurements of a benchmark before a slowdown is reported, so one noisy run does not fail the gate
+DEFAULT_ATTEMPTS = 3
+
+
+class PerfRegression(AssertionError):
+    """
+    Raised when a benchmark is slower than its baseline beyond its tolerance.
+    """
+
+
+class PerfResult(NamedTuple):
+    """
+    The comparison of one benchmark with its baseline.
+
+    Attributes:
+        name (str): The benchmark name.
+        relative (float): The benchmark time divided by the calibration time.
+        baseline (float): The relative time recorded in the baseline, None if the benchmark has no baseline.
+        tolerance (float): The allowed slowdown, e.g. 0.3 for 30%.
+    """
+    name: str
+    relative: float
+    baseline: Optional[float]
+    tolerance: float
+
+    @property
+    def ratio(self) -> Optional[float]:
+        return self.relative / self.baseline if self.baseline else None
+
+    @property
+    def regressed(self) -> bool:
+        return self.baseline is not None and self.relative > self.baseline * (1 + self.tolerance)
+
+
+def calibrate(repeat: int = 5) -> float:
+    """
+    Times a fixed pure Python workload of string slicing, comparisons and dictionary updates, the operations
+    the processor kernels spend their time on.
+
+    :param repeat: The number of runs, the fastest is kept. (optional)
+    :type repeat: int
+    :return: The time of the workload in seconds.
+    :rtype: float
+    """
+    sequence = "ACGTTGCAGGCTAACGTA" * 200
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts: Dict[str, int] = {}
+        for _ in range(20):
+            previous = [0] * 65
+            for i in range(0, len(sequence) - 3, 3):
+                codon = sequence[i:i + 3]
+                counts[codon] = counts.get(codon, 0) + 1
+                if codon[0] == "G" or codon[0] == "C":
+                    previous[i % 65] = previous[(i - 1) % 65] + 1
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class PerfGate:
+    """
+    Checks benchmark timings against a baseline file, or records a new baseline.
+
+    Attributes:
+        baseline_path (str): The baseline JSON file.
+        update (bool): Whether timings are recorded into a new baseline instead of checked.
+        calibration (float): The latest calibration time of this machine in seconds.
+        results (Dict[str, PerfResult]): The benchmarks checked or recorded so far.
+
+    Methods:
+        check(name: str, seconds: float, tolerance: float = None) -> PerfResult:
+            Compares a benchmark timing with its baseline, raising PerfRegression if it slowed down.
+        measure(name: str, benchmark: Callable[[], float], tolerance: float = None, attempts: int = 3)
+                -> PerfResult:
+            Runs and checks a benchmark, measuring it again before reporting a slowdown.
+        save() -> None:
+            Writes the recorded timings as the new baseline.
+    """
+
+    def __init__(self, baseline_path: str, update: bool = False, calibration: Optional[float] = None) -> None:
+        """
+        Initializes the PerfGate class.
+
+        :param baseline_path: The baseline JSON file.
+        :type baseline_path: str
+        :param update: Record the timings into a new baseline instead of checking them. (optional)
+        :type update: bool
+        :param calibration: A fixed calibration time, by default the machine is calibrated at each check.
+            (optional)
+        :type calibration: float
+        """
+        self.baseline_path = baseline_path
+        self.update = update
+        self.calibration = calibration
+        self._fixed_calibration = calibration
+        self.results: Dict[str, PerfResult] = {}
+        self._baseline = {}
+        if os.path.exists(baseline_path):
+            self._baseline = get_codec().load_file(baseline_path).get("benchmarks", {})
+
+    def check(self, name: str, seconds: float, tolerance: Optional[float] = None) -> PerfResult:
+        """
+        Compares the time of a benchmark with its baseline after normalizing both for machine speed.
+
+        :param name: The benchmark name.
+        :type name: str
+        :param seconds: The time of one benchmark operation in seconds.
+        :type seconds: float
+        :param tolerance: The allowed slowdown, by default the one in the baseline or DEFAULT_TOLERANCE. (optional)
+        :type tolerance: float
+        :return: The comparison.
+        :rtype: PerfResult
+        :raises PerfRegression: If the benchmark is slower than its baseline beyond the tolerance, or has no
+            baseline.
+        """
+        if self._fixed_calibration is None:
+            self.calibration = calibrate()
+        recorded = self._baseline.get(name, {})
+        if tolerance is None:
+            tolerance = recorded.get("tolerance", DEFAULT_TOLERANCE)
+        result = PerfResult(name, seconds / self.calibration, None if self.update else recorded.get("relative"),
+                            tolerance)
+        self.results[name] = result
+        if self.update:
+            return result
+        if result.baseline is None:
+            raise PerfRegression(f"No baseline for benchmark {name} in {self.baseline_path}, record it with "
+                                 f"--perf-update")
+        if result.regressed:
+            raise PerfRegression(
+                f"{name} is {result.ratio:.2f}x its baseline (tolerance {1 + tolerance:.2f}x): "
+                f"{seconds * 1e6:.1f} us, {result.relative:.3f} calibration units vs {result.baseline:.3f}")
+        return result
+
+    def measure(self, name: str, benchmark: Callable[[], float], tolerance: Optional[float] = None,
+                attempts: int = DEFAULT_ATTEMPTS) -> PerfResult:
+        """
+        Runs a benchmark and checks its time. A slowdown is only reported if every attempt is slow, since a
+        real regression persists while the noise of a shared machine does not. In update mode the median of the
+        attempts is recorded, so the baseline is not set by one unusually fast run.
+
+        :param name: The benchmark name.
+        :type name: str
+        :param benchmark: Runs the benchmark and returns the time of one operation in seconds.
+        :type benchmark: Callable[[], float]
+        :param tolerance: The allowed slowdown, by default the one in the baseline or DEFAULT_TOLERANCE. (optional)
+        :type tolerance: float
+        :param attempts: The number of measurements before a slowdown is reported. (optional)
+        :type attempts: int
+        :return: The comparison of the first attempt within the tolerance, or the median one in update mode.
+        :rtype: PerfResult
+        :raises PerfRegression: If every attempt is slower than the baseline beyond the tolerance, or the
+            benchmark has no baseline.
+        """
+        if self.update:
+            results = sorted((self.check(name, benchmark(), tolerance) for _ in range(attempts)),
+                             key=lambda result: result.relative)
+            self.results[name] = results[len(results) // 2]
+            return self.results[name]
+        for attempt in range(1, attempts + 1):
+            try:
+                return self.check(name, benchmark(), tolerance)
+            except PerfRegression:
+                if attempt == attempts or name not in self._baseline:
+                    raise
+
+    def save(self) -> None:
+        """
+        Writes the timings recorded in update mode as the new baseline, keeping the tolerances of the old one
+        and the benchmarks that were not run.
+        """
+        benchmarks = dict(self._baseline)
+        for name, result in self.results.items():
+            benchmarks[name] = {"relative": round(result.relative, 6), "tolerance": result.tolerance}
+        get_codec().dump_file(
+            {"calibration_seconds": self.calibration, "benchmarks": dict(sorted(benchmarks.items()))},
+            self.baseline_path, indent=True)
@@ -1,12 +1,13 @@
 import sys
-from ui.gui import gui
-from ui.cli import cli
 
 
 def main():
+    # Each mode imports only its own interface, so the CLI starts without loading tkinter
     if len(sys.argv) > 1:
+        from ui.cli import cli
         cli.run()
     else:
+        from ui.gui import gui
         gui.run()
 
 
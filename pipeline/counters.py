@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+# Counter name recorded by the Transformer: the size of the participant's data files
+BYTES_READ = "bytes_read"
+
+# Counter names recorded by the DNA sequence processor
+BASES_SCANNED = "bases_scanned"
+SEQUENCES_SKIPPED = "sequences_skipped"
+PAIRS_COMPARED = "pairs_compared"
+DP_CELLS = "dp_cells"
+PAIRS_PRUNED = "pairs_pruned"
+CACHE_HITS = "cache_hits"
+
+
+class WorkCounters:
+    """
+    Counts of the algorithmic work done while processing a participant, e.g. the DNA bases scanned or the
+    dynamic programming cells evaluated by the LCS search. Together with the stage timings they relate the cost
+    of a participant to the shape of its input.
+
+    Counting is a dictionary update per event, and the hot loops count in bulk (e.g. the cells of a whole pair),
+    so the counters are always on.
+
+    Attributes:
+        counts (Dict[str, int]): The value of each counter, in the order the counters were first seen.
+
+    Methods:
+        add(name: str, amount: int = 1) -> None:
+            Increments a counter.
+        update(counts: Dict[str, int]) -> None:
+            Adds the values of other counters, e.g. those returned by a worker process.
+        as_dict() -> Dict[str, int]:
+            Returns a copy of the counter values.
+    """
+
+    def __init__(self, counts: Optional[Dict[str, int]] = None) -> None:
+        self.counts: Dict[str, int] = dict(counts or {})
+
+    def add(self, name: str, amount: int = 1) -> None:
+        """
+        Increments a counter.
+
+        :param name: The counter name.
+        :type name: str
+        :param amount: The increment. (optional)
+        :type amount: int
+        """
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def update(self, counts: Dict[str, int]) -> None:
+        """
+        Adds the values of other counters.
+
+        :param counts: The values to add, by counter name.
+        :type counts: Dict[str, int]
+        """
+        for name, amount in counts.items():
+            self.add(name, amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        """
+        Returns a copy of the counter values.
+
+        :return: The value of each counter.
+        :rtype: Dict[str, int]
+        """
+        return dict(self.counts)
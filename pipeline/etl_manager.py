@@ -1,8 +1,112 @@
+import logging
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
 from datetime import datetime
-from pipeline.extract import Extractor
-from pipeline.transform import Transformer
-from pipeline.load import Loader
-from typing import Dict
+import os
+from pipeline.extract import AsyncExtractor, Extractor
+from pipeline.processors.file_processor_factory import FileProcessorFactory
+from pipeline.transform import BATCH_EXECUTORS, DEFAULT_EXECUTORS, AsyncTransformer, Transformer
+from pipeline.load import AsyncLoader, Loader
+from pipeline.run_journal import RunJournal
+from pipeline.result_cache import ResultCache
+from pipeline import executors as executor_kinds
+from pipeline.executors import run_in_thread
+from pipeline import tracing
+from pipeline.counters import WorkCounters
+from pipeline.metrics import BatchMetrics
+from pipeline.timings import EXTRACT, LOAD, TOTAL, TRANSFORM, ProgressHook, StageTimings, TimingsHook
+from utils.directory_snapshot import DirectorySnapshot
+from utils.participant_manifest import ParticipantManifest
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Default number of participants an AsyncETLManager processes concurrently
+DEFAULT_MAX_CONCURRENCY = 256
+
+
+class ETLResult(NamedTuple):
+    """
+    The outcome of processing one input file in a batch.
+
+    Attributes:
+        input_file (str): The input JSON file.
+        ok (bool): Whether the ETL process succeeded (or the participant was skipped as unchanged).
+        processed (bool): Whether the participant was processed, False if it failed or was skipped.
+        error (str): The error message if the ETL process failed, otherwise None.
+        error_type (str): The name of the exception type if the ETL process failed, otherwise None.
+        participant_id (str): The participant ID if the participant was processed, otherwise None.
+        timings (Dict[str, float]): The stage timings in seconds if the participant was processed, otherwise None.
+        counters (Dict[str, int]): The work counters if the participant was processed, otherwise None.
+    """
+    input_file: str
+    ok: bool
+    processed: bool
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    participant_id: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+    counters: Optional[Dict[str, int]] = None
+
+
+class _ParticipantRun:
+    """
+    The state of one input file going through the ETL process, shared by the stages of the sync and async
+    managers. It is local to each call, so an AsyncETLManager can process many participants at once.
+
+    Attributes:
+        input_data_file (str): The input JSON file.
+        participant_id (str): The participant ID once the participant was processed, otherwise None.
+        timings (StageTimings): The stage timings of the participant.
+        counters (WorkCounters): The work counters of the participant.
+        start_time (str): The start time of the ETL process in ISO format.
+        started (float): The start of the ETL process on the monotonic clock.
+    """
+
+    def __init__(self, input_data_file: str) -> None:
+        """
+        Starts the run of an input file.
+
+        :param input_data_file: The input JSON file.
+        :type input_data_file: str
+        """
+        self.input_data_file = input_data_file
+        self.participant_id = None
+        self.timings = StageTimings()
+        self.counters = WorkCounters()
+        self.start_time = datetime.now().isoformat()
+        self.started = time.perf_counter()
+
+
+# The manager of the current worker process and the options it was built from, reused across batch items
+_worker_manager = None
+_worker_options = None
+
+
+def _process_in_worker(input_data_file: str, options: Dict) -> Tuple[ETLResult, List[Dict]]:
+    """
+    Processes one input file in a batch worker process. Module level so it can be sent to worker processes.
+
+    The worker builds its own manager from picklable options (the manifest and cache are reopened from their
+    paths) once and reuses it for every item it receives.
+
+    :param input_data_file: The input JSON file.
+    :type input_data_file: str
+    :param options: The options returned by `ETLManager._worker_options()`.
+    :type options: Dict
+    :return: The outcome of the ETL process, and the trace events of the worker if tracing is on.
+    :rtype: Tuple[ETLResult, List[Dict]]
+    """
+    global _worker_manager, _worker_options
+    if _worker_manager is None or _worker_options != options:
+        manifest = ParticipantManifest(options["manifest_path"]) if options["manifest_path"] else None
+        cache = ResultCache(options["cache_dir"], options["cache_max_bytes"]) if options["cache_dir"] else None
+        _worker_manager = ETLManager(
+            manifest, options["incremental"], options["executors"], cache, options["include_timings"],
+            include_counters=options["include_counters"], profile_dir=options["profile_dir"])
+        _worker_options = options
+    with tracing.collect(options["trace"]) as events:
+        result = _worker_manager._process_item(input_data_file)
+    return result, events
 
 
 class ETLManager:
@@ -17,76 +121,482 @@ class ETLManager:
         extractor (Extractor): An instance of the Extractor class used for extracting files and participant ID.
         transformer (Transformer): An instance of the Transformer class used for transforming the extracted data.
         loader (Loader): An instance of the Loader class used for loading the processed data into an output file.
+        manifest (ParticipantManifest): An optional participant manifest used to skip listing unchanged
+        participant directories.
+        incremental (bool): Whether to skip participants whose inputs did not change since their result was written.
+        executors (Dict[str, str]): The executor kind per file extension passed to the Transformer.
+        cache (ResultCache): An optional cache of processor outputs passed to the Transformer.
+        include_timings (bool): Whether the stage timings are included in the output metadata.
+        include_counters (bool): Whether the work counters are included in the output metadata.
+        hooks (List[TimingsHook]): Callbacks receiving the participant ID and stage timings of each processed
+        participant.
+        metrics (BatchMetrics): Optional batch metrics recording the outcome of each input file.
+        progress (ProgressHook): An optional callback receiving the input file and each top-level stage as it starts.
+        participant_id (str): The ID of the last processed participant.
+        timings (StageTimings): The stage timings of the last processed participant.
+        counters (WorkCounters): The work counters of the last processed participant.
 
     Methods:
-        process(input_data_file: str) -> None:
+        process(input_data_file: str) -> bool:
             Executes the ETL process: validates input data, extracts files, transforms the data, and loads
-            the results.
+            the results. Returns False if the participant was skipped as unchanged.
+
+        process_many(input_data_files: Iterable[str], workers: int = None, ordered: bool = True,
+        max_in_flight: int = None, pool: Executor = None) -> Iterator[ETLResult]:
+            Executes the ETL process for many input files on a pool of worker processes, yielding one result
+            per input file.
 
         _create_result_dictionary(input_data: Dict, processed_results: Dict, start_time: datetime,
         end_time: datetime) -> Dict:
             Creates a dictionary containing metadata and the processed results to be saved to an output file.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+            self, manifest: Optional[ParticipantManifest] = None, incremental: bool = False,
+            executors: Optional[Dict[str, str]] = None, cache: Optional[ResultCache] = None,
+            include_timings: bool = False, hooks: Optional[List[TimingsHook]] = None,
+            include_counters: bool = False, profile_dir: Optional[str] = None,
+            metrics: Optional[BatchMetrics] = None, progress: Optional[ProgressHook] = None) -> None:
         """
-        Initializes the ETLManager class with the provided input data file for the ETL process.
+        Initializes the ETLManager class.
 
-        :param input_data_file: A string containing the path to the input data file (JSON format).
-        :type input_data_file: str
+        :param manifest: A participant manifest to query for directory listings instead of scanning. (optional)
+        :type manifest: ParticipantManifest
+        :param incremental: Skip participants whose input fingerprint matches the run journal next to
+            their results. (optional)
+        :type incremental: bool
+        :param executors: The executor kind ("serial", "thread" or "process") per file extension used by the
+            Transformer, by default `DEFAULT_EXECUTORS`, which starts no worker process. (optional)
+        :type executors: Dict[str, str]
+        :param cache: A cache of processor outputs keyed by file content hash, used by the Transformer. (optional)
+        :type cache: ResultCache
+        :param include_timings: Include the stage timings in the "timings" entry of the output metadata. The
+            load stage is still running when the output is serialized, so only the stages before it are included.
+            (optional)
+        :type include_timings: bool
+        :param hooks: Callbacks called with the participant ID and the stage timings (in seconds) once a
+            participant is processed, e.g. to feed a monitoring system. (optional)
+        :type hooks: List[TimingsHook]
+        :param include_counters: Include the work counters of the processors (see `pipeline.counters`) in the
+            "counters" entry of the output metadata. (optional)
+        :type include_counters: bool
+        :param profile_dir: Profile each participant with cProfile and tracemalloc and write the profiles to this
+            directory (see `pipeline.profiling`). Processors then run serially, so the profiler sees them. (optional)
+        :type profile_dir: str
+        :param metrics: Batch metrics recording the outcome of each input file, written periodically to a
+            textfile (see `pipeline.metrics`). (optional)
+        :type metrics: BatchMetrics
+        :param progress: A callback called with the input file and the stage name as each top-level stage
+            ("extract", "transform", "load") of `process` starts, e.g. to display live progress. Unlike the
+            hooks, an error raised by the callback fails the participant, so a caller can abort a participant
+            between two stages. It is not called in the worker processes of `process_many`. (optional)
+        :type progress: ProgressHook
         """
         self.extractor = None
         self.transformer = None
         self.loader = None
+        self.manifest = manifest
+        self.incremental = incremental
+        self.executors = executors
+        self.cache = cache
+        self.include_timings = include_timings
+        self.hooks = list(hooks or [])
+        self.participant_id = None
+        self.timings = StageTimings()
+        self.include_counters = include_counters
+        self.counters = WorkCounters()
+        self.profile_dir = profile_dir
+        self._profiler = None
+        self.metrics = metrics
+        self.progress = progress
+        if profile_dir is not None:
+            self.executors = self._serial_executors()
 
-    def process(self, input_data_file: str) -> None:
+    def process(self, input_data_file: str) -> bool:
         """
         Orchestrates the ETL process: extraction, transformation, and loading.
 
         This method extracts the necessary files and participant ID, transforms the data, creates a result
         dictionary, and then loads the results into an output file. The start and end times of the process are
-        also recorded.
+        also recorded, as well as the duration of each stage with a monotonic clock (see `pipeline.timings`).
+
+        In incremental mode the fingerprint of the participant's inputs is compared with the run journal
+        next to the results, and the participant is skipped if it did not change since its result was written.
 
         :param input_data_file: The file containing the input data (JSON format) for the extraction process.
         :type input_data_file: str
+        :return: True if the participant was processed, False if it was skipped as unchanged.
+        :rtype: bool
 
         :raises FileNotFoundError: If a required file during extraction or loading cannot be found.
         :raises ValueError: If the input data is invalid or cannot be processed.
         :raises RuntimeError: If an unexpected error occurs during the ETL process.
         """
+        return self._process_run(input_data_file)[1]
+
+    def _process_run(self, input_data_file: str) -> Tuple["_ParticipantRun", bool]:
+        """
+        Runs the ETL process of one input file and records its outcome, see `process`.
+
+        :return: The state of the participant's run, and whether the participant was processed.
+        :rtype: Tuple[_ParticipantRun, bool]
+        """
+        run = _ParticipantRun(input_data_file)
+        self.participant_id = None
+        self.timings = run.timings
+        self.counters = run.counters
         try:
-            # Capture the start time before processing
-            start_time = datetime.now().isoformat()
+            if self.profile_dir is None:
+                processed = self._process(run)
+            else:
+                # cProfile and tracemalloc are only loaded in profile mode, they slow down the start of every run
+                from pipeline.profiling import ParticipantProfiler
+                # Profile files are named after the input file
+                name = os.path.splitext(os.path.basename(input_data_file))[0]
+                with ParticipantProfiler(self.profile_dir, name) as self._profiler:
+                    try:
+                        processed = self._process(run)
+                    finally:
+                        self._profiler = None
+        except Exception as e:
+            self._record(self._failed(input_data_file, e))
+            raise
+        self.participant_id = run.participant_id
+        self.counters = run.counters
+        self._record(self._result(run, processed))
+        return run, processed
+
+    def _process(self, run: "_ParticipantRun") -> bool:
+        """
+        Runs the stages of the ETL process of one input file, see `process`.
+        """
+        input_data_file = run.input_data_file
+        with tracing.span("participant", input_file=input_data_file) as span:
+            try:
+                # Step 1: Extract files and the participant ID, reusing the manifest listing when it is current
+                with self._stage(run, EXTRACT):
+                    snapshot = self._snapshot(input_data_file)
+                    self.extractor = Extractor(input_data_file, snapshot=snapshot)
+                    files_list, participant_id, input_data = self.extractor.extract()
+                run.timings.update(self.extractor.timings.as_dict())
+                self._check_required_types(files_list, input_data)
+                result_file_path = self._result_file_path(input_data, participant_id)
+
+                # Skip the participant if its inputs did not change since the last recorded run
+                journal = fingerprint = None
+                if self.incremental:
+                    journal, fingerprint, current = self._check_journal(
+                        input_data_file, input_data, files_list, participant_id, result_file_path,
+                        self._file_hashes(input_data, snapshot))
+                    if current:
+                        span.set(participant_id=participant_id, skipped=True)
+                        return False
+
+                # Step 2: Transform the data
+                with self._stage(run, TRANSFORM):
+                    self.transformer = Transformer(
+                        files_list, input_data, self.executors, self.cache, self.extractor.snapshot)
+                    processed_results = self.transformer.transform()
 
-            # Step 1: Extract files and the participant ID
-            self.extractor = Extractor(input_data_file)
-            files_list, participant_id, input_data = self.extractor.extract()
+                # Step 3: Create the final result dictionary
+                final_output = self._final_output(run, self.transformer, input_data, participant_id, processed_results)
 
-            # Step 2: Transform the data
-            self.transformer = Transformer(files_list, input_data)
-            processed_results = self.transformer.transform()
+                # Step 4: Load the results
+                with self._stage(run, LOAD):
+                    self.loader = Loader(input_data["results_path"])
+                    self.loader.load(final_output, result_file_path)
+                run.timings.update(self.loader.timings.as_dict())
 
-            # Capture the end time after processing
-            end_time = datetime.now().isoformat()
+                # Record the completed participant only once its result file is in place
+                if journal is not None:
+                    journal.record(participant_id, fingerprint, result_file_path)
 
-            # Step 3: Create the final result dictionary
-            final_output = self._create_result_dictionary(
-                input_data, participant_id, processed_results, start_time, end_time
-            )
+            except Exception as e:
+                raise self._failure(e)
+            span.set(participant_id=participant_id)
 
-            # Define result file path
-            result_file_path = input_data["results_path"] + f"/{participant_id}_result.json"
+        self._finish(run, participant_id)
+        return True
+
+    def process_many(
+            self, input_data_files: Iterable[str], workers: Optional[int] = None, ordered: bool = True,
+            max_in_flight: Optional[int] = None, pool: Optional[Executor] = None) -> Iterator[ETLResult]:
+        """
+        Executes the ETL process for many input files on a pool of worker processes.
 
-            # Step 4: Load the results
-            self.loader = Loader(input_data["results_path"])
-            self.loader.load(final_output, result_file_path)
+        The input files are consumed lazily and at most `max_in_flight` of them are submitted at a time, so
+        very large batches (or generators of input files) do not build up an unbounded queue of work. A failing
+        input file does not stop the batch: its error is reported in its result.
 
-        except FileNotFoundError as e:
-            raise FileNotFoundError(f"ETL process failed: {e}")
-        except ValueError as e:
-            raise ValueError(f"ETL process failed: {e}")
+        Each worker processes whole participants and runs the file processors in its own process, so the
+        Transformer does not start nested pools. With a single worker, the input files are processed in the
+        calling process with this manager's executors.
+
+        :param input_data_files: The input JSON files to process.
+        :type input_data_files: Iterable[str]
+        :param workers: The number of worker processes, by default the number of CPUs. (optional)
+        :type workers: int
+        :param ordered: Yield the results in input order if True, otherwise as soon as they complete. (optional)
+        :type ordered: bool
+        :param max_in_flight: The maximum number of submitted but not yet yielded input files, by default twice
+            the number of workers. (optional)
+        :type max_in_flight: int
+        :param pool: A running pool of `workers` worker processes to submit to instead of starting one, e.g. kept
+            warm across batches by a long-running service. It is left running. (optional)
+        :type pool: Executor
+        :return: An iterator of the outcome of each input file.
+        :rtype: Iterator[ETLResult]
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive: {workers}")
+        if workers == 1 and pool is None:
+            for input_data_file in input_data_files:
+                yield self._process_item(input_data_file)
+            return
+
+        max_in_flight = max(max_in_flight or 2 * workers, 1)
+        if pool is not None:
+            yield from self._process_in_pool(pool, input_data_files, ordered, max_in_flight)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from self._process_in_pool(pool, input_data_files, ordered, max_in_flight)
+
+    def _process_in_pool(
+            self, pool: Executor, input_data_files: Iterable[str], ordered: bool,
+            max_in_flight: int) -> Iterator[ETLResult]:
+        """
+        Processes input files on a pool of worker processes, see `process_many`. Closing the iterator cancels
+        the inputs not started yet and waits for the running ones.
+        """
+        options = self._worker_options()
+        pending_items = enumerate(input_data_files)
+        in_flight = {}
+        # Results that completed ahead of an earlier input file, by input position
+        completed = {}
+        next_index = 0
+
+        try:
+            while True:
+                # Top up the pool, counting results held back for ordering against the in-flight limit
+                while len(in_flight) + len(completed) < max_in_flight:
+                    item = next(pending_items, None)
+                    if item is None:
+                        break
+                    index, input_data_file = item
+                    in_flight[pool.submit(_process_in_worker, input_data_file, options)] = (index, input_data_file)
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, input_data_file = in_flight.pop(future)
+                    try:
+                        result, events = future.result()
+                        tracing.add_events(events)
+                    except Exception as e:
+                        # The worker itself failed, e.g. it was killed or the pool broke
+                        result = ETLResult(input_data_file, False, False, f"ETL process failed: {e}", type(e).__name__)
+                    # Workers have no hooks or metrics, they are fed here with what the worker returned
+                    if result.processed:
+                        self._run_hooks(result.participant_id, result.timings)
+                    self._record(result)
+                    if ordered:
+                        completed[index] = result
+                    else:
+                        yield result
+
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            # The consumer stopped early: skip the inputs not started and wait for the running ones, so what they
+            # read (e.g. temporary input files) can be removed once the iterator is closed
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+
+    def _process_item(self, input_data_file: str) -> ETLResult:
+        """
+        Executes the ETL process for one input file of a batch, capturing its error instead of raising it.
+
+        :param input_data_file: The input JSON file.
+        :type input_data_file: str
+        :return: The outcome of the ETL process.
+        :rtype: ETLResult
+        """
+        try:
+            run, processed = self._process_run(input_data_file)
         except Exception as e:
-            raise RuntimeError(f"ETL process failed: {e}")
+            return self._failed(input_data_file, e)
+        return self._result(run, processed)
+
+    @staticmethod
+    def _result(run: "_ParticipantRun", processed: bool) -> ETLResult:
+        """
+        Returns the outcome of an input file that was processed or skipped.
+        """
+        if not processed:
+            return ETLResult(run.input_data_file, True, False)
+        return ETLResult(
+            run.input_data_file, True, True, participant_id=run.participant_id, timings=run.timings.as_dict(),
+            counters=run.counters.as_dict())
+
+    @staticmethod
+    def _failed(input_data_file: str, error: Exception) -> ETLResult:
+        """
+        Returns the outcome of an input file whose ETL process failed.
+        """
+        return ETLResult(input_data_file, False, False, str(error), type(error).__name__)
+
+    def _record(self, result: ETLResult) -> None:
+        """
+        Records the outcome of an input file in the batch metrics, if any.
+        """
+        if self.metrics is not None:
+            self.metrics.record(result)
+
+    def _run_hooks(self, participant_id: str, stage_timings: Dict[str, float]) -> None:
+        """
+        Calls the timing hooks of a processed participant. A failing hook is logged and does not fail the participant.
+        """
+        for hook in self.hooks:
+            try:
+                hook(participant_id, stage_timings)
+            except Exception as e:
+                logging.error(f"Timing hook {hook!r} failed for participant {participant_id}: {e}")
+
+    @contextmanager
+    def _stage(self, run: "_ParticipantRun", name: str) -> Iterator[None]:
+        """
+        Reports the start of a stage of the ETL process and measures it, and profiles its memory in profile mode.
+        """
+        if self.progress is not None:
+            self.progress(run.input_data_file, name)
+        with run.timings.measure(name):
+            if self._profiler is None:
+                yield
+            else:
+                with self._profiler.stage(name):
+                    yield
+
+    def _snapshot(self, input_data_file: str) -> Optional[DirectorySnapshot]:
+        """
+        Returns the manifest listing of the participant directory of an input file, or None if it is not current.
+        """
+        return self.manifest.snapshot_for_input(input_data_file) if self.manifest else None
+
+    def _file_hashes(self, input_data: Dict, snapshot: Optional[DirectorySnapshot]) -> Optional[Dict[str, str]]:
+        """
+        Returns the content hashes the manifest recorded for the participant files, if the listing came from it.
+        """
+        return self.manifest.file_hashes(input_data["context_path"]) if snapshot else None
+
+    @staticmethod
+    def _check_required_types(files_list: List[str], input_data: Dict) -> None:
+        """
+        Checks that the participant has a file of every built-in type, before any of them is processed.
+
+        :raises ValueError: If a required file type has no file in the context directory.
+        """
+        extensions = {file.split(".")[-1].lower() for file in files_list}
+        missing = [file_type for file_type in FileProcessorFactory.required_types() if file_type not in extensions]
+        if missing:
+            raise ValueError(
+                f"No {', '.join(f'.{file_type}' for file_type in missing)} file in the context_path directory: "
+                f"{input_data['context_path']}")
+
+    @staticmethod
+    def _result_file_path(input_data: Dict, participant_id: str) -> str:
+        """
+        Returns the path of the result file of a participant.
+        """
+        return input_data["results_path"] + f"/{participant_id}_result.json"
+
+    def _final_output(
+            self, run: "_ParticipantRun", transformer: Transformer, input_data: Dict, participant_id: str,
+            processed_results: Dict) -> Dict:
+        """
+        Collects the timings and counters of the transform stage and creates the result dictionary, with the
+        timings and counters in its metadata if they are included.
+        """
+        run.timings.update(transformer.timings.as_dict())
+        run.counters = transformer.counters
+        end_time = datetime.now().isoformat()
+        final_output = self._create_result_dictionary(
+            input_data, participant_id, processed_results, run.start_time, end_time
+        )
+        if self.include_timings:
+            final_output["metadata"]["timings"] = run.timings.as_dict()
+        if self.include_counters:
+            final_output["metadata"]["counters"] = run.counters.as_dict()
+        return final_output
+
+    def _finish(self, run: "_ParticipantRun", participant_id: str) -> None:
+        """
+        Completes the run of a processed participant: records its total duration and calls the timing hooks.
+        """
+        run.participant_id = participant_id
+        run.timings.add(TOTAL, time.perf_counter() - run.started)
+        self._run_hooks(participant_id, run.timings.as_dict())
+
+    def _serial_executors(self) -> Dict[str, str]:
+        """
+        Returns executors that run the processor of every known file type serially in the calling thread.
+        """
+        serial_executors = {extension: executor_kinds.SERIAL for extension in DEFAULT_EXECUTORS}
+        serial_executors.update({extension: executor_kinds.SERIAL for extension in self.executors or {}})
+        return serial_executors
+
+    def _worker_options(self) -> Dict:
+        """
+        Returns picklable options from which batch worker processes build their own manager.
+
+        Workers run every processor serially, since the batch is already spread over the worker processes.
+        """
+        return {
+            "manifest_path": self.manifest.db_path if self.manifest else None,
+            "incremental": self.incremental,
+            "executors": self._serial_executors(),
+            "cache_dir": self.cache.cache_dir if self.cache else None,
+            "cache_max_bytes": self.cache.max_bytes if self.cache else None,
+            "include_timings": self.include_timings,
+            "include_counters": self.include_counters,
+            "profile_dir": self.profile_dir,
+            "trace": tracing.is_enabled(),
+        }
+
+    def _check_journal(
+            self, input_data_file: str, input_data: Dict, files_list: List[str], participant_id: str,
+            result_file_path: str, file_hashes: Optional[Dict[str, str]]) -> Tuple[RunJournal, str, bool]:
+        """
+        Fingerprints the participant's inputs and checks them against the run journal next to the results.
+
+        :return: The run journal, the fingerprint, and whether the recorded result is current.
+        :rtype: Tuple[RunJournal, str, bool]
+        """
+        journal = RunJournal(input_data["results_path"])
+        # A result written with other output options is not current, e.g. one without the requested timings
+        options = {"include_timings": self.include_timings, "include_counters": self.include_counters}
+        fingerprint = journal.fingerprint(
+            input_data_file, input_data["context_path"], files_list, file_hashes, options)
+        return journal, fingerprint, journal.is_current(participant_id, fingerprint, result_file_path)
+
+    @staticmethod
+    def _failure(error: Exception) -> Exception:
+        """
+        Wraps an error raised by a stage into the error reported by the ETL process.
+
+        :param error: The error raised by a stage.
+        :type error: Exception
+        :return: A FileNotFoundError, ValueError or RuntimeError describing the failure.
+        :rtype: Exception
+        """
+        if isinstance(error, FileNotFoundError):
+            return FileNotFoundError(f"ETL process failed: {error}")
+        if isinstance(error, ValueError):
+            return ValueError(f"ETL process failed: {error}")
+        return RuntimeError(f"ETL process failed: {error}")
 
     def _create_result_dictionary(
         self, input_data: Dict, participant_id: str, processed_results: Dict, start_time: datetime, end_time: datetime
@@ -95,7 +605,8 @@ class ETLManager:
         Creates a result dictionary containing metadata and the processed results.
 
         This dictionary includes the start and end times of the ETL process, along with the paths for context
-        and results. It also includes the processed results and participant ID for saving to the output file.
+        and results. It also includes the processed results and participant ID for saving to the output file:
+        the result of each file type is keyed by the type, in the registration order of the processors.
 
         :param input_data: A dictionary containing context and results paths.
         :type input_data: dict
@@ -109,6 +620,10 @@ class ETLManager:
         :return: A dictionary containing metadata and the processed results.
         :rtype: dict
         """
+        participant_results = {"participant": {"_id": participant_id}}
+        file_types = FileProcessorFactory.registered_types()
+        for file_type in sorted(processed_results, key=file_types.index):
+            participant_results[file_type] = processed_results[file_type]
         return {
             "metadata": {
                 "start_at": start_time,
@@ -116,11 +631,208 @@ class ETLManager:
                 "context_path": input_data["context_path"],
                 "results_path": input_data["results_path"],
             },
-            "results": [
-                {
-                    "participant": {"_id": participant_id},
-                    "txt": processed_results["txt"],
-                    "json": processed_results["json"],
-                }
-            ],
+            "results": [participant_results],
         }
+
+
+class AsyncETLManager(ETLManager):
+    """
+    An asyncio variant of the ETLManager, for embedding the pipeline in an asyncio application.
+
+    Each stage is awaited instead of blocking: extraction, journal checks and writing run on the shared thread
+    pool, and the processors run on the shared executors (the DNA analysis in worker processes). At most
+    `max_concurrency` participants are processed at a time, so thousands of participants can be submitted
+    without flooding the pools or opening too many files at once.
+
+    Manifest queries, which read the database and stat the participant files, run on the shared thread pool too.
+    The stages are the ones of the ETLManager, awaited, and report to the same metrics, progress callback and
+    hooks. Stage objects and measurements are local to each call, so the `extractor`, `transformer`, `loader`,
+    `participant_id`, `timings` and `counters` attributes are not set; the results of `process_many` and the
+    hooks carry the stage timings and counters. Stage timings are wall clock durations, including the time
+    spent waiting for a pool worker.
+
+    Attributes:
+        max_concurrency (int): The maximum number of participants processed concurrently.
+
+    Methods:
+        process(input_data_file: str) -> bool:
+            Coroutine that executes the ETL process for one input file, like `ETLManager.process`.
+        process_many(input_data_files: Iterable[str], ordered: bool = True) -> AsyncIterator[ETLResult]:
+            Asynchronous generator that executes the ETL process for many input files concurrently, yielding
+            one result per input file.
+    """
+
+    def __init__(
+            self, manifest: Optional[ParticipantManifest] = None, incremental: bool = False,
+            executors: Optional[Dict[str, str]] = None, cache: Optional[ResultCache] = None,
+            include_timings: bool = False, hooks: Optional[List[TimingsHook]] = None,
+            include_counters: bool = False, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            metrics: Optional[BatchMetrics] = None, progress: Optional[ProgressHook] = None) -> None:
+        """
+        Initializes the AsyncETLManager class.
+
+        :param max_concurrency: The maximum number of participants processed concurrently. (optional)
+        :type max_concurrency: int
+
+        See `ETLManager.__init__` for the other parameters. The executors default to `BATCH_EXECUTORS`, since
+        participants are processed concurrently. The progress callback is called on the event loop thread.
+        """
+        super().__init__(
+            manifest, incremental, executors or BATCH_EXECUTORS, cache, include_timings, hooks, include_counters,
+            metrics=metrics, progress=progress)
+        # Profile mode is not offered: cProfile only sees the event loop thread and participants interleave on it
+        if max_concurrency < 1:
+            raise ValueError(f"The concurrency limit must be positive: {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    async def process(self, input_data_file: str) -> bool:
+        """
+        Orchestrates the ETL process for one input file without blocking the event loop.
+
+        :param input_data_file: The file containing the input data (JSON format) for the extraction process.
+        :type input_data_file: str
+        :return: True if the participant was processed, False if it was skipped as unchanged.
+        :rtype: bool
+
+        :raises FileNotFoundError: If a required file during extraction or loading cannot be found.
+        :raises ValueError: If the input data is invalid or cannot be processed.
+        :raises RuntimeError: If an unexpected error occurs during the ETL process.
+        """
+        return (await self._process_run(input_data_file))[1]
+
+    async def _process_run(self, input_data_file: str) -> Tuple["_ParticipantRun", bool]:
+        """
+        Runs the ETL process of one input file once a concurrency slot is free and records its outcome.
+        """
+        async with self._limit():
+            run = _ParticipantRun(input_data_file)
+            try:
+                processed = await self._process(run)
+            except Exception as e:
+                self._record(self._failed(input_data_file, e))
+                raise
+        self._record(self._result(run, processed))
+        return run, processed
+
+    async def _process(self, run: "_ParticipantRun") -> bool:
+        """
+        Runs the stages of the ETL process of one input file, awaiting each of them, see `ETLManager._process`.
+        """
+        input_data_file = run.input_data_file
+        with tracing.span("participant", input_file=input_data_file) as span:
+            try:
+                # Step 1: Extract files and the participant ID, reusing the manifest listing when it is current
+                with self._stage(run, EXTRACT):
+                    snapshot = await run_in_thread(self._snapshot, input_data_file)
+                    extractor = AsyncExtractor(input_data_file, snapshot=snapshot)
+                    files_list, participant_id, input_data = await extractor.extract()
+                run.timings.update(extractor.timings.as_dict())
+                self._check_required_types(files_list, input_data)
+                result_file_path = self._result_file_path(input_data, participant_id)
+
+                # Skip the participant if its inputs did not change since the last recorded run
+                journal = fingerprint = None
+                if self.incremental:
+                    file_hashes = await run_in_thread(self._file_hashes, input_data, snapshot)
+                    journal, fingerprint, current = await run_in_thread(
+                        self._check_journal, input_data_file, input_data, files_list, participant_id,
+                        result_file_path, file_hashes)
+                    if current:
+                        span.set(participant_id=participant_id, skipped=True)
+                        return False
+
+                # Step 2: Transform the data
+                with self._stage(run, TRANSFORM):
+                    transformer = AsyncTransformer(
+                        files_list, input_data, self.executors, self.cache, extractor.snapshot)
+                    processed_results = await transformer.transform()
+
+                # Step 3: Create the final result dictionary
+                final_output = self._final_output(run, transformer, input_data, participant_id, processed_results)
+
+                # Step 4: Load the results
+                with self._stage(run, LOAD):
+                    loader = AsyncLoader(input_data["results_path"])
+                    await loader.load(final_output, result_file_path)
+                run.timings.update(loader.timings.as_dict())
+
+                # Record the completed participant only once its result file is in place
+                if journal is not None:
+                    await run_in_thread(journal.record, participant_id, fingerprint, result_file_path)
+
+            except Exception as e:
+                raise self._failure(e)
+            span.set(participant_id=participant_id)
+
+        self._finish(run, participant_id)
+        return True
+
+    async def process_many(
+            self, input_data_files: Iterable[str], ordered: bool = True) -> AsyncIterator[ETLResult]:
+        """
+        Executes the ETL process for many input files concurrently.
+
+        The input files are consumed lazily and at most `max_concurrency` of them are in flight at a time.
+        A failing input file does not stop the batch: its error is reported in its result.
+
+        :param input_data_files: The input JSON files to process.
+        :type input_data_files: Iterable[str]
+        :param ordered: Yield the results in input order if True, otherwise as soon as they complete. (optional)
+        :type ordered: bool
+        :return: An asynchronous iterator of the outcome of each input file.
+        :rtype: AsyncIterator[ETLResult]
+        """
+        import asyncio
+        pending_items = enumerate(input_data_files)
+        in_flight = set()
+        # Results that completed ahead of an earlier input file, by input position
+        completed = {}
+        next_index = 0
+        try:
+            while True:
+                while len(in_flight) + len(completed) < self.max_concurrency:
+                    item = next(pending_items, None)
+                    if item is None:
+                        break
+                    in_flight.add(asyncio.ensure_future(self._process_indexed(*item)))
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, result = task.result()
+                    if ordered:
+                        completed[index] = result
+                    else:
+                        yield result
+
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            # The consumer stopped early: do not leave participants running in the background
+            for task in in_flight:
+                task.cancel()
+
+    async def _process_indexed(self, index: int, input_data_file: str) -> Tuple[int, ETLResult]:
+        """
+        Executes the ETL process for one input file of a batch, capturing its error instead of raising it.
+        """
+        try:
+            run, processed = await self._process_run(input_data_file)
+        except Exception as e:
+            return index, self._failed(input_data_file, e)
+        return index, self._result(run, processed)
+
+    def _limit(self) -> "asyncio.Semaphore":
+        """
+        Returns the semaphore limiting the number of participants processed concurrently on the running loop.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
@@ -0,0 +1,150 @@
+import atexit
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+SERIAL = "serial"
+THREAD = "thread"
+PROCESS = "process"
+
+EXECUTOR_KINDS = (SERIAL, THREAD, PROCESS)
+
+
+class SerialExecutor(Executor):
+    """
+    An executor that runs every task immediately in the calling thread.
+
+    It lets callers use the same submit/result code path whether work is run concurrently or not.
+    """
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+_executors: Dict[str, Executor] = {}
+_lock = threading.Lock()
+# The multiprocessing start method of the shared process pool, None for the platform default
+_process_start_method: Optional[str] = None
+# A start method that is safe in a process already running threads (a GUI, a threaded server): forking one can
+# leave locks held in the child, so the workers start from a clean interpreter instead
+THREAD_SAFE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def get_executor(kind: str, max_workers: Optional[int] = None) -> Executor:
+    """
+    Returns the process-wide shared executor of the given kind, creating it on first use.
+
+    The thread and process pools are shared by every pipeline run in the process, so short participants do not
+    pay for starting a new pool each time. Pools are shut down when the interpreter exits.
+
+    :param kind: One of "serial", "thread" or "process".
+    :type kind: str
+    :param max_workers: The number of workers if the pool has to be created. (optional)
+    :type max_workers: int
+    :return: The shared executor.
+    :rtype: Executor
+    :raises ValueError: If the kind is unknown.
+    """
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Unsupported executor kind: {kind}")
+
+    with _lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            if kind == THREAD:
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl")
+            elif kind == PROCESS:
+                # Ctrl+C reaches the whole process group: only the parent stops, and it shuts the pool down
+                mp_context = multiprocessing.get_context(_process_start_method) if _process_start_method else None
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=mp_context, initializer=signal.signal,
+                    initargs=(signal.SIGINT, signal.SIG_IGN))
+            else:
+                executor = SerialExecutor()
+            _executors[kind] = executor
+        return executor
+
+
+def submit(kind: str, fn: Callable, *args, **kwargs) -> Future:
+    """
+    Submits a task to the shared executor of the given kind.
+
+    A process pool that broke because a worker died is replaced once before giving up.
+
+    :param kind: One of "serial", "thread" or "process".
+    :type kind: str
+    :param fn: The callable to run. It must be picklable for the "process" kind.
+    :type fn: Callable
+    :return: The future of the task.
+    :rtype: Future
+    """
+    try:
+        return get_executor(kind).submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        with _lock:
+            _executors.pop(kind, None)
+        return get_executor(kind).submit(fn, *args, **kwargs)
+
+
+def set_process_start_method(method: Optional[str]) -> Optional[str]:
+    """
+    Sets how the workers of the shared process pool are started, e.g. "forkserver" or "spawn" in a process that
+    already runs threads, which must not be forked. A running pool started otherwise is shut down and recreated
+    on its next use.
+
+    :param method: A multiprocessing start method, or None for the platform default.
+    :type method: str
+    :return: The previous start method, to restore it.
+    :rtype: Optional[str]
+    :raises ValueError: If the start method is not available on this platform.
+    """
+    global _process_start_method
+    if method is not None and method not in multiprocessing.get_all_start_methods():
+        raise ValueError(f"Unsupported start method: {method}")
+    with _lock:
+        previous = _process_start_method
+        if method == previous:
+            return previous
+        _process_start_method = method
+        executor = _executors.pop(PROCESS, None)
+    if executor is not None:
+        executor.shutdown(wait=True)
+    return previous
+
+
+async def run_in_thread(fn: Callable, *args) -> Any:
+    """
+    Runs a blocking callable on the shared thread pool and waits for it without blocking the event loop.
+
+    :param fn: The callable to run.
+    :type fn: Callable
+    :return: The return value of the callable.
+    """
+    # Imported here so the synchronous pipeline and the CLI start without loading asyncio
+    import asyncio
+    return await asyncio.wrap_future(submit(THREAD, fn, *args))
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """
+    Shuts down every shared executor. They are recreated on the next use.
+
+    :param wait: Whether to wait for running tasks to finish. (optional)
+    :type wait: bool
+    """
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown_executors)
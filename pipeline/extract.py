@@ -1,8 +1,14 @@
 import os
 from pathlib import Path
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 import json
 from utils.input_validation import InputValidator
+from pipeline.processors.file_processor_factory import FileProcessorFactory
+from utils.directory_snapshot import DirectorySnapshot
+from utils.json_codec import get_codec
+from pipeline import tracing
+from pipeline.executors import run_in_thread
+from pipeline.timings import VALIDATE, StageTimings
 
 
 class Extractor:
@@ -18,7 +24,10 @@ class Extractor:
     Attributes:
         input_data_file (str): The file path of the input JSON file containing the context path and the result path.
         valid_extensions (List[str]): A list of valid file extensions to filter files for extraction.
-        Default includes 'txt' and 'json'.
+        Defaults to the file types with a registered processor (see `FileProcessorFactory`).
+        snapshot (DirectorySnapshot): The cached listing of the context directory, shared by validation and
+        extraction and available to later stages once `extract` has run.
+        timings (StageTimings): The duration of the validation stage.
 
     Methods:
         extract() -> Tuple[List[str], str, Dict]:
@@ -35,17 +44,26 @@ class Extractor:
             Helper method to extract the UUID, assumed to be the name of the directory in the context path.
     """
 
-    def __init__(self, input_data_file: str, valid_extensions: List[str] = ["txt", "json"]):
+    def __init__(
+            self, input_data_file: str, valid_extensions: Optional[List[str]] = None,
+            snapshot: Optional[DirectorySnapshot] = None):
         """
         Initialize the Extractor class with the input data file and valid file extensions.
 
         :param input_data_file: Path to the input JSON file containing the context path and result path.
         :type input_data_file: str
-        :param valid_extensions: A list of valid file extensions to be extracted (optional).
+        :param valid_extensions: A list of valid file extensions to be extracted, by default the file types with
+            a registered processor (optional).
         :type valid_extensions: List[str]
+        :param snapshot: An existing listing of the context directory to reuse instead of scanning it (optional).
+        :type snapshot: DirectorySnapshot
         """
         self.input_data_file = input_data_file
+        if valid_extensions is None:
+            valid_extensions = FileProcessorFactory.registered_types()
         self.valid_extensions = valid_extensions
+        self.snapshot = snapshot
+        self.timings = StageTimings()
 
     def extract(self) -> Tuple[List[str], str, Dict]:
         """
@@ -62,16 +80,21 @@ class Extractor:
         :rtype: Tuple[List[str], str, Dict]
         :raises ValueError: If the input data is invalid according to the validation rules.
         """
-        # Load and process the JSON input file
-        input_data = self._process_json_input_file_()
-
-        # Validate the input data
-        validator = InputValidator(input_data, self.valid_extensions)
-        validator.validate()
-
-        # Extract files and UUID from the context path
-        context_path = input_data.get("context_path")
-        return self._extract_files(context_path), self._extract_uuid(context_path), input_data
+        with tracing.span("extract", input_file=self.input_data_file) as span:
+            # Load and process the JSON input file
+            input_data = self._process_json_input_file_()
+
+            # Validate the input data, the validator scans the context directory once and keeps the snapshot
+            validator = InputValidator(input_data, self.valid_extensions, snapshot=self.snapshot)
+            with self.timings.measure(VALIDATE), tracing.span("validate"):
+                validator.validate()
+            self.snapshot = validator.snapshot
+
+            # Extract files and UUID from the context path
+            context_path = input_data.get("context_path")
+            files = self._extract_files(context_path)
+            span.set(files=len(files))
+            return files, self._extract_uuid(context_path), input_data
 
     def _process_json_input_file_(self) -> Dict:
         """
@@ -83,9 +106,7 @@ class Extractor:
         :raises ValueError: If the JSON file is invalid or malformed.
         """
         try:
-            with open(self.input_data_file, 'r') as file:
-                data = json.load(file)
-            return data
+            return get_codec().load_file(self.input_data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {self.input_data_file}")
         except json.JSONDecodeError:
@@ -96,7 +117,7 @@ class Extractor:
         Extracts the files from the specified context directory.
 
         This method retrieves all files from the directory specified by `context_path`,
-        filtering by valid file extensions.
+        filtering by valid file extensions. The cached directory snapshot is reused when available.
 
         :param context_path: The path of the context directory.
         :type context_path: str
@@ -105,15 +126,13 @@ class Extractor:
         :rtype: List[str]
         :raises FileNotFoundError: If the context path does not exist.
         """
-        # Validate if the context path exists
-        if not os.path.exists(context_path):
-            raise FileNotFoundError(f"The context path does not exist: {context_path}")
+        if self.snapshot is None or self.snapshot.path != context_path:
+            # Validate if the context path exists
+            if not os.path.exists(context_path):
+                raise FileNotFoundError(f"The context path does not exist: {context_path}")
+            self.snapshot = DirectorySnapshot.scan(context_path)
 
-        files_list = [
-            f for f in os.listdir(context_path)
-            if os.path.isfile(os.path.join(context_path, f)) and f.split('.')[-1] in self.valid_extensions
-        ]
-        return files_list
+        return self.snapshot.files(self.valid_extensions)
 
     def _extract_uuid(self, context_path: str) -> str:
         """
@@ -132,3 +151,26 @@ class Extractor:
         if not context_uuid_dir:
             raise ValueError(f"Invalid context path: {context_path} does not contain a valid UUID.")
         return context_uuid_dir
+
+
+class AsyncExtractor(Extractor):
+    """
+    An asyncio variant of the Extractor.
+
+    Reading the input JSON file and scanning the context directory are blocking file system calls, so the
+    extraction runs on the shared thread pool while the event loop keeps serving other participants.
+
+    Methods:
+        extract() -> Tuple[List[str], str, Dict]:
+            Coroutine that extracts the files, UUID and input data, like `Extractor.extract`.
+    """
+
+    async def extract(self) -> Tuple[List[str], str, Dict]:
+        """
+        Extracts the list of files in the context directory, the UUID and the input data on the thread pool.
+
+        :return: A tuple containing the list of filenames, the UUID and the input data dictionary.
+        :rtype: Tuple[List[str], str, Dict]
+        :raises ValueError: If the input data is invalid according to the validation rules.
+        """
+        return await run_in_thread(super().extract)
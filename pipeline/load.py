@@ -1,5 +1,10 @@
-import json
+import os
+import threading
 from typing import Dict
+from utils.json_codec import get_codec
+from pipeline import tracing
+from pipeline.executors import run_in_thread
+from pipeline.timings import SERIALIZE, WRITE, StageTimings
 
 
 class Loader:
@@ -10,6 +15,7 @@ class Loader:
 
     Attributes:
         results_path (str): The path where the results will be stored.
+        timings (StageTimings): The durations of the serialize and write stages.
 
     Methods:
         load_results(participant_data, output_file):
@@ -24,19 +30,68 @@ class Loader:
         :type results_path: str
         """
         self.results_path = results_path
+        self.timings = StageTimings()
 
     def load(self, final_result: Dict, output_file: str) -> None:
         """
         Saves the provided participant data into the specified output file in JSON format.
 
         This method serializes the `participant_data` into a JSON format and writes it to a file
-        specified by `output_file`. The data is written with an indentation of 4 spaces for readability.
+        specified by `output_file`. The data is pretty-printed for readability using the default JSON codec.
+        The file is written to a temporary file first and then renamed into place, so an interrupted run
+        never leaves a partially written result behind.
 
         :param participant_data: The data to be saved to the JSON file.
         :type participant_data: dict or any serializable data structure
         :param output_file: The path of the output file where the data will be saved.
         :type output_file: str
         """
-        # Save the results to a JSON file
-        with open(output_file, "w") as f:
-            json.dump(final_result, f, indent=4)
+        with tracing.span("load", output_file=output_file) as span:
+            # Serialize straight to bytes
+            with self.timings.measure(SERIALIZE), tracing.span("serialize"):
+                data = get_codec().dumps(final_result, indent=True)
+            span.set(bytes=len(data))
+            self._write(data, output_file)
+
+    def _write(self, data: bytes, output_file: str) -> None:
+        """
+        Writes the serialized data to a temporary file in the output directory and renames it into place.
+        """
+        # Write to a temporary file in the same directory and atomically replace the output file
+        directory, file_name = os.path.split(output_file)
+        temp_path = os.path.join(directory, f".{file_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with self.timings.measure(WRITE), tracing.span("write"):
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, output_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+
+class AsyncLoader(Loader):
+    """
+    An asyncio variant of the Loader.
+
+    Serializing and writing (including the fsync) run on the shared thread pool, so saving a result does not
+    block the event loop.
+
+    Methods:
+        load(final_result: Dict, output_file: str) -> None:
+            Coroutine that saves the result atomically, like `Loader.load`.
+    """
+
+    async def load(self, final_result: Dict, output_file: str) -> None:
+        """
+        Saves the provided participant data into the specified output file in JSON format on the thread pool.
+
+        :param final_result: The data to be saved to the JSON file.
+        :type final_result: dict
+        :param output_file: The path of the output file where the data will be saved.
+        :type output_file: str
+        """
+        await run_in_thread(super().load, final_result, output_file)
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+from pipeline import counters as work
+from pipeline.timings import LCS
+
+# Default number of seconds between two writes of the metrics file
+DEFAULT_WRITE_INTERVAL = 15.0
+
+# Upper bounds in seconds of the stage latency histogram buckets, from a small metadata file to a large lane
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+def _labels(**labels: str) -> str:
+    """
+    Formats the labels of a sample, escaping their values.
+    """
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format(value: float) -> str:
+    """
+    Formats a sample value, writing integral values without a fraction.
+    """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class BatchMetrics:
+    """
+    Batch-level metrics of the ETL process, written to a textfile that node_exporter's textfile collector
+    exposes to Prometheus.
+
+    The metrics are:
+        etl_participants_total{outcome}: Participants processed, skipped as unchanged or failed.
+        etl_failures_total{error_type}: Failed participants by the type of the reported error.
+        etl_bytes_read_total: Size of the data files of the processed participants.
+        etl_work_total{counter}: Work counters of the processed participants (see `pipeline.counters`).
+        etl_stage_duration_seconds{stage}: Histogram of the duration of each stage (see `pipeline.timings`).
+        etl_lcs_cells_per_second: LCS dynamic programming cells evaluated per second of LCS time.
+
+    Each result recorded more than `interval` seconds after the last write rewrites the file, so a scraper
+    sees the progress of a long batch. The file is replaced atomically and is never read half-written.
+    Throughput can be alerted on with `rate(etl_participants_total[5m])`, and a stalled batch by the
+    `node_textfile_mtime_seconds` of the file.
+
+    Attributes:
+        path (str): The metrics file, conventionally ending in `.prom`.
+        interval (float): The minimum number of seconds between two writes of the file.
+
+    Methods:
+        record(result: ETLResult) -> None:
+            Records the outcome of one input file and rewrites the file if the interval elapsed.
+        write() -> None:
+            Writes the metrics file now.
+        render() -> str:
+            Returns the metrics in the Prometheus text exposition format.
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_WRITE_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self._outcomes = {"processed": 0, "skipped": 0, "failed": 0}
+        self._failures: Dict[str, int] = {}
+        self._work = work.WorkCounters()
+        # Per stage: the count of each bucket (the last one for values above the largest bound), sum and count
+        self._stages: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._last_write = time.monotonic()
+        self._lock = threading.Lock()
+        # Held from rendering to renaming, so a render never replaces the file written from a newer one. Recording
+        # only waits for the render.
+        self._write_lock = threading.Lock()
+
+    def record(self, result) -> None:
+        """
+        Records the outcome of one input file and rewrites the metrics file if the write interval elapsed.
+
+        :param result: The outcome of the ETL process of the input file.
+        :type result: ETLResult
+        """
+        with self._lock:
+            if not result.ok:
+                self._outcomes["failed"] += 1
+                error_type = result.error_type or "Exception"
+                self._failures[error_type] = self._failures.get(error_type, 0) + 1
+            elif not result.processed:
+                self._outcomes["skipped"] += 1
+            else:
+                self._outcomes["processed"] += 1
+                self._work.update(result.counters or {})
+                for stage, seconds in (result.timings or {}).items():
+                    self._observe(stage, seconds)
+            due = time.monotonic() - self._last_write >= self.interval
+        if due:
+            self.write()
+
+    def write(self) -> None:
+        """
+        Writes the metrics to a temporary file next to the metrics file and renames it into place. Concurrent
+        writes are serialized, so the file always ends up with the latest render.
+        """
+        with self._write_lock:
+            with self._lock:
+                text = self._render()
+                self._last_write = time.monotonic()
+            directory, file_name = os.path.split(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = os.path.join(directory, f".{file_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(temp_path, "w") as file:
+                    file.write(text)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+    def render(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        :return: The metrics text.
+        :rtype: str
+        """
+        with self._lock:
+            return self._render()
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        """
+        Adds a stage duration to the latency histogram of the stage.
+        """
+        buckets, totals = self._stages.setdefault(stage, ([0] * (len(STAGE_BUCKETS) + 1), [0.0]))
+        index = next((i for i, bound in enumerate(STAGE_BUCKETS) if seconds <= bound), len(STAGE_BUCKETS))
+        buckets[index] += 1
+        totals[0] += seconds
+
+    def _render(self) -> str:
+        lines = [
+            "# HELP etl_participants_total Participants by outcome of the ETL process.",
+            "# TYPE etl_participants_total counter",
+        ]
+        lines += [f"etl_participants_total{_labels(outcome=o)} {n}" for o, n in self._outcomes.items()]
+
+        lines += [
+            "# HELP etl_failures_total Failed participants by error type.",
+            "# TYPE etl_failures_total counter",
+        ]
+        lines += [f"etl_failures_total{_labels(error_type=t)} {n}" for t, n in sorted(self._failures.items())]
+
+        counts = self._work.as_dict()
+        lines += [
+            "# HELP etl_bytes_read_total Bytes of participant data files read.",
+            "# TYPE etl_bytes_read_total counter",
+            f"etl_bytes_read_total {counts.pop(work.BYTES_READ, 0)}",
+            "# HELP etl_work_total Algorithmic work done by the processors.",
+            "# TYPE etl_work_total counter",
+        ]
+        lines += [f"etl_work_total{_labels(counter=name)} {n}" for name, n in counts.items()]
+
+        lines += [
+            "# HELP etl_stage_duration_seconds Duration of the pipeline stages of processed participants.",
+            "# TYPE etl_stage_duration_seconds histogram",
+        ]
+        for stage, (buckets, totals) in self._stages.items():
+            cumulative = 0
+            for bound, count in zip(STAGE_BUCKETS + (float("inf"),), buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                lines.append(f"etl_stage_duration_seconds_bucket{_labels(stage=stage, le=le)} {cumulative}")
+            lines.append(f"etl_stage_duration_seconds_sum{_labels(stage=stage)} {_format(totals[0])}")
+            lines.append(f"etl_stage_duration_seconds_count{_labels(stage=stage)} {cumulative}")
+
+        lcs_seconds = self._stages[LCS][1][0] if LCS in self._stages else 0.0
+        cell_rate = counts.get(work.DP_CELLS, 0) / lcs_seconds if lcs_seconds > 0 else 0.0
+        lines += [
+            "# HELP etl_lcs_cells_per_second LCS dynamic programming cells evaluated per second of LCS time.",
+            "# TYPE etl_lcs_cells_per_second gauge",
+            f"etl_lcs_cells_per_second {_format(cell_rate)}",
+        ]
+        return "\n".join(lines) + "\n"
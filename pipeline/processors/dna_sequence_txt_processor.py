@@ -1,7 +1,11 @@
 from itertools import combinations
 from collections import defaultdict
 from pipeline.processors.file_processor import AbstractFileProcessor
-from typing import List, Dict
+from pipeline import counters as work
+from pipeline import tracing
+from pipeline.counters import WorkCounters
+from pipeline.timings import LCS, StageTimings
+from typing import List, Dict, Optional
 import logging
 
 
@@ -13,11 +17,19 @@ class DNASequenceTxtProcessor (AbstractFileProcessor):
     2. Compute the GC content and codon frequency for each sequence.
     3. Determine the most common codons across all sequences.
     4. Compute the longest common subsequence (LCS) among all sequences.
+    Several files of one participant (e.g. one per sequencing lane) can be processed in parallel with
+    process_part() and combined with merge().
+    The work done is counted in `counters`: bases scanned, sequences skipped, pairs compared, DP cells
+    evaluated, pairs pruned by the length bound and pairs answered from the duplicate pair cache.
     Attributes:
         file_path (str): The path to the file containing DNA sequences.
     Methods:
         process() -> dict:
             Returns a dictionary containing the processed data.
+        process_part() -> dict:
+            Returns the per-sequence data and codon totals of the file, to be combined by merge().
+        merge(file_paths: list, parts: list, timings: StageTimings = None, counters: WorkCounters = None) -> dict:
+            Combines the lanes of a participant into the same structure as process().
         _load_sequences() -> list:
             Loads DNA sequences from a file and returns a list of non-empty sequences.
         _gc_content(sequence: str) -> float:
@@ -31,6 +43,10 @@ class DNASequenceTxtProcessor (AbstractFileProcessor):
             Finds the longest continuous common subsequence (substring) between two strings.
     """
 
+    supports_multiple_files = True
+    # 2: the parts carry the lane's sequences, so cached parts without them are not reused
+    version = "2"
+
     def __init__(self, file_path: str):
         """
         Initialize the DNASequenceTxtProcessor with the given file path.
@@ -64,33 +80,92 @@ class DNASequenceTxtProcessor (AbstractFileProcessor):
             ValueError: If no codon frequencies are provided when determining the most frequent codon.
             logging.error: If an error occurs while processing a sequence.
         """
-        # Load sequences from the file
-        try:
-            self._load_sequences()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"File not found: {self.file_path}")
-        except ValueError as e:
-            raise ValueError(f"Invalid data in file: {str(e)}")
+        part = self.process_part()
+        return self._summarize(part["sequences"], part["codon_totals"])
+
+    def process_part(self) -> Dict:
+        """
+        Processes the file as one lane of a multi-file participant.
+        Loads the DNA sequences and computes the GC content and codon frequency of each one,
+        accumulating the codon totals of the whole file. The LCS is left to merge(), since it spans all lanes,
+        so the loaded sequences are returned with the part and the files are not read again.
+        Returns:
+            dict: A dictionary containing:
+                - "sequences" (list): The GC content and codon frequencies of each sequence.
+                - "codon_totals" (dict): The codon frequencies summed over all sequences of the file.
+                - "dna_sequences" (list): The DNA sequences of the file, for the cross-lane LCS.
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If no valid DNA sequences are found in the file.
+        """
+        self._load_sequences_from_file()
 
         sequences_data = []
-        codon_frequencies = []
+        codon_totals = {}
 
         # Process each sequence, if its not valid, skip it
         for seq in self.dna_sequences:
+            self.counters.add(work.BASES_SCANNED, len(seq))
             try:
                 gc_content = self._gc_content(seq)
                 codon_freq = self._codon_frequency(seq)
                 sequences_data.append({"gc_content": gc_content, "codons": codon_freq})
-                codon_frequencies.append(codon_freq)
+                self._accumulate_codons(codon_totals, codon_freq)
             except ValueError as e:
                 logging.error(f"Error processing sequence {seq}: {e}")
+                self.counters.add(work.SEQUENCES_SKIPPED)
                 continue
 
+        return {"sequences": sequences_data, "codon_totals": codon_totals, "dna_sequences": self.dna_sequences}
+
+    @classmethod
+    def merge(
+            cls, file_paths: List[str], parts: List[Dict], timings: Optional[StageTimings] = None,
+            counters: Optional[WorkCounters] = None) -> Dict:
+        """
+        Merges the lanes of a participant into a single result.
+        The per-sequence results are concatenated in lane order, the codon totals of all lanes are
+        summed into one shared accumulator, and the LCS is computed across the sequences of all lanes,
+        with sequence indices numbered across lanes. The sequences come from the parts, the lane files are
+        not read again.
+        Args:
+            file_paths (list): The paths of the lane files, in lane order.
+            parts (list): The results of process_part() for each lane, in the same order.
+            timings (StageTimings): Collects the duration of the cross-lane LCS. (optional)
+            counters (WorkCounters): Collects the work done by the cross-lane LCS. (optional)
+        Returns:
+            dict: The same structure as process() returns for a single file.
+        """
+        merged = cls(file_paths[0])
+        if timings is not None:
+            merged.timings = timings
+        if counters is not None:
+            merged.counters = counters
+        sequences_data = []
+        codon_totals = {}
+        for part in parts:
+            sequences_data.extend(part["sequences"])
+            cls._accumulate_codons(codon_totals, part["codon_totals"])
+            # The sequences of every lane in one list for the cross-lane LCS
+            merged.dna_sequences.extend(part["dna_sequences"])
+
+        return merged._summarize(sequences_data, codon_totals)
+
+    def _summarize(self, sequences_data: List, codon_totals: Dict) -> Dict:
+        """
+        Builds the final result from the per-sequence data, the codon totals and the loaded sequences.
+        Args:
+            sequences_data (list): The GC content and codon frequencies of each sequence.
+            codon_totals (dict): The codon frequencies summed over all sequences.
+        Returns:
+            dict: The processed data, see process().
+        """
         # Determine the most common codon across all sequences
-        most_common_codon = self._most_frequent_codons(codon_frequencies)
+        most_common_codon = self._most_frequent_codons([codon_totals] if sequences_data else [])
 
         # Compute the longest common subsequence (LCS) among all sequences
-        lcs = self._longest_common_subsequence_among_all()
+        with self.timings.measure(LCS), tracing.span("lcs", sequences=len(self.dna_sequences)):
+            lcs = self._longest_common_subsequence_among_all()
 
         # Return the processed data as a dictionary
         return {
@@ -99,6 +174,31 @@ class DNASequenceTxtProcessor (AbstractFileProcessor):
             "lcs": lcs
         }
 
+    @staticmethod
+    def _accumulate_codons(codon_totals: Dict, codon_freq: Dict) -> None:
+        """
+        Adds codon frequencies into a running total, keeping the first-seen order of the codons.
+        Args:
+            codon_totals (dict): The accumulator, updated in place.
+            codon_freq (dict): The codon frequencies to add.
+        """
+        for codon, count in codon_freq.items():
+            codon_totals[codon] = codon_totals.get(codon, 0) + count
+
+    def _load_sequences_from_file(self) -> None:
+        """
+        Loads the DNA sequences, reporting a missing file or invalid content with the file path.
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If no valid DNA sequences are found in the file.
+        """
+        try:
+            self._load_sequences()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {self.file_path}")
+        except ValueError as e:
+            raise ValueError(f"Invalid data in file: {str(e)}")
+
     def _load_sequences(self) -> List:
         """
     Loads DNA sequences from a file.
@@ -263,11 +363,31 @@ class DNASequenceTxtProcessor (AbstractFileProcessor):
 
         lcs_dict = {}
         max_len = 0
+        counters = self.counters
+
+        # Repeated sequences produce repeated pairs, whose LCS is only computed once. Without repeats no pair
+        # can hit the cache, so it is not kept.
+        pair_cache = {} if len(set(self.dna_sequences)) < len(self.dna_sequences) else None
 
         for i, j in combinations(range(len(self.dna_sequences)), 2):
+            first, second = self.dna_sequences[i], self.dna_sequences[j]
+
+            # The LCS of a pair is at most as long as its shorter sequence, so a pair shorter than the longest
+            # LCS found so far can neither replace nor tie it
+            if min(len(first), len(second)) < max_len:
+                counters.add(work.PAIRS_PRUNED)
+                continue
 
             # Find the LCS between the two sequences
-            lcs_candidate = self._lcs_between_two(self.dna_sequences[i], self.dna_sequences[j])
+            lcs_candidate = pair_cache.get((first, second)) if pair_cache is not None else None
+            if lcs_candidate is None:
+                lcs_candidate = self._lcs_between_two(first, second)
+                counters.add(work.PAIRS_COMPARED)
+                counters.add(work.DP_CELLS, len(first) * len(second))
+                if pair_cache is not None:
+                    pair_cache[(first, second)] = lcs_candidate
+            else:
+                counters.add(work.CACHE_HITS)
 
             # Update the LCS dictionary if a longer LCS is found
             if len(lcs_candidate) > max_len:
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
+from pipeline.counters import WorkCounters
+from pipeline.timings import StageTimings
 
 
 class AbstractFileProcessor(ABC):
@@ -6,14 +9,28 @@ class AbstractFileProcessor(ABC):
     Abstract Base Class for file processors.
     Defines the interface that all file processors must implement.
     contains the abstract method process() that must be implemented by subclasses.
+
+    Processors that can combine several files of their type for one participant (e.g. one file per
+    sequencing lane) set `supports_multiple_files` and override process_part() and merge().
+
+    `version` identifies the processing logic of a processor and is part of its result cache key.
+    Bump it whenever a change alters the output for the same input file.
+
+    `timings` collects the durations of the processor's inner stages (e.g. the LCS computation), and `counters`
+    the amount of work it did (e.g. the DNA bases scanned); both are reported with the participant's results.
     """
 
+    supports_multiple_files = False
+    version = "1"
+
     def __init__(self, file_path: str):
         """
         Initialize the file processor with the given file path.
         :param file_path: The path to the file to be processed
         """
         self.file_path = file_path
+        self.timings = StageTimings()
+        self.counters = WorkCounters()
 
     @abstractmethod
     def process(self) -> dict:
@@ -25,3 +42,34 @@ class AbstractFileProcessor(ABC):
             dict: The processed data from the file.
         """
         pass
+
+    def process_part(self) -> dict:
+        """
+        Process the file as one part of a multi-file participant.
+        The parts of all files are combined by merge(). Defaults to process().
+
+        Returns:
+            dict: The partial result of this file.
+        """
+        return self.process()
+
+    @classmethod
+    def merge(
+            cls, file_paths: List[str], parts: List[dict], timings: Optional[StageTimings] = None,
+            counters: Optional[WorkCounters] = None) -> dict:
+        """
+        Combine the partial results of several files of this type into a single result.
+
+        Args:
+            file_paths (list): The paths of the files, in processing order.
+            parts (list): The results of process_part() for each file, in the same order.
+            timings (StageTimings): Collects the durations of the inner stages of the merge. (optional)
+            counters (WorkCounters): Collects the work done by the merge. (optional)
+
+        Returns:
+            dict: The combined result.
+
+        Raises:
+            ValueError: If the processor does not support multiple files per participant.
+        """
+        raise ValueError(f"{cls.__name__} does not support multiple files per participant: {file_paths}")
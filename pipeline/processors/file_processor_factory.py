@@ -1,16 +1,121 @@
-from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
-from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
+import importlib
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# Entry point group through which third-party packages register processors, e.g. in pyproject.toml:
+#   [project.entry-points."dna_etl.processors"]
+#   csv = "my_package.csv_processor:CsvProcessor"
+ENTRY_POINT_GROUP = "dna_etl.processors"
+
+# Number of bytes read from the start of a file when sniffing its type
+SNIFF_SIZE = 512
+
+
+def _looks_like_json(head: bytes) -> bool:
+    """
+    Content sniffer for JSON documents: the first non-blank character opens an object or array.
+    """
+    return head.lstrip()[:1] in (b"{", b"[")
+
+
+def _looks_like_dna(head: bytes) -> bool:
+    """
+    Content sniffer for DNA sequence files: the start of the file only holds nucleotide letters and newlines.
+    """
+    stripped = head.strip()
+    return bool(stripped) and not stripped.translate(None, b"ACGTNacgtn\r\n")
 
 
 class FileProcessorFactory:
-    @staticmethod
-    def create_processor(file_path: str, file_type: str):
+    """
+    A registry-based factory of file processors.
+
+    Processors are registered per file type by dotted path ("package.module:ClassName") and their module is
+    imported only the first time a processor of that type is created, so short-lived invocations and worker
+    processes only pay for the processors they actually use. Third-party processors register through the
+    `dna_etl.processors` entry point group, which is only looked up when a file type is not registered.
+    Files whose type is unknown can be recognised by content sniffing.
+
+    Methods:
+        create_processor(file_path: str, file_type: str = None):
+            Creates a processor for a file, by type or by sniffing its content.
+        register(file_type: str, processor: Union[str, type], sniffer: Callable = None) -> None:
+            Registers a processor for a file type.
+        detect_file_type(file_path: str) -> Optional[str]:
+            Sniffs the type of a file from its first bytes.
+        registered_types() -> List[str]:
+            Returns the registered file types, in registration order.
+        required_types() -> List[str]:
+            Returns the built-in file types every participant must have.
+    """
+
+    # File type -> dotted path of the processor class, or the class itself once imported. The registration order
+    # is the order of the file types in the results.
+    _registry: Dict[str, Union[str, type]] = {
+        "txt": "pipeline.processors.dna_sequence_txt_processor:DNASequenceTxtProcessor",
+        "json": "pipeline.processors.metadata_json_processor:MetadataJsonProcessor",
+    }
+
+    # The built-in file types every participant must have a file of, types registered later are optional
+    _required_types: Tuple[str, ...] = ("txt", "json")
+
+    # Content sniffers in registration order, as (file type, sniffer) pairs
+    _sniffers: List[Tuple[str, Callable[[bytes], bool]]] = [
+        ("json", _looks_like_json),
+        ("txt", _looks_like_dna),
+    ]
+
+    _entry_points_loaded = False
+
+    @classmethod
+    def register(
+            cls, file_type: str, processor: Union[str, type],
+            sniffer: Optional[Callable[[bytes], bool]] = None) -> None:
+        """
+        Registers a processor for a file type, replacing any existing registration.
+
+        Args:
+            file_type (str): The file type (extension) handled by the processor.
+            processor (Union[str, type]): The processor class, or its dotted path "package.module:ClassName"
+                to import it lazily on first use.
+            sniffer (Callable): A function that receives the first bytes of a file and returns True if the
+                file is of this type. (optional)
+        """
+        file_type = file_type.lower()
+        cls._registry[file_type] = processor
+        if sniffer is not None:
+            cls._sniffers = [(t, s) for t, s in cls._sniffers if t != file_type] + [(file_type, sniffer)]
+
+    @classmethod
+    def registered_types(cls) -> List[str]:
+        """
+        Returns the registered file types, including those from entry points, in registration order: the
+        built-in types first, then the registered ones and those from entry points.
+
+        Returns:
+            list: The registered file types.
+        """
+        cls._load_entry_points()
+        return list(cls._registry)
+
+    @classmethod
+    def required_types(cls) -> List[str]:
+        """
+        Returns the built-in file types every participant must have a file of. Registered types are optional.
+
+        Returns:
+            list: The required file types.
+        """
+        return list(cls._required_types)
+
+    @classmethod
+    def create_processor(cls, file_path: str, file_type: Optional[str] = None):
         """
         Factory method to create an instance of a file processor based on the file type.
 
         Args:
             file_path (str): The path to the file to be processed.
-            file_type (str): The type of the file.
+            file_type (str): The type of the file. If omitted, the type is detected from the file content.
 
         Returns:
             An instance of the file processor.
@@ -18,9 +123,74 @@ class FileProcessorFactory:
         Raises:
             ValueError: If the file type is not supported.
         """
-        if file_type.lower() == 'json':
-            return MetadataJsonProcessor(file_path)
-        elif file_type.lower() == 'txt':
-            return DNASequenceTxtProcessor(file_path)
-        else:
+        if file_type is None:
+            file_type = cls.detect_file_type(file_path)
+            if file_type is None:
+                raise ValueError(f"Could not detect the file type of: {file_path}")
+
+        return cls._resolve(file_type.lower())(file_path)
+
+    @classmethod
+    def detect_file_type(cls, file_path: str) -> Optional[str]:
+        """
+        Detects the type of a file by running the registered content sniffers on its first bytes.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            str: The detected file type, or None if no sniffer recognised the content.
+        """
+        with open(file_path, "rb") as file:
+            head = file.read(SNIFF_SIZE)
+        for file_type, sniffer in cls._sniffers:
+            if sniffer(head):
+                return file_type
+        return None
+
+    @classmethod
+    def _resolve(cls, file_type: str) -> type:
+        """
+        Returns the processor class of a file type, importing it on first use.
+
+        Raises:
+            ValueError: If the file type is not supported or its processor cannot be imported.
+        """
+        processor = cls._registry.get(file_type)
+        if processor is None and not cls._entry_points_loaded:
+            cls._load_entry_points()
+            processor = cls._registry.get(file_type)
+        if processor is None:
             raise ValueError(f"Unsupported file type: {file_type}")
+
+        if isinstance(processor, str):
+            module_name, _, class_name = processor.partition(":")
+            try:
+                processor = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError) as e:
+                raise ValueError(f"Cannot load the processor for file type {file_type}: {e}")
+            cls._registry[file_type] = processor
+        return processor
+
+    @classmethod
+    def _load_entry_points(cls) -> None:
+        """
+        Registers the processors advertised by installed packages, once. Built-in registrations take precedence.
+        """
+        if cls._entry_points_loaded:
+            return
+        cls._entry_points_loaded = True
+
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+
+        if sys.version_info >= (3, 10):
+            advertised = entry_points(group=ENTRY_POINT_GROUP)
+        else:
+            advertised = entry_points().get(ENTRY_POINT_GROUP, [])
+
+        for entry_point in advertised:
+            # Entry points are loaded lazily too, through their "module:attr" value
+            cls._registry.setdefault(entry_point.name.lower(), entry_point.value)
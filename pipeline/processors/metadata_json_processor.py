@@ -1,6 +1,7 @@
 import json
 from datetime import datetime
 from pipeline.processors.file_processor import AbstractFileProcessor
+from utils.json_codec import get_codec
 from typing import Dict
 
 
@@ -32,6 +33,9 @@ class MetadataJsonProcessor (AbstractFileProcessor):
             _validate_age(i_birth_date: str) -> None:
                 Ensures the participant is at least 40 years old based on their date of birth.
     """
+
+    version = "1"
+
     def __init__(self, file_path: str):
         """
         Initialize the TestMetadataJsonProcessor with the given file path.
@@ -62,9 +66,8 @@ class MetadataJsonProcessor (AbstractFileProcessor):
             ValueError: If the JSON data does not pass validation checks.
         """
         try:
-            with open(self.file_path, 'r') as file:
-                data = json.load(file)
-                return self._process_json_data(data)
+            data = get_codec().load_file(self.file_path)
+            return self._process_json_data(data)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {self.file_path}")
         except json.JSONDecodeError:
@@ -0,0 +1,128 @@
+import cProfile
+import glob
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from utils.json_codec import get_codec
+
+PSTATS_SUFFIX = ".pstats"
+MEMORY_SUFFIX = ".memory.json"
+REPORT_FILE_NAME = "hotspots.txt"
+
+# Number of allocation sites kept per stage in the memory snapshots
+TOP_ALLOCATIONS = 10
+
+
+class ParticipantProfiler:
+    """
+    Profiles the ETL process of one participant with cProfile and tracemalloc.
+
+    On exit, the CPU profile is written to `<name>.pstats` and the peak memory of each stage, with the allocation
+    sites that grew the most during the stage, to `<name>.memory.json` in the profile directory.
+
+    cProfile only sees the calling thread, so the participant should be processed with serial executors.
+
+    Attributes:
+        profile_dir (str): The directory the profiles are written to.
+        name (str): The base name of the profile files.
+        stages (Dict[str, Dict]): The peak memory and top allocation sites of each stage.
+
+    Methods:
+        stage(name: str):
+            Context manager recording the peak memory and allocations of a stage.
+    """
+
+    def __init__(self, profile_dir: str, name: str) -> None:
+        self.profile_dir = profile_dir
+        self.name = name
+        self.stages: Dict[str, Dict] = {}
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "ParticipantProfiler":
+        os.makedirs(self.profile_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._profile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        base_path = os.path.join(self.profile_dir, self.name)
+        self._profile.dump_stats(base_path + PSTATS_SUFFIX)
+        get_codec().dump_file({"participant": self.name, "stages": self.stages}, base_path + MEMORY_SUFFIX,
+                              indent=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Records the peak traced memory of a stage and the allocation sites that grew the most during it.
+
+        :param name: The stage name.
+        :type name: str
+        """
+        # Snapshots are slow, so the CPU profile is paused while they are taken
+        self._profile.disable()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self._profile.enable()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            self._profile.disable()
+            growth = tracemalloc.take_snapshot().compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            self._profile.enable()
+            self.stages[name] = {
+                "peak_bytes": peak,
+                "top_allocations": [
+                    {"location": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in growth
+                ],
+            }
+
+
+def write_report(profile_dir: str, top: int = 25) -> Optional[str]:
+    """
+    Aggregates the profiles of every participant in a profile directory into a top-N hotspot report.
+
+    The report lists the functions with the most cumulative and own time over the whole batch, and the
+    largest peak memory of each stage over all participants.
+
+    :param profile_dir: The directory holding the participant profiles.
+    :type profile_dir: str
+    :param top: The number of functions listed per ranking. (optional)
+    :type top: int
+    :return: The path of the report, or None if the directory holds no profiles.
+    :rtype: str
+    """
+    profile_files = sorted(glob.glob(os.path.join(profile_dir, "*" + PSTATS_SUFFIX)))
+    if not profile_files:
+        return None
+
+    output = io.StringIO()
+    stats = pstats.Stats(*profile_files, stream=output)
+    stats.strip_dirs()
+    output.write(f"Hotspots of {len(profile_files)} participants\n\n")
+    for sort_key, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+        output.write(f"=== Top {top} functions by {title} ===\n")
+        stats.sort_stats(sort_key).print_stats(top)
+
+    peaks: Dict[str, int] = {}
+    for memory_file in sorted(glob.glob(os.path.join(profile_dir, "*" + MEMORY_SUFFIX))):
+        for stage, stage_memory in get_codec().load_file(memory_file)["stages"].items():
+            peaks[stage] = max(peaks.get(stage, 0), stage_memory["peak_bytes"])
+    output.write("=== Largest peak memory per stage ===\n")
+    for stage, peak in peaks.items():
+        output.write(f"{stage}: {peak / 1024 / 1024:.2f} MiB\n")
+
+    report_path = os.path.join(profile_dir, REPORT_FILE_NAME)
+    with open(report_path, "w") as file:
+        file.write(output.getvalue())
+    return report_path
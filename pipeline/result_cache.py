@@ -0,0 +1,165 @@
+import hashlib
+import os
+import threading
+from typing import Any, Iterable, Optional
+from utils.json_codec import get_codec
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# When the cache grows over its limit, entries are evicted until it is back under this fraction of the limit
+EVICTION_TARGET = 0.9
+
+
+class ResultCache:
+    """
+    A local, content-addressed cache of file processor outputs.
+
+    Entries are keyed by the content hash of the processed file(s), the processor name and the processor
+    version, so a result is reused whenever the same bytes are processed by the same processor logic,
+    regardless of the participant, input file or results path. Entries are JSON files stored under the
+    cache directory; each hit refreshes the entry's mtime and the least recently used entries are evicted
+    once the total size exceeds the configured limit.
+
+    Writes are atomic (temporary file + rename), so several processes can share a cache directory.
+
+    Attributes:
+        cache_dir (str): The directory holding the cache entries.
+        max_bytes (int): The size limit of the cache in bytes.
+        hits (int): The number of cache hits in this process.
+        misses (int): The number of cache misses in this process.
+
+    Methods:
+        key(content_hashes: Iterable[str], processor_name: str, processor_version: str, kind: str = "result") -> str:
+            Computes the cache key of a processor output.
+        get(key: str) -> Optional[Any]:
+            Returns a cached value, or None on a miss.
+        put(key: str, value: Any) -> None:
+            Stores a value, evicting old entries if the cache is over its size limit.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initialize the cache, creating the cache directory if needed.
+
+        :param cache_dir: The directory holding the cache entries.
+        :type cache_dir: str
+        :param max_bytes: The size limit of the cache in bytes. (optional)
+        :type max_bytes: int
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def key(
+            self, content_hashes: Iterable[str], processor_name: str, processor_version: str,
+            kind: str = "result") -> str:
+        """
+        Computes the cache key of a processor output.
+
+        :param content_hashes: The content hashes of the processed files, in processing order.
+        :type content_hashes: Iterable[str]
+        :param processor_name: The name of the processor.
+        :type processor_name: str
+        :param processor_version: The version of the processor logic.
+        :type processor_version: str
+        :param kind: What is cached, e.g. "result" for a full result or "part" for a per-file partial result.
+        :type kind: str
+        :return: The hexadecimal cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{kind}:{processor_name}:{processor_version}\n".encode("utf-8"))
+        for content_hash in content_hashes:
+            digest.update(f"{content_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns a cached value and marks it as recently used.
+
+        :param key: The cache key.
+        :type key: str
+        :return: The cached value, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            value = get_codec().load_file(entry_path)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            # A missing, concurrently evicted or corrupt entry is a miss
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Stores a value in the cache, evicting the least recently used entries if it grows over its limit.
+
+        :param key: The cache key.
+        :type key: str
+        :param value: A JSON serializable value.
+        """
+        entry_path = self._entry_path(key)
+        data = get_codec().dumps(value)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+
+        with self._lock:
+            # An entry overwritten under the same key no longer takes space
+            try:
+                replaced_size = os.stat(entry_path).st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(temp_path, entry_path)
+            self._size += len(data) - replaced_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entry_path(self, key: str) -> str:
+        """
+        Returns the path of a cache entry, sharded by the first two characters of the key.
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _entries(self):
+        """
+        Yields (path, size, mtime) of every cache entry.
+        """
+        with os.scandir(self.cache_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json"):
+                            try:
+                                entry_stat = entry.stat()
+                            except OSError:
+                                continue
+                            yield entry.path, entry_stat.st_size, entry_stat.st_mtime
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently used entries until the cache is under the eviction target.
+        The size is recomputed from disk, since other processes may share the cache directory.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
@@ -0,0 +1,159 @@
+import hashlib
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from pipeline.version import PIPELINE_VERSION
+from utils.file_hash import file_sha256
+from utils.json_codec import get_codec
+
+JOURNAL_FILE_NAME = ".etl_journal.jsonl"
+
+
+class RunJournal:
+    """
+    An append-only journal of completed participants, stored next to their results.
+
+    Each line records the fingerprint of a participant's inputs (content hashes of the input JSON and every
+    participant file, plus the pipeline version and the output options) at the time its result file was written.
+    A later run can skip a participant whose current fingerprint matches the last recorded one, as long as the
+    result file still exists.
+
+    The journal is crash-safe: a line is only appended, flushed and fsynced after the result file has been
+    written, so an interrupted batch leaves either a complete entry or none at all, and a re-run resumes with
+    the participants that were not recorded. A torn last line is ignored when the journal is read.
+
+    Attributes:
+        results_path (str): The directory holding the results and the journal.
+        journal_file (str): The path of the journal file.
+
+    Methods:
+        fingerprint(input_data_file: str, context_path: str, files: List[str],
+        file_hashes: Dict[str, str] = None, options: Dict[str, object] = None) -> str:
+            Computes the fingerprint of a participant's inputs.
+        is_current(participant_id: str, fingerprint: str, result_file: str) -> bool:
+            Checks whether a participant's result is up to date.
+        record(participant_id: str, fingerprint: str, result_file: str) -> None:
+            Durably records a completed participant.
+    """
+
+    def __init__(self, results_path: str) -> None:
+        """
+        Initialize the journal for a results directory.
+
+        :param results_path: The directory holding the results and the journal.
+        :type results_path: str
+        """
+        self.results_path = results_path
+        self.journal_file = os.path.join(results_path, JOURNAL_FILE_NAME)
+        self._entries = None
+
+    def fingerprint(
+            self, input_data_file: str, context_path: str, files: List[str],
+            file_hashes: Optional[Dict[str, str]] = None, options: Optional[Dict[str, object]] = None) -> str:
+        """
+        Computes the fingerprint of a participant's inputs.
+
+        :param input_data_file: The path of the input JSON file.
+        :type input_data_file: str
+        :param context_path: The participant directory.
+        :type context_path: str
+        :param files: The participant file names that are processed.
+        :type files: List[str]
+        :param file_hashes: Already known content hashes by file name, e.g. from the manifest. (optional)
+        :type file_hashes: Dict[str, str]
+        :param options: The options that change the content of the result file, e.g. whether timings are
+            included. (optional)
+        :type options: Dict[str, object]
+        :return: The hexadecimal fingerprint.
+        :rtype: str
+        """
+        file_hashes = file_hashes or {}
+        digest = hashlib.sha256()
+        digest.update(f"pipeline:{PIPELINE_VERSION}\n".encode("utf-8"))
+        digest.update(f"input:{file_sha256(input_data_file)}\n".encode("utf-8"))
+        for name, value in sorted((options or {}).items()):
+            digest.update(f"option:{name}:{value}\n".encode("utf-8"))
+        for name in sorted(files):
+            content_hash = file_hashes.get(name) or file_sha256(os.path.join(context_path, name))
+            digest.update(f"file:{name}:{content_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def is_current(self, participant_id: str, fingerprint: str, result_file: str) -> bool:
+        """
+        Checks whether the last recorded run of a participant matches the fingerprint and its result exists.
+
+        :param participant_id: The participant UUID.
+        :type participant_id: str
+        :param fingerprint: The current fingerprint of the participant's inputs.
+        :type fingerprint: str
+        :param result_file: The path of the participant's result file.
+        :type result_file: str
+        :return: True if the participant can be skipped.
+        :rtype: bool
+        """
+        entry = self._load().get(participant_id)
+        return (
+            entry is not None
+            and entry.get("fingerprint") == fingerprint
+            and entry.get("pipeline_version") == PIPELINE_VERSION
+            and os.path.isfile(result_file)
+        )
+
+    def record(self, participant_id: str, fingerprint: str, result_file: str) -> None:
+        """
+        Durably appends a completed participant to the journal.
+
+        :param participant_id: The participant UUID.
+        :type participant_id: str
+        :param fingerprint: The fingerprint of the inputs the result was computed from.
+        :type fingerprint: str
+        :param result_file: The path of the written result file.
+        :type result_file: str
+        """
+        entry = {
+            "participant_id": participant_id,
+            "fingerprint": fingerprint,
+            "pipeline_version": PIPELINE_VERSION,
+            "result_file": os.path.basename(result_file),
+            "completed_at": datetime.now().isoformat(),
+        }
+        line = get_codec().dumps(entry) + b"\n"
+        with open(self.journal_file, "a+b") as file:
+            # Start on a fresh line if an interrupted run left a torn entry behind
+            file.seek(0, os.SEEK_END)
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    line = b"\n" + line
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        self._load()[participant_id] = entry
+
+    def _load(self) -> Dict[str, Dict]:
+        """
+        Reads the journal once, keeping the last valid entry per participant.
+
+        :return: The latest entries keyed by participant UUID.
+        :rtype: Dict[str, Dict]
+        """
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            with open(self.journal_file, "rb") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return self._entries
+
+        codec = get_codec()
+        for line in lines:
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                # A torn write from an interrupted run, the participant will simply be processed again
+                continue
+            if isinstance(entry, dict) and "participant_id" in entry:
+                self._entries[entry["participant_id"]] = entry
+        return self._entries
@@ -0,0 +1,96 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# Stage names recorded by the pipeline. Stages can be nested, so the timings of a parent stage include those of
+# its children: "validate" is part of "extract", the processors and "lcs" are part of "transform", and
+# "serialize" and "write" are part of "load". Processor stages are recorded as "process.<file type>" (and
+# "merge.<file type>" for multi-file types), summed over the files of that type.
+EXTRACT = "extract"
+VALIDATE = "validate"
+TRANSFORM = "transform"
+PROCESS = "process"
+MERGE = "merge"
+LCS = "lcs"
+LOAD = "load"
+SERIALIZE = "serialize"
+WRITE = "write"
+TOTAL = "total"
+
+# A callback receiving the participant ID and its stage timings in seconds once the participant is processed
+TimingsHook = Callable[[str, Dict[str, float]], None]
+# A callback receiving the input file and the name of each top-level stage (extract, transform, load) as it starts
+ProgressHook = Callable[[str, str], None]
+
+
+class StageTimings:
+    """
+    Per-stage wall clock timings of one participant, measured with a monotonic clock.
+
+    A stage measured several times (e.g. a processor run once per lane) accumulates its durations.
+
+    Attributes:
+        stages (Dict[str, float]): The duration of each stage in seconds, in the order the stages were first seen.
+
+    Methods:
+        measure(stage: str):
+            Context manager that adds the duration of its block to a stage.
+        add(stage: str, seconds: float) -> None:
+            Adds a duration to a stage.
+        update(stages: Dict[str, float], suffix: str = None) -> None:
+            Adds the durations of other timings, e.g. those returned by a worker process.
+        as_dict() -> Dict[str, float]:
+            Returns a copy of the stage durations.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Adds the duration of the block to a stage, even if the block raises.
+
+        :param stage: The stage name.
+        :type stage: str
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        Adds a duration to a stage.
+
+        :param stage: The stage name.
+        :type stage: str
+        :param seconds: The duration in seconds.
+        :type seconds: float
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def update(self, stages: Dict[str, float], suffix: Optional[str] = None) -> None:
+        """
+        Adds the durations of other timings.
+
+        :param stages: The durations to add, by stage name.
+        :type stages: Dict[str, float]
+        :param suffix: A suffix appended to the processor stages ("process" and "merge"), e.g. the file
+            type they belong to. (optional)
+        :type suffix: str
+        """
+        for stage, seconds in stages.items():
+            if suffix and stage in (PROCESS, MERGE):
+                stage = f"{stage}.{suffix}"
+            self.add(stage, seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Returns a copy of the stage durations in seconds.
+
+        :return: The duration of each stage.
+        :rtype: Dict[str, float]
+        """
+        return dict(self.stages)
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from utils.json_codec import get_codec
+
+
+class Span:
+    """
+    A named, timed section of a pipeline run, recorded as a Chrome Trace "complete" event when it ends.
+
+    Methods:
+        set(**attributes) -> None:
+            Adds attributes to the span, e.g. values only known once the section ran.
+    """
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._start = 0
+
+    def set(self, **attributes: Any) -> None:
+        self._attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._attributes["error"] = f"{exc_type.__name__}: {exc_value}"
+        self._tracer.add({
+            "name": self._name,
+            "cat": "etl",
+            "ph": "X",
+            "ts": self._start / 1000,
+            "dur": (end - self._start) / 1000,
+            "pid": self._tracer.pid,
+            "tid": threading.get_native_id(),
+            "args": self._attributes,
+        })
+
+
+class _NoSpan:
+    """
+    The span returned while tracing is off. It records nothing, and a single instance is reused.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """
+    Collects the spans of one process and exports them in the Chrome Trace Event format.
+
+    Timestamps come from the system-wide monotonic clock, so the spans recorded in worker processes and merged
+    into the parent tracer line up with the parent's spans in the trace viewer (chrome://tracing or Perfetto).
+
+    Attributes:
+        pid (int): The process the tracer records spans of.
+        events (List[Dict]): The recorded trace events.
+
+    Methods:
+        add(event: Dict) -> None:
+            Records a trace event.
+        extend(events: List[Dict]) -> None:
+            Records trace events from another process.
+        export(path: str) -> None:
+            Writes the trace to a Chrome Trace Event JSON file.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, event: Dict) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def extend(self, events: List[Dict]) -> None:
+        with self._lock:
+            self.events.extend(events)
+
+    def export(self, path: str) -> None:
+        """
+        Writes the trace to a Chrome Trace Event JSON file, naming the parent and worker processes.
+
+        :param path: The output file.
+        :type path: str
+        """
+        with self._lock:
+            events = list(self.events)
+        pids = sorted({event["pid"] for event in events} | {self.pid})
+        names = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+             "args": {"name": "etl" if pid == self.pid else f"worker {pid}"}}
+            for pid in pids
+        ]
+        get_codec().dump_file({"traceEvents": names + events, "displayTimeUnit": "ms"}, path)
+
+
+# The tracer of the current run, None while tracing is off
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **attributes: Any):
+    """
+    Returns a context manager timing a section of the pipeline as a span.
+
+    While tracing is off this returns a shared no-op object, so instrumented code only pays for a global lookup.
+
+    :param name: The span name.
+    :type name: str
+    :param attributes: Attributes shown with the span in the trace viewer.
+    :return: The span context manager.
+    """
+    if _tracer is None:
+        return _NO_SPAN
+    return Span(_tracer, name, attributes)
+
+
+def enable() -> Tracer:
+    """
+    Turns tracing on in this process with a new tracer.
+
+    :return: The tracer recording the spans.
+    :rtype: Tracer
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """
+    Turns tracing off.
+
+    :return: The tracer that was recording, if any.
+    :rtype: Tracer
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether tracing is on in this process.
+    """
+    return _tracer is not None and _tracer.pid == os.getpid()
+
+
+def add_events(events: List[Dict]) -> None:
+    """
+    Records the trace events returned by a worker process, if tracing is on.
+
+    :param events: The trace events.
+    :type events: List[Dict]
+    """
+    if events and _tracer is not None:
+        _tracer.extend(events)
+
+
+@contextmanager
+def collect(enabled: bool) -> Iterator[List[Dict]]:
+    """
+    Collects the spans of a task that may run in a worker process, so they can be returned to the parent.
+
+    When the task runs in the process that owns the tracer (serial and thread executors), its spans are recorded
+    directly and the yielded list stays empty. In a worker process, a tracer is installed for the duration of the
+    task if `enabled`, and its events are yielded; a tracer inherited from the parent by fork is never used.
+
+    :param enabled: Whether tracing was on when the task was submitted.
+    :type enabled: bool
+    :return: The list the events to return to the parent are collected in.
+    """
+    global _tracer
+    previous = _tracer
+    if (previous is not None and previous.pid == os.getpid()) or (previous is None and not enabled):
+        yield []
+        return
+
+    _tracer = Tracer() if enabled else None
+    try:
+        yield _tracer.events if enabled else []
+    finally:
+        _tracer = previous
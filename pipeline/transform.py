@@ -1,6 +1,100 @@
 from pipeline.processors.file_processor_factory import FileProcessorFactory
+from pipeline.processors.file_processor import AbstractFileProcessor
+from pipeline import counters as work, executors, timings, tracing
+from pipeline.counters import WorkCounters
+from pipeline.timings import StageTimings
+from pipeline.result_cache import ResultCache
+from utils.directory_snapshot import DirectorySnapshot
+from utils.file_hash import file_sha256
+from concurrent.futures import Future
 import os
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, NamedTuple, Tuple, Optional
+
+# Where each file type is processed by default: metadata parsing is I/O and parse bound and runs on a thread,
+# overlapping the DNA analysis in the calling thread. No worker process is started for a single participant.
+# Other types are processed in the calling thread.
+DEFAULT_EXECUTORS = {"json": executors.THREAD, "txt": executors.SERIAL}
+# Where each file type is processed when many participants are processed at the same time in one process (the
+# GUI, the service, the asyncio manager): the CPU bound DNA analysis runs in the shared worker processes, which
+# are started once and kept for the following participants.
+BATCH_EXECUTORS = {"json": executors.THREAD, "txt": executors.PROCESS}
+
+
+class ProcessorOutput(NamedTuple):
+    """
+    The output of a processor task together with what it measured, returned from the executor.
+
+    Attributes:
+        value (Any): The processed data.
+        timings (Dict[str, float]): The stage timings of the task.
+        counters (Dict[str, int]): The work counters of the task.
+        events (List[Dict]): The trace events recorded in a worker process, empty if the task ran in this process.
+    """
+    value: Any
+    timings: Dict[str, float]
+    counters: Dict[str, int]
+    events: List[Dict]
+
+
+def _run_processor(processor: AbstractFileProcessor, traced: bool = False) -> ProcessorOutput:
+    """
+    Runs a processor. Module level so it can be sent to worker processes.
+
+    :param processor: The processor to run.
+    :type processor: AbstractFileProcessor
+    :param traced: Whether tracing was on when the processor was submitted. (optional)
+    :type traced: bool
+    :return: The processed data with the processor's timings, counters and trace events.
+    :rtype: ProcessorOutput
+    """
+    with tracing.collect(traced) as events:
+        with tracing.span("process", processor=type(processor).__name__, file=processor.file_path):
+            with processor.timings.measure(timings.PROCESS):
+                result = processor.process()
+    return ProcessorOutput(result, processor.timings.as_dict(), processor.counters.as_dict(), events)
+
+
+def _run_processor_part(processor: AbstractFileProcessor, traced: bool = False) -> ProcessorOutput:
+    """
+    Runs a processor on one file of a multi-file participant. Module level so it can be sent to worker processes.
+
+    :param processor: The processor to run.
+    :type processor: AbstractFileProcessor
+    :param traced: Whether tracing was on when the processor was submitted. (optional)
+    :type traced: bool
+    :return: The partial result of the file with the processor's timings, counters and trace events.
+    :rtype: ProcessorOutput
+    """
+    with tracing.collect(traced) as events:
+        with tracing.span("process_part", processor=type(processor).__name__, file=processor.file_path):
+            with processor.timings.measure(timings.PROCESS):
+                result = processor.process_part()
+    return ProcessorOutput(result, processor.timings.as_dict(), processor.counters.as_dict(), events)
+
+
+def _merge_parts(
+        processor_class: type, file_paths: List[str], parts: List[Dict], traced: bool = False) -> ProcessorOutput:
+    """
+    Merges the partial results of the files of one type. Module level so it can be sent to worker processes.
+
+    :param processor_class: The processor class of the files.
+    :type processor_class: type
+    :param file_paths: The paths of the files, in processing order.
+    :type file_paths: List[str]
+    :param parts: The partial result of each file, in the same order.
+    :type parts: List[Dict]
+    :param traced: Whether tracing was on when the merge was submitted. (optional)
+    :type traced: bool
+    :return: The merged result with the timings, counters and trace events of the merge.
+    :rtype: ProcessorOutput
+    """
+    merge_timings = StageTimings()
+    merge_counters = WorkCounters()
+    with tracing.collect(traced) as events:
+        with tracing.span("merge", processor=processor_class.__name__, files=len(file_paths)):
+            with merge_timings.measure(timings.MERGE):
+                result = processor_class.merge(file_paths, parts, merge_timings, merge_counters)
+    return ProcessorOutput(result, merge_timings.as_dict(), merge_counters.as_dict(), events)
 
 
 class Transformer:
@@ -10,9 +104,26 @@ class Transformer:
     This class takes in a list of file names and input data, processes each file using the appropriate
     processor, and transforms the data based on the file type (e.g., CSV, JSON, etc.).
 
+    The processors of all files are submitted to shared executors and run concurrently, so the per-participant
+    latency is roughly that of the slowest file rather than the sum of all of them. When a participant has
+    several files of one type (e.g. one DNA file per sequencing lane), each file is processed in parallel and
+    the partial results are merged by the processor class into a single result for that type.
+
+    With a result cache, the output of each processor is looked up by the content hash of its file(s), the
+    processor name and the processor version, and `process()` is skipped entirely on a hit. For multi-file
+    types the per-file parts are cached too, so when one lane changes only that lane is reprocessed before
+    the merge.
+
     Attributes:
         files (List[str]): A list of file names to be processed.
         input_data (dict): A dictionary containing the context path and other necessary data for processing files.
+        executors (Dict[str, str]): The executor kind ("serial", "thread" or "process") used per file extension.
+        cache (ResultCache): An optional cache of processor outputs.
+        timings (StageTimings): The durations of the processors ("process.<type>", "merge.<type>") and their
+        inner stages (e.g. "lcs"), collected from the executors. Cached outputs add no timings.
+        counters (WorkCounters): The work counters of the processors, collected from the executors.
+        snapshot (DirectorySnapshot): The listing of the context directory taken by the extraction, whose file
+        sizes are counted as the bytes read.
 
     Methods:
         transform_data() -> Dict:
@@ -23,7 +134,9 @@ class Transformer:
             based on the file's extension.
     """
 
-    def __init__(self, files: List[str], input_data: Dict) -> None:
+    def __init__(
+            self, files: List[str], input_data: Dict, executors: Optional[Dict[str, str]] = None,
+            cache: Optional[ResultCache] = None, snapshot: Optional[DirectorySnapshot] = None) -> None:
         """
         Initialize the Transform class with a list of files and input data.
 
@@ -31,30 +144,185 @@ class Transformer:
         :type files: List[str]
         :param input_data: A dictionary containing the context path and other configuration data for processing.
         :type input_data: dict
+        :param executors: The executor kind per file extension, overriding `DEFAULT_EXECUTORS`. Extensions
+            without an entry are processed in the calling thread. (optional)
+        :type executors: Dict[str, str]
+        :param cache: A cache of processor outputs keyed by file content hash. (optional)
+        :type cache: ResultCache
+        :param snapshot: The listing of the context directory, to take the file sizes from instead of statting
+            each file. (optional)
+        :type snapshot: DirectorySnapshot
         """
         self.files = files
         self.input_data = input_data
+        self.executors = dict(DEFAULT_EXECUTORS)
+        if executors:
+            self.executors.update(executors)
+        self.cache = cache
+        self.snapshot = snapshot
+        self.timings = StageTimings()
+        self.counters = WorkCounters()
+        self._to_cache = []
 
     def transform(self) -> Dict:
         """
         Transforms the data from the provided files using the appropriate processor based on their extensions.
 
-        This method iterates over the list of files, determines the processor based on the file extension,
-        processes each file, and stores the result in `processed_results`.
+        This method groups the files by extension, determines the processor based on the file extension,
+        submits each processor to the executor configured for its extension, and gathers the results.
+        Types with several files are processed per file in parallel and then merged.
 
         :return: A Dict containing the transformed data for each file with the file extensions as the key.
         :rtype: Dict
+        :raises ValueError: If a type has several files and its processor does not support merging them.
         """
-        transformed_data = {}
+        with tracing.span("transform", files=len(self.files)):
+            return self._transform()
+
+    def _transform(self) -> Dict:
+        """
+        Submits the processors, merges multi-file types and gathers the results, see `transform`.
+        """
+        groups, futures = self._submit_groups()
+
+        # Merge the parts of multi-file types once all of their files are processed
+        for file_extension, future in futures.items():
+            if isinstance(future, tuple):
+                result_key, part_futures = future
+                parts = [self._collect(file_extension, part.result()) for part in part_futures]
+                futures[file_extension] = self._submit_merge(file_extension, groups[file_extension], result_key, parts)
+
+        # Gather the results, re-raising the first processor error
+        transformed_data = {
+            file_extension: self._collect(file_extension, future.result()) for file_extension, future in futures.items()
+        }
+
+        # Store the newly computed outputs
+        self._store_outputs()
+
+        return transformed_data
 
+    def _submit_groups(self) -> Tuple[Dict[str, List[AbstractFileProcessor]], Dict[str, Any]]:
+        """
+        Groups the processors by file extension and submits them, or looks up their cached outputs.
+
+        :return: The processors per file extension, and per file extension either the future of its result or,
+            for multi-file types, a (result cache key, part futures) tuple still to be merged.
+        :raises ValueError: If a type has several files and its processor does not support merging them.
+        """
+        # Group the processors by file extension, keeping the file order within each group
+        groups = {}
         for file in self.files:
             # Instantiate the processor with the file path
             processor, file_extension = self._get_processor(file)
+            groups.setdefault(file_extension, []).append(processor)
+            self.counters.add(work.BYTES_READ, self._file_size(file, processor.file_path))
 
-            # Process the file and store the result
-            transformed_data[file_extension] = processor.process()
+        futures = {}
+        self._to_cache = []
+        traced = tracing.is_enabled()
+        for file_extension, processors in groups.items():
+            # Submit the files for processing on the executor configured for their type
+            kind = self._executor_kind(file_extension)
+            processor_class = type(processors[0])
+            if len(processors) > 1 and not processor_class.supports_multiple_files:
+                raise ValueError(
+                    f"Found {len(processors)} '{file_extension}' files, "
+                    f"but {processor_class.__name__} supports only one file per participant.")
 
-        return transformed_data
+            content_hashes = [file_sha256(p.file_path) for p in processors] if self.cache is not None else []
+            result_key = self._cache_key(content_hashes, processor_class, "result")
+            if len(processors) == 1:
+                futures[file_extension] = self._submit(kind, result_key, _run_processor, processors[0], traced)
+                continue
+
+            cached = self._cached(result_key)
+            if cached is not None:
+                futures[file_extension] = cached
+                continue
+            futures[file_extension] = (result_key, [
+                self._submit(kind, self._cache_key(content_hashes[i:i + 1], processor_class, "part"),
+                             _run_processor_part, processor, traced)
+                for i, processor in enumerate(processors)
+            ])
+        return groups, futures
+
+    def _submit_merge(
+            self, file_extension: str, processors: List[AbstractFileProcessor], result_key: Optional[str],
+            parts: List[Dict]) -> Future:
+        """
+        Submits the merge of the partial results of a multi-file type and remembers to cache its output.
+        """
+        future = self._submit(
+            self._executor_kind(file_extension), None, _merge_parts,
+            type(processors[0]), [processor.file_path for processor in processors], parts, tracing.is_enabled())
+        if result_key is not None:
+            self._to_cache.append((result_key, future))
+        return future
+
+    def _store_outputs(self) -> None:
+        """
+        Stores the newly computed processor outputs in the cache.
+        """
+        for key, future in self._to_cache:
+            self.cache.put(key, future.result().value)
+        self._to_cache = []
+
+    def _collect(self, file_extension: str, output: ProcessorOutput) -> Any:
+        """
+        Records the timings, counters and trace events returned with a processor output and returns its value.
+        """
+        self.timings.update(output.timings, suffix=file_extension)
+        self.counters.update(output.counters)
+        tracing.add_events(output.events)
+        return output.value
+
+    def _executor_kind(self, file_extension: str) -> str:
+        """
+        Returns the executor kind configured for a file extension.
+        """
+        return self.executors.get(file_extension, executors.SERIAL)
+
+    def _cache_key(self, content_hashes: List[str], processor_class: type, kind: str) -> Optional[str]:
+        """
+        Returns the cache key of a processor output, or None if caching is disabled.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.key(content_hashes, processor_class.__name__, processor_class.version, kind)
+
+    def _cached(self, cache_key: Optional[str]) -> Optional[Future]:
+        """
+        Returns a completed future holding the cached output for a key (without measurements), or None.
+        """
+        if cache_key is None:
+            return None
+        value = self.cache.get(cache_key)
+        if value is None:
+            return None
+        future = Future()
+        future.set_result(ProcessorOutput(value, {}, {}, []))
+        return future
+
+    def _submit(self, kind: str, cache_key: Optional[str], fn, *args: Any) -> Future:
+        """
+        Returns the cached output for a key if present, otherwise submits the task and remembers to cache its output.
+        """
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return cached
+        future = executors.submit(kind, fn, *args)
+        if cache_key is not None:
+            self._to_cache.append((cache_key, future))
+        return future
+
+    def _file_size(self, file: str, file_path: str) -> int:
+        """
+        Returns the size of a file from the directory snapshot, or stats the file if it is not in the snapshot.
+        """
+        if self.snapshot is not None and file in self.snapshot.entries:
+            return self.snapshot.entry(file).size
+        return os.path.getsize(file_path)
 
     def _get_processor(self, file: str) -> Tuple[FileProcessorFactory, str]:
         """
@@ -75,3 +343,62 @@ class Transformer:
         file_path = os.path.join(self.input_data["context_path"], file)
 
         return FileProcessorFactory.create_processor(file_path, file_extension), file_extension
+
+
+class AsyncTransformer(Transformer):
+    """
+    An asyncio variant of the Transformer.
+
+    Processors are submitted to the same shared executors as the Transformer, but their results are awaited
+    instead of blocking the calling thread, so many participants can be transformed concurrently on one event
+    loop. Hashing, cache lookups and cache writes run on the shared thread pool, and processors configured to
+    run serially are moved to the thread pool so they never run on the event loop.
+
+    Methods:
+        transform() -> Dict:
+            Coroutine that transforms the data from the provided files, like `Transformer.transform`.
+    """
+
+    async def transform(self) -> Dict:
+        """
+        Transforms the data from the provided files using the appropriate processor based on their extensions.
+
+        :return: A Dict containing the transformed data for each file with the file extensions as the key.
+        :rtype: Dict
+        :raises ValueError: If a type has several files and its processor does not support merging them.
+        """
+        with tracing.span("transform", files=len(self.files)):
+            return await self._transform_async()
+
+    async def _transform_async(self) -> Dict:
+        """
+        Submits the processors, merges multi-file types and gathers the results, see `transform`.
+        """
+        import asyncio
+        groups, futures = await executors.run_in_thread(self._submit_groups)
+
+        # Merge the parts of multi-file types once all of their files are processed
+        for file_extension, future in futures.items():
+            if isinstance(future, tuple):
+                result_key, part_futures = future
+                parts = await asyncio.gather(*(asyncio.wrap_future(part) for part in part_futures))
+                parts = [self._collect(file_extension, part) for part in parts]
+                futures[file_extension] = self._submit_merge(file_extension, groups[file_extension], result_key, parts)
+
+        # Gather the results, re-raising the first processor error
+        transformed_data = {}
+        for file_extension, future in futures.items():
+            transformed_data[file_extension] = self._collect(file_extension, await asyncio.wrap_future(future))
+
+        # Store the newly computed outputs
+        if self._to_cache:
+            await executors.run_in_thread(self._store_outputs)
+
+        return transformed_data
+
+    def _executor_kind(self, file_extension: str) -> str:
+        """
+        Returns the executor kind configured for a file extension, running serial work on the thread pool.
+        """
+        kind = super()._executor_kind(file_extension)
+        return executors.THREAD if kind == executors.SERIAL else kind
@@ -0,0 +1,3 @@
+# Version of the pipeline's processing logic. Bump it whenever a change alters the results produced for
+# the same inputs, so incremental runs recompute participants processed by an older version.
+PIPELINE_VERSION = "1.2.0"
@@ -0,0 +1,300 @@
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.json_codec import get_codec
+
+LEDGER_FILE_NAME = ".etl_watch.jsonl"
+INPUT_SUFFIX = "_input.json"
+# Seconds between two checks of the participants of inputs that wait for their files or failed
+DEFAULT_RECHECK = 5.0
+# The participant digest of input files that cannot be read, which settle on their own stat
+UNREADABLE = "unreadable"
+
+# The size and modification time of an input file, compared to notice that it changed
+StatKey = Tuple[int, int]
+
+
+class WatchLedger:
+    """
+    An append-only ledger of the input files handled in watch mode, stored in the watched directory.
+
+    Each line records the name of an input file and its size and modification time when it was processed, so a
+    restarted watch skips the inputs it already handled unless they were rewritten since. A failed input also
+    records the digest of its participant files, so it is retried once they change (e.g. a missing file arrives).
+    Like the run journal, a line is flushed and fsynced once the input is handled and a torn last line is ignored.
+
+    Attributes:
+        ledger_file (str): The path of the ledger file.
+
+    Methods:
+        entry(input_file: str, stat_key: StatKey) -> Optional[Dict]:
+            Returns the entry of an input file if it was handled in its current version.
+        record(input_file: str, stat_key: StatKey, ok: bool, context: str = None) -> None:
+            Durably records a handled input file.
+    """
+
+    def __init__(self, ledger_file: str) -> None:
+        """
+        Initialize the ledger.
+
+        :param ledger_file: The path of the ledger file.
+        :type ledger_file: str
+        """
+        self.ledger_file = ledger_file
+        self._entries = None
+
+    def entry(self, input_file: str, stat_key: StatKey) -> Optional[Dict]:
+        """
+        Returns the entry of an input file if it was handled in its current version.
+
+        :param input_file: The path of the input file.
+        :type input_file: str
+        :param stat_key: The current size and modification time of the input file.
+        :type stat_key: StatKey
+        :return: The entry, with "ok" and for failures "context", or None if the input was not handled or was
+            rewritten since.
+        :rtype: Optional[Dict]
+        """
+        entry = self._load().get(os.path.basename(input_file))
+        if entry is None or tuple(entry["stat"]) != tuple(stat_key):
+            return None
+        return entry
+
+    def record(self, input_file: str, stat_key: StatKey, ok: bool, context: Optional[str] = None) -> None:
+        """
+        Durably appends a handled input file to the ledger.
+
+        :param input_file: The path of the input file.
+        :type input_file: str
+        :param stat_key: The size and modification time of the input file that was processed.
+        :type stat_key: StatKey
+        :param ok: Whether the ETL process succeeded.
+        :type ok: bool
+        :param context: The digest of the participant files that were processed, kept for failures. (optional)
+        :type context: str
+        """
+        entry = {
+            "input_file": os.path.basename(input_file),
+            "stat": list(stat_key),
+            "ok": ok,
+            "completed_at": datetime.now().isoformat(),
+        }
+        if not ok:
+            entry["context"] = context
+        line = get_codec().dumps(entry) + b"\n"
+        with open(self.ledger_file, "a+b") as file:
+            # Start on a fresh line if an interrupted run left a torn entry behind
+            file.seek(0, os.SEEK_END)
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    line = b"\n" + line
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        self._load()[entry["input_file"]] = entry
+
+    def _load(self) -> Dict[str, Dict]:
+        """
+        Reads the ledger once, keeping the last valid entry per input file.
+        """
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            with open(self.ledger_file, "rb") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return self._entries
+
+        codec = get_codec()
+        for line in lines:
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                # A torn write from an interrupted run, the input will simply be processed again
+                continue
+            if isinstance(entry, dict) and "input_file" in entry and "stat" in entry:
+                self._entries[entry["input_file"]] = entry
+        return self._entries
+
+
+class InputWatcher:
+    """
+    Finds the input files of a directory that are ready to be processed.
+
+    Every `poll` scans the directory for `*_input.json` files not yet handled. A new input file is ready once
+    its participant directory exists and holds files, and the input file and every file of its `context_path`
+    stopped changing for `settle` seconds: their sizes and modification times are compared between polls, and
+    any change restarts the wait. This debounces writers that copy a participant file by file, or write the
+    input file before the participant files. An input that cannot be read (e.g. invalid JSON) is still
+    submitted once it is stable, so the ETL process reports its error.
+
+    A failed input is retried when its participant files change, so a participant that was incomplete when it
+    settled is processed again once the rest arrives. Participant directories are not watched for events, so
+    waiting and failed inputs are rechecked every `recheck` seconds.
+
+    Attributes:
+        directory (str): The watched input directory.
+        settle (float): The number of seconds an input must stay unchanged before it is ready.
+        recheck (float): The number of seconds between two checks of the participants of waiting or failed inputs.
+        ledger (WatchLedger): The ledger of handled inputs.
+
+    Methods:
+        poll() -> List[str]:
+            Scans the directory and returns the input files that became ready, each only once.
+        done(input_file: str, ok: bool) -> None:
+            Records an input file returned by poll as handled.
+        next_deadline() -> float:
+            Returns the number of seconds until the directory should be scanned again.
+    """
+
+    def __init__(
+            self, directory: str, settle: float = 2.0, ledger: Optional[WatchLedger] = None,
+            clock: Callable[[], float] = time.monotonic, recheck: float = DEFAULT_RECHECK) -> None:
+        """
+        Initializes the InputWatcher class.
+
+        :param directory: The input directory to watch.
+        :type directory: str
+        :param settle: The number of seconds an input must stay unchanged before it is ready. (optional)
+        :type settle: float
+        :param ledger: The ledger of handled inputs, by default `.etl_watch.jsonl` in the directory. (optional)
+        :type ledger: WatchLedger
+        :param clock: A monotonic clock in seconds. (optional)
+        :type clock: Callable[[], float]
+        :param recheck: The number of seconds between two checks of the participants of waiting or failed
+            inputs. (optional)
+        :type recheck: float
+        :raises ValueError: If the settle time is negative or the recheck interval is not positive.
+        """
+        if settle < 0:
+            raise ValueError(f"The settle time must not be negative: {settle}")
+        if recheck <= 0:
+            raise ValueError(f"The recheck interval must be positive: {recheck}")
+        self.directory = directory
+        self.settle = settle
+        self.recheck = recheck
+        self.ledger = ledger or WatchLedger(os.path.join(directory, LEDGER_FILE_NAME))
+        self._clock = clock
+        # Inputs waiting to settle: their last signature and since when it is unchanged
+        self._pending: Dict[str, Tuple[Tuple, float]] = {}
+        # Inputs returned by poll and not yet done, with the stat key and participant digest they were returned with
+        self._in_flight: Dict[str, Tuple[StatKey, Optional[str]]] = {}
+        # Whether the last poll left inputs whose participant directory is missing or empty, or that failed
+        self._waiting = False
+
+    def poll(self) -> List[str]:
+        """
+        Scans the directory and returns the input files that became ready, in name order. An input file is
+        returned again only if it is rewritten after being handled, or if it failed and its participant files
+        changed since.
+
+        :return: The paths of the ready input files.
+        :rtype: List[str]
+        """
+        now = self._clock()
+        ready = []
+        seen = set()
+        self._waiting = False
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(INPUT_SUFFIX) or entry.path in self._in_flight:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                stat_key = (stat.st_size, stat.st_mtime_ns)
+                handled = self.ledger.entry(entry.path, stat_key)
+                if handled is not None and handled["ok"]:
+                    continue
+
+                if handled is not None and handled.get("context") == UNREADABLE:
+                    # Only a rewrite of the input file itself can fix it
+                    continue
+                context = self._context_signature(entry.path)
+                if handled is not None:
+                    # A failed input is only retried once its participant files changed
+                    self._waiting = True
+                    if context is None or context == handled.get("context"):
+                        continue
+                seen.add(entry.path)
+                if context is None:
+                    # The participant directory is missing or empty, wait for its files
+                    self._waiting = True
+                    self._pending.pop(entry.path, None)
+                    continue
+                signature = (stat_key, context)
+                previous = self._pending.get(entry.path)
+                if previous is None or previous[0] != signature:
+                    self._pending[entry.path] = (signature, now)
+                elif now - previous[1] >= self.settle:
+                    ready.append((entry.path, stat_key, context))
+
+        # Forget inputs that were removed before they settled
+        for path in set(self._pending) - seen:
+            del self._pending[path]
+        for path, stat_key, context in ready:
+            del self._pending[path]
+            self._in_flight[path] = (stat_key, context)
+        return sorted(path for path, _, _ in ready)
+
+    def done(self, input_file: str, ok: bool) -> None:
+        """
+        Records an input file returned by `poll` as handled, so it is not returned again, even after a restart.
+
+        :param input_file: The path of the input file, as returned by `poll`.
+        :type input_file: str
+        :param ok: Whether the ETL process succeeded.
+        :type ok: bool
+        """
+        stat_key, context = self._in_flight.pop(input_file)
+        self.ledger.record(input_file, stat_key, ok, context)
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Returns the number of seconds until the directory should be scanned again: when the earliest pending
+        input could be ready, or after the recheck interval if inputs wait for their participant files. Returns
+        None if only a change of the directory can make an input ready.
+
+        :return: The number of seconds, at least 0.
+        :rtype: float
+        """
+        deadlines = [since + self.settle - self._clock() for _, since in self._pending.values()]
+        if self._waiting:
+            deadlines.append(self.recheck)
+        if not deadlines:
+            return None
+        return max(min(deadlines), 0.0)
+
+    @staticmethod
+    def _context_signature(input_file: str) -> Optional[str]:
+        """
+        Returns a digest of the names, sizes and modification times of the files in the participant directory
+        of an input file, None if the directory is missing or empty, or `UNREADABLE` if the input file cannot
+        be read.
+        """
+        try:
+            context_path = get_codec().load_file(input_file).get("context_path")
+            if not isinstance(context_path, str):
+                return UNREADABLE
+        except (OSError, ValueError, AttributeError):
+            return UNREADABLE
+
+        digest = hashlib.sha256()
+        files = 0
+        try:
+            with os.scandir(context_path) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    stat = entry.stat()
+                    files += entry.is_file()
+                    digest.update(f"file:{entry.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+        except OSError:
+            return None
+        return digest.hexdigest() if files else None
@@ -0,0 +1,52 @@
+import os
+import pytest
+from benchmarks.perf_gate import PerfGate
+
+PERF_BASELINE = os.path.join(os.path.dirname(__file__), "perf_baseline.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance regression gate")
+    group.addoption("--perf", action="store_true", help="Run the benchmarks marked 'perf' against the baseline.")
+    group.addoption("--perf-update", action="store_true",
+                    help="Record the 'perf' benchmarks as the new baseline instead of checking them.")
+    group.addoption("--perf-baseline", type=str, default=PERF_BASELINE,
+                    help="The baseline JSON file of the 'perf' benchmarks (default: tests/perf_baseline.json).")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: benchmark checked against the performance baseline, run with --perf")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--perf") or config.getoption("--perf-update"):
+        return
+    skip = pytest.mark.skip(reason="performance benchmark, run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def perf_gate(request):
+    """
+    The performance gate of the session. In update mode the baseline is written at the end.
+    """
+    config = request.config
+    gate = PerfGate(config.getoption("--perf-baseline"), update=config.getoption("--perf-update"))
+    # Reported in the terminal summary
+    config._perf_gate = gate
+    yield gate
+    if gate.update:
+        gate.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    gate = getattr(config, "_perf_gate", None)
+    if gate is None or not gate.results:
+        return
+    terminalreporter.section("performance")
+    terminalreporter.write_line(f"latest calibration: {gate.calibration * 1e3:.2f} ms")
+    for result in gate.results.values():
+        compared = f"{result.ratio:.2f}x baseline" if result.ratio else "recorded"
+        terminalreporter.write_line(f"{result.name:>40}: {result.relative:10.4f} units, {compared}")
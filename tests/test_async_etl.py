@@ -0,0 +1,188 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+import pytest
+from pipeline.etl_manager import AsyncETLManager, ETLManager
+from pipeline.extract import AsyncExtractor, Extractor
+from pipeline.load import AsyncLoader
+from pipeline.transform import AsyncTransformer, Transformer
+from pipeline.result_cache import ResultCache
+from pipeline.metrics import BatchMetrics
+from pipeline import executors, timings
+from utils.participant_manifest import ParticipantManifest
+from test_etl_manager import _make_input
+
+
+def _result_of(input_file: str) -> dict:
+    input_data = json.loads(Path(input_file).read_text())
+    result_file = next(Path(input_data["results_path"]).glob("*_result.json"))
+    return json.loads(result_file.read_text())
+
+
+class TestAsyncStages:
+
+    def test_extract_matches_sync(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        assert asyncio.run(AsyncExtractor(input_file).extract()) == Extractor(input_file).extract()
+
+    @pytest.mark.parametrize("kind", [executors.SERIAL, executors.PROCESS])
+    def test_transform_matches_sync(self, tmp_path, kind):
+        files, _, input_data = Extractor(_make_input(tmp_path)).extract()
+        Path(input_data["context_path"], "lane2_dna.txt").write_text("GGCCATGCGTAC\n")
+        files = files + ["lane2_dna.txt"]
+        expected = Transformer(files, input_data, {"txt": executors.SERIAL}).transform()
+        assert asyncio.run(AsyncTransformer(files, input_data, {"txt": kind}).transform()) == expected
+
+    def test_transform_with_cache(self, tmp_path):
+        files, _, input_data = Extractor(_make_input(tmp_path)).extract()
+        cache = ResultCache(str(tmp_path / "cache"))
+        first = asyncio.run(AsyncTransformer(files, input_data, cache=cache).transform())
+        assert asyncio.run(AsyncTransformer(files, input_data, cache=cache).transform()) == first
+        assert cache.hits == 2
+
+    def test_load(self, tmp_path):
+        output_file = tmp_path / "result.json"
+        asyncio.run(AsyncLoader(str(tmp_path)).load({"a": 1}, str(output_file)))
+        assert json.loads(output_file.read_text()) == {"a": 1}
+
+
+class TestAsyncETLManager:
+
+    def test_process_matches_sync(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        ETLManager().process(input_file)
+        expected = _result_of(input_file)
+
+        assert asyncio.run(AsyncETLManager().process(input_file)) is True
+        assert _result_of(input_file)["results"] == expected["results"]
+
+    def test_process_error_is_wrapped(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="ETL process failed"):
+            asyncio.run(AsyncETLManager().process(str(tmp_path / "missing.json")))
+
+    def test_missing_txt_file_fails(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        context_path = Path(json.loads(Path(input_file).read_text())["context_path"])
+        (context_path / f"{context_path.name}_dna.txt").unlink()
+        with pytest.raises(ValueError, match=r"No \.txt file"):
+            asyncio.run(AsyncETLManager().process(input_file))
+
+    def test_incremental_skip(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        manager = AsyncETLManager(incremental=True)
+        assert asyncio.run(manager.process(input_file)) is True
+        assert asyncio.run(manager.process(input_file)) is False
+
+    def test_manifest_is_queried_off_the_event_loop(self, tmp_path, monkeypatch):
+        input_file = _make_input(tmp_path)
+        context_path = json.loads(Path(input_file).read_text())["context_path"]
+        # Old enough directories are trusted by the manifest without listing them again
+        for directory in (context_path, tmp_path):
+            past = os.stat(directory).st_mtime - 60
+            os.utime(directory, (past, past))
+        query_threads = []
+        for name in ("snapshot_for_input", "file_hashes"):
+            query = getattr(ParticipantManifest, name)
+
+            def record(self, *args, query=query):
+                query_threads.append(threading.current_thread())
+                return query(self, *args)
+
+            monkeypatch.setattr(ParticipantManifest, name, record)
+
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(tmp_path))
+            manager = AsyncETLManager(manifest, incremental=True)
+            assert asyncio.run(manager.process(input_file)) is True
+            assert asyncio.run(manager.process(input_file)) is False
+
+        assert len(query_threads) == 4
+        assert threading.main_thread() not in query_threads
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_process_many(self, tmp_path, ordered):
+        input_files = [_make_input(tmp_path) for _ in range(6)]
+        input_files.insert(3, _make_input(tmp_path, valid=False))
+
+        async def collect():
+            manager = AsyncETLManager(max_concurrency=2)
+            return [result async for result in manager.process_many(input_files, ordered=ordered)]
+
+        results = asyncio.run(collect())
+        if ordered:
+            assert [result.input_file for result in results] == input_files
+        assert sorted(result.input_file for result in results) == sorted(input_files)
+        failed = [result for result in results if not result.ok]
+        assert [result.input_file for result in failed] == [input_files[3]]
+        assert failed[0].error_type == "ValueError"
+
+    def test_concurrency_limit(self, tmp_path, monkeypatch):
+        input_files = [_make_input(tmp_path) for _ in range(6)]
+        running = []
+        peak = []
+        original = AsyncExtractor.extract
+
+        async def tracking(self):
+            running.append(self)
+            peak.append(len(running))
+            try:
+                return await original(self)
+            finally:
+                running.remove(self)
+
+        monkeypatch.setattr(AsyncExtractor, "extract", tracking)
+
+        async def run_all():
+            manager = AsyncETLManager(max_concurrency=3)
+            return await asyncio.gather(*(manager.process(input_file) for input_file in input_files))
+
+        assert asyncio.run(run_all()) == [True] * 6
+        assert max(peak) <= 3
+
+    def test_timings_hook(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        calls = []
+        manager = AsyncETLManager(include_timings=True, hooks=[lambda *args: calls.append(args)])
+        assert asyncio.run(manager.process(input_file)) is True
+
+        [(participant_id, stage_timings)] = calls
+        assert {"extract", "validate", "transform", "lcs", "serialize", "write", "total"} <= set(stage_timings)
+        assert "transform" in _result_of(input_file)["metadata"]["timings"]
+
+    def test_results_match_sync(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(2)] + [_make_input(tmp_path, valid=False)]
+        expected = list(ETLManager().process_many(input_files, workers=1))
+
+        async def collect():
+            manager = AsyncETLManager()
+            return [result async for result in manager.process_many(input_files)]
+
+        results = asyncio.run(collect())
+        assert [result[:6] for result in results] == [result[:6] for result in expected]
+        assert [result.counters for result in results] == [result.counters for result in expected]
+        assert all(timings.TOTAL in result.timings for result in results[:2])
+
+    def test_metrics_and_progress(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(2)]
+        metrics = BatchMetrics(str(tmp_path / "etl.prom"), interval=3600)
+        stages = []
+        manager = AsyncETLManager(metrics=metrics, progress=lambda *args: stages.append(args))
+
+        async def run_all():
+            return await asyncio.gather(*(manager.process(input_file) for input_file in input_files))
+
+        assert asyncio.run(run_all()) == [True, True]
+        for input_file in input_files:
+            assert [stage for file, stage in stages if file == input_file] == [
+                timings.EXTRACT, timings.TRANSFORM, timings.LOAD]
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(manager.process(str(tmp_path / "missing.json")))
+        rendered = metrics.render()
+        assert 'etl_participants_total{outcome="processed"} 2' in rendered
+        assert 'etl_failures_total{error_type="FileNotFoundError"} 1' in rendered
+
+    def test_invalid_concurrency_limit(self):
+        with pytest.raises(ValueError, match="concurrency limit"):
+            AsyncETLManager(max_concurrency=0)
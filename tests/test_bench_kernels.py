@@ -0,0 +1,43 @@
+import pytest
+from benchmarks import bench_kernels
+
+
+class TestKernelBenchmarks:
+
+    def test_scaling_exponent(self):
+        points = [{"size": n, "seconds_per_op": 3e-6 * n ** 2} for n in (10, 20, 40)]
+        assert bench_kernels.scaling_exponent(points) == pytest.approx(2.0)
+        assert bench_kernels.scaling_exponent(points[:1]) is None
+
+    def test_quick_suite(self):
+        lines = []
+        results = bench_kernels.run_suite(quick=True, min_time=0.001, repeat=1, report=lines.append)
+
+        assert results["engine"] == "python"
+        assert list(results["kernels"]) == [kernel.name for kernel in bench_kernels.KERNELS]
+        for kernel in bench_kernels.KERNELS:
+            measured = results["kernels"][kernel.name]
+            assert [point["size"] for point in measured["points"]] == list(kernel.quick_sizes)
+            assert all(point["ops_per_sec"] > 0 for point in measured["points"])
+            assert measured["scaling_exponent"] is not None
+        assert len(lines) == 3 * len(bench_kernels.KERNELS)
+
+    def test_mutating_kernel_gets_fresh_arguments(self):
+        [kernel] = [kernel for kernel in bench_kernels.KERNELS if kernel.name == "remove_sensitive_data"]
+        seen = []
+
+        def call(processor, data):
+            seen.append(sum(key.startswith("_") for section in data.values() for key in section))
+            processor._remove_sensitive_data(data)
+
+        processor = bench_kernels.MetadataJsonProcessor("benchmark")
+        bench_kernels.time_kernel(kernel._replace(call=call), processor, 20, min_time=0.001, repeat=2)
+        assert len(seen) > 2 and all(count == seen[0] > 0 for count in seen)
+
+    def test_compare(self):
+        point = {"size": 10, "loops": 1, "seconds_per_op": 0.5, "ops_per_sec": 2.0}
+        first = {"engine": "python", "kernels": {"gc_content": {"points": [point]}}}
+        second = {"engine": "fast", "kernels": {"gc_content": {"points": [dict(point, ops_per_sec=8.0)]}}}
+        table = bench_kernels.compare([first, second])
+        assert "fast" in table.splitlines()[0]
+        assert "4.0x)" in table.splitlines()[1]
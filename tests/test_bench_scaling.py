@@ -0,0 +1,42 @@
+from benchmarks import bench_scaling
+from pipeline.etl_manager import ETLResult
+from utils.cohort_generator import generate_cohort
+
+
+class TestScalingBenchmark:
+
+    def test_worker_counts(self):
+        assert bench_scaling.worker_counts(1) == [1]
+        assert bench_scaling.worker_counts(8) == [1, 2, 4, 8]
+        assert bench_scaling.worker_counts(6) == [1, 2, 4, 6]
+
+    def test_percentile(self):
+        values = list(range(100, 0, -1))
+        assert [bench_scaling.percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+        assert bench_scaling.percentile([3.0], 99) == 3.0
+
+    def test_run_scaling(self, tmp_path):
+        input_files = generate_cohort(str(tmp_path), 6, seed=1)
+        lines = []
+        results = bench_scaling.run_scaling(input_files, [1, 2], report=lines.append)
+
+        assert [run["workers"] for run in results["runs"]] == [1, 2]
+        for run in results["runs"]:
+            assert run["participants"] == 6 and run["failed"] == 0
+            assert run["participants_per_sec"] > 0 and run["mb_per_sec"] > 0
+            assert 0 < run["p50_latency_ms"] <= run["p95_latency_ms"] <= run["p99_latency_ms"]
+            assert run["peak_rss_parent_mb"] > 0
+        assert results["runs"][0]["speedup"] == 1.0
+        assert len(lines) == 3
+
+    def test_skipped_participants_are_not_failures(self, monkeypatch):
+        class Manager:
+
+            def process_many(self, input_files, workers, ordered):
+                yield ETLResult("a.json", True, True, timings={"total": 1.0}, counters={})
+                yield ETLResult("b.json", True, False)
+                yield ETLResult("c.json", False, False, "bad", "ValueError")
+
+        monkeypatch.setattr(bench_scaling, "ETLManager", Manager)
+        run = bench_scaling.run_config(["a.json", "b.json", "c.json"], 1)
+        assert run["participants"] == 1 and run["failed"] == 1
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+import pytest
+from pipeline.etl_manager import ETLManager
+from utils.cohort_generator import CohortConfig, generate_cohort
+
+
+def _tree(root: Path) -> dict:
+    return {str(path.relative_to(root)): path.read_bytes() for path in root.rglob("*") if path.is_file()}
+
+
+class TestCohortGenerator:
+
+    def test_deterministic_across_workers_and_ranges(self, tmp_path):
+        config = CohortConfig(reads_min=1, reads_max=3)
+        generate_cohort(str(tmp_path / "a"), 1200, config, seed=7)
+        generate_cohort(str(tmp_path / "b"), 1200, config, seed=7, workers=2)
+        generate_cohort(str(tmp_path / "c"), 700, config, seed=7)
+        generate_cohort(str(tmp_path / "c"), 500, config, seed=7, start=700)
+
+        # Input files hold absolute paths, so compare the participant directories only
+        expected = _tree(tmp_path / "a" / "participants")
+        assert len(expected) == 2400
+        assert _tree(tmp_path / "b" / "participants") == expected
+        assert _tree(tmp_path / "c" / "participants") == expected
+
+        other = generate_cohort(str(tmp_path / "d"), 3, config, seed=8)
+        assert not {Path(path).name.split("_")[0] for path in other} & {name.split("/")[0] for name in expected}
+
+    def test_cohort_shape(self, tmp_path):
+        config = CohortConfig(
+            reads_min=5, reads_max=5, length_mean=40, length_sd=0, gc_content=1.0, motif_rate=0.0, lanes=2,
+            metadata_depth=3, metadata_width=2, sensitive_keys=4)
+        [input_file] = generate_cohort(str(tmp_path), 1, config)
+
+        input_data = json.loads(Path(input_file).read_text())
+        context_path = Path(input_data["context_path"])
+        lanes = sorted(context_path.glob("*_lane*_dna.txt"))
+        assert len(lanes) == 2
+        reads = lanes[0].read_text().split()
+        assert len(reads) == 5 and all(len(read) == 40 and set(read) <= set("GC") for read in reads)
+
+        metadata = json.loads(next(context_path.glob("*_dna.json")).read_text())
+        assert set(metadata) == {"test_metadata", "individual_metadata", "section_0", "section_1"}
+        deepest = metadata["section_0"]["level_1"]["level_2"]
+        assert "field_1" in deepest and "level_3" not in deepest
+        assert json.dumps(metadata).count('"_private_') == 4
+
+    def test_motifs_and_repeats(self, tmp_path):
+        config = CohortConfig(reads_min=20, reads_max=20, motif_rate=1.0, motif_count=1, motif_length=16,
+                              repeat_rate=0.5)
+        [input_file] = generate_cohort(str(tmp_path), 1, config)
+        context_path = Path(json.loads(Path(input_file).read_text())["context_path"])
+        reads = next(context_path.glob("*_dna.txt")).read_text().split()
+
+        assert len(set(reads)) < len(reads)
+        motif = reads[0]
+        common = [motif[i:i + 16] for i in range(len(motif) - 15)]
+        assert any(all(window in read for read in reads) for window in common)
+
+    def test_generated_participants_are_valid(self, tmp_path):
+        input_files = generate_cohort(str(tmp_path), 4, CohortConfig(lanes=2), seed=3)
+        results = list(ETLManager().process_many(input_files, workers=1))
+        assert all(result.processed for result in results), [result.error for result in results]
+
+    @pytest.mark.parametrize("config", [
+        CohortConfig(reads_min=0), CohortConfig(length_min=5, length_max=4), CohortConfig(gc_content=1.5),
+        CohortConfig(lanes=0), CohortConfig(metadata_depth=-1),
+    ])
+    def test_invalid_config(self, tmp_path, config):
+        with pytest.raises(ValueError):
+            generate_cohort(str(tmp_path), 1, config)
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import pytest
+from pipeline import executors
+from pipeline.etl_manager import ETLManager
+from ui.daemon import client
+from ui.daemon.daemon import ETLDaemon
+from utils.cohort_generator import generate_cohort
+
+
+@pytest.fixture(params=[1, 2], ids=["in_process", "worker_pool"])
+def service(request, tmp_path):
+    daemon = ETLDaemon(str(tmp_path / "etl.sock"), workers=request.param)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    assert daemon.wait_ready(30)
+    yield daemon
+    daemon.shutdown()
+    thread.join(30)
+    assert not os.path.exists(daemon.socket_path)
+    assert executors._process_start_method is None
+
+
+class TestETLDaemon:
+
+    def test_job_streams_results(self, service, tmp_path):
+        input_files = generate_cohort(str(tmp_path / "cohort"), 3, seed=2)
+        with open(input_files[2]) as file:
+            payload = json.load(file)
+
+        events = list(client.submit(service.socket_path, input_files[:2], [payload], timeout=60))
+
+        assert events[0] == {"event": "accepted", "job": 1, "inputs": 3}
+        assert events[-1] == {"event": "done", "job": 1, "inputs": 3, "failed": 0}
+        results = events[1:-1]
+        assert sorted(result["input_file"] for result in results) == sorted(input_files[:2] + ["payload:0"])
+        assert all(result["ok"] and result["processed"] for result in results)
+        [inline] = [result for result in results if result["input_file"] == "payload:0"]
+        assert os.path.exists(os.path.join(payload["results_path"], f"{inline['participant_id']}_result.json"))
+        # The inline document was removed with its job
+        assert os.listdir(service._payload_dir) == []
+
+    def test_failures_and_status(self, service, tmp_path):
+        events = list(client.submit(service.socket_path, [str(tmp_path / "missing.json")], timeout=60))
+        assert events[1]["ok"] is False and events[1]["error_type"] == "FileNotFoundError"
+        assert events[-1]["failed"] == 1
+
+        [status] = client.request(service.socket_path, {"command": "status"}, timeout=10)
+        assert status["jobs"] == 1 and status["participants"] == 1 and status["workers"] == service.workers
+
+    def test_invalid_requests(self, service):
+        [error] = client.request(service.socket_path, {"inputs": ["relative.json"]}, timeout=10)
+        assert error == {
+            "event": "error", "error": "Input paths must be absolute: relative.json", "error_type": "ValueError"}
+        [error] = client.request(service.socket_path, {"command": "restart"}, timeout=10)
+        assert error["error"] == "Unknown command: restart"
+
+    def test_unexpected_job_error(self, service, tmp_path, monkeypatch):
+        def process_many(*args, **kwargs):
+            raise RuntimeError("The pool broke")
+            yield
+
+        monkeypatch.setattr(ETLManager, "process_many", process_many)
+        events = list(client.request(service.socket_path, {"inputs": [str(tmp_path / "a_input.json")]}, timeout=10))
+        assert events[-1] == {"event": "error", "error": "The pool broke", "error_type": "RuntimeError"}
+        # The service keeps serving
+        [status] = client.request(service.socket_path, {"command": "status"}, timeout=10)
+        assert status["jobs"] == 1
+
+    def test_workers_are_not_forked(self, service):
+        assert executors._process_start_method == executors.THREAD_SAFE_START_METHOD
+        if service._pool is not None:
+            assert service._pool._mp_context.get_start_method() == executors.THREAD_SAFE_START_METHOD
+
+    def test_second_service_on_same_socket(self, service):
+        with pytest.raises(RuntimeError, match="already listening"):
+            ETLDaemon(service.socket_path).serve_forever()
+
+
+def test_client_without_service(tmp_path):
+    with pytest.raises(ConnectionError, match="No ETL service"):
+        list(client.submit(str(tmp_path / "etl.sock"), ["input.json"]))
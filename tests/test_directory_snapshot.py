@@ -0,0 +1,106 @@
+import os
+import uuid
+import pytest
+from pathlib import Path
+from utils.directory_snapshot import DirectorySnapshot
+from utils.input_validation import InputValidator
+from pipeline.extract import Extractor
+
+
+class TestDirectorySnapshot:
+
+    def test_scan_caches_files_sizes_and_mtimes(self, tmp_path):
+        (tmp_path / "b.txt").write_text("ACGT")
+        (tmp_path / "a.json").write_text("{}")
+        (tmp_path / "sub").mkdir()
+
+        snapshot = DirectorySnapshot.scan(str(tmp_path))
+
+        assert snapshot.files() == ["a.json", "b.txt"]
+        assert snapshot.entry("b.txt").size == 4
+        assert snapshot.entry("b.txt").mtime == os.stat(tmp_path / "b.txt").st_mtime
+        assert snapshot.entry("sub").is_dir
+        assert not snapshot.entry("sub").is_file
+        assert snapshot.total_size() == 6
+        assert snapshot.mtime == os.stat(tmp_path).st_mtime
+
+    def test_files_filtered_by_extension(self, tmp_path):
+        (tmp_path / "a.txt").touch()
+        (tmp_path / "a.csv").touch()
+        snapshot = DirectorySnapshot.scan(str(tmp_path))
+        assert snapshot.files(["txt", "json"]) == ["a.txt"]
+
+    def test_snapshot_does_not_see_later_changes(self, tmp_path):
+        snapshot = DirectorySnapshot.scan(str(tmp_path))
+        (tmp_path / "late.txt").touch()
+        assert "late.txt" not in snapshot
+        assert snapshot.files() == []
+
+    def test_dangling_symlink_is_not_a_file(self, tmp_path):
+        os.symlink(tmp_path / "missing.txt", tmp_path / "link.txt")
+        snapshot = DirectorySnapshot.scan(str(tmp_path))
+        assert snapshot.files() == []
+
+    def test_scan_missing_directory(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            DirectorySnapshot.scan(str(tmp_path / "missing"))
+
+    def test_scan_file_is_not_a_directory(self, tmp_path):
+        (tmp_path / "a.txt").touch()
+        with pytest.raises(NotADirectoryError):
+            DirectorySnapshot.scan(str(tmp_path / "a.txt"))
+
+
+class TestSharedSnapshot:
+
+    def _make_participant(self, tmp_path):
+        participant_id = str(uuid.uuid4())
+        context_path = Path(tmp_path) / participant_id
+        results_path = context_path / "out"
+        results_path.mkdir(parents=True)
+        (context_path / f"{participant_id}_dna.txt").write_text("ACGT\n")
+        (context_path / f"{participant_id}_dna.json").write_text("{}")
+        input_file = Path(tmp_path) / f"{participant_id}_input.json"
+        input_file.write_text(
+            f'{{"context_path": "{context_path}", "results_path": "{results_path}"}}'
+        )
+        return participant_id, context_path, input_file
+
+    def test_validator_reuses_given_snapshot(self, tmp_path):
+        participant_id, context_path, input_file = self._make_participant(tmp_path)
+        snapshot = DirectorySnapshot.scan(str(context_path))
+        validator = InputValidator(
+            {"context_path": str(context_path), "results_path": str(context_path / "out")},
+            ["txt", "json"], snapshot=snapshot)
+        validator.validate()
+        assert validator.snapshot is snapshot
+
+    def test_validator_rescans_a_snapshot_of_another_directory(self, tmp_path):
+        participant_id, context_path, input_file = self._make_participant(tmp_path)
+        stale = DirectorySnapshot.scan(str(tmp_path))
+        validator = InputValidator(
+            {"context_path": str(context_path), "results_path": str(context_path / "out")},
+            ["txt", "json"], snapshot=stale)
+        validator.validate()
+        assert validator.snapshot is not stale
+        assert validator.snapshot.files() == [f"{participant_id}_dna.json", f"{participant_id}_dna.txt"]
+
+    def test_extractor_shares_the_validator_snapshot(self, tmp_path, monkeypatch):
+        participant_id, context_path, input_file = self._make_participant(tmp_path)
+
+        scans = []
+        original_scan = DirectorySnapshot.scan.__func__
+
+        def counting_scan(cls, path, dir_stat=None):
+            scans.append(path)
+            return original_scan(cls, path, dir_stat)
+
+        monkeypatch.setattr(DirectorySnapshot, "scan", classmethod(counting_scan))
+
+        extractor = Extractor(str(input_file))
+        files, extracted_id, _ = extractor.extract()
+
+        assert files == [f"{participant_id}_dna.json", f"{participant_id}_dna.txt"]
+        assert extracted_id == participant_id
+        assert scans == [str(context_path)]
+        assert extractor.snapshot.path == str(context_path)
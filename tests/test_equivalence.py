@@ -0,0 +1,95 @@
+import pytest
+from benchmarks import equivalence
+from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
+from utils.json_codec import StdlibJsonCodec
+
+TARGETS = {target.name: target for target in equivalence.TARGETS}
+
+
+class PartialCodonProcessor(DNASequenceTxtProcessor):
+    """
+    Counts the incomplete codon at the end of a sequence, unlike the reference.
+    """
+
+    def _codon_frequency(self, sequence):
+        if not sequence:
+            raise ValueError("The sequence cannot be empty.")
+        codon_freq = {}
+        for i in range(0, len(sequence), 3):
+            codon_freq[sequence[i:i + 3]] = codon_freq.get(sequence[i:i + 3], 0) + 1
+        return codon_freq
+
+
+class SortedLcsProcessor(DNASequenceTxtProcessor):
+    """
+    Returns the tied LCS values sorted, unlike the reference which keeps the order they were found in.
+    """
+
+    def _longest_common_subsequence_among_all(self):
+        return sorted(super()._longest_common_subsequence_among_all(), key=lambda lcs: lcs["value"])
+
+
+class DepthLimitedMetadataProcessor(MetadataJsonProcessor):
+    """
+    Fails on documents nested deeper than 100 levels, like a recursive engine with a fixed stack.
+    """
+
+    def _traverse_and_check_validations(self, data):
+        if _depth(data) > 100:
+            raise RecursionError("Too deeply nested")
+        super()._traverse_and_check_validations(data)
+
+
+def _depth(value):
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else []
+    return 1 + max((_depth(child) for child in children), default=0)
+
+
+class TestEquivalence:
+
+    @pytest.mark.parametrize("target", equivalence.TARGETS, ids=lambda target: target.name)
+    def test_reference_matches_itself(self, target):
+        engine = StdlibJsonCodec() if target.engine == equivalence.CODEC else equivalence.REFERENCES[target.engine]
+        assert equivalence.check_target(target, engine, cases=30) is None
+
+    def test_installed_codecs_match_stdlib(self):
+        for codec in equivalence._installed_codecs():
+            assert equivalence.check_target(TARGETS["codec_round_trip"], codec, cases=300) is None, codec.name
+
+    def test_mismatch_is_shrunk_to_minimal_input(self):
+        mismatch = equivalence.check_target(TARGETS["codon_frequency"], PartialCodonProcessor, cases=100)
+        assert mismatch.args == ("A",)
+        assert mismatch.expected == "{}"
+        assert mismatch.actual == "{'A': 1}"
+        assert len(mismatch.original_args[0]) >= 1
+
+    def test_result_order_counts(self):
+        mismatch = equivalence.check_target(TARGETS["lcs_among_all"], SortedLcsProcessor, cases=300)
+        assert mismatch is not None
+        [sequences] = mismatch.args
+        # Two tied LCS values of two bases, found in the opposite order of their sorted order
+        assert len(sequences) <= 4 and all(len(sequence) <= 4 for sequence in sequences)
+        assert sorted(mismatch.expected) == sorted(mismatch.actual)
+
+    def test_deep_documents(self):
+        mismatch = equivalence.check_target(TARGETS["traverse_and_check_validations"],
+                                            DepthLimitedMetadataProcessor, cases=300)
+        assert mismatch.actual == "raises RecursionError"
+        # Shrunk to the shallowest document the engine fails on
+        assert _depth(mismatch.args[0]) == 101
+
+    def test_shrink(self):
+        def fails(args):
+            document, = args
+            return "_secret" in str(document) and "deep" in str(document)
+
+        document = {"a": [1, 2, {"b": "x" * 20}], "deep": {"c": {"_secret": 3.5, "d": True}}}
+        assert equivalence.shrink((document,), fails) == ({"deep": {"_secret": 0.0}},)
+        assert equivalence.shrink(("ACGTACGT",), lambda args: "GT" in args[0]) == ("GT",)
+
+    def test_run_reports_each_target(self):
+        lines = []
+        mismatches = equivalence.run([(equivalence.DNA, PartialCodonProcessor)], cases=20, report=lines.append)
+        assert [mismatch.target for mismatch in mismatches] == ["codon_frequency", "dna_process"]
+        assert len(lines) == sum(target.engine == equivalence.DNA for target in equivalence.TARGETS)
@@ -0,0 +1,223 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from pipeline.etl_manager import ETLManager, ETLResult
+from pipeline import timings
+from pipeline.processors.file_processor_factory import FileProcessorFactory
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
+
+
+def _make_input(tmp_path: Path, valid: bool = True) -> str:
+    participant_id = str(uuid.uuid4())
+    context_path = tmp_path / participant_id
+    results_path = context_path / "out"
+    results_path.mkdir(parents=True)
+    (context_path / f"{participant_id}_dna.txt").write_text("ATGCGTACGTTAGC\nATGCGTTTACGA\n" if valid else "\n")
+    (context_path / f"{participant_id}_dna.json").write_text(json.dumps({
+        "test_metadata": {"date_requested": "2020-01-01", "_id": "secret"},
+        "individual_metadata": {"date_of_birth": "1970-01-01"},
+    }))
+    input_file = tmp_path / f"{participant_id}_input.json"
+    input_file.write_text(json.dumps({"context_path": str(context_path), "results_path": str(results_path)}))
+    return str(input_file)
+
+
+class TestProcessMany:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_input_order(self, tmp_path, workers):
+        input_files = [_make_input(tmp_path) for _ in range(5)]
+        input_files.insert(2, _make_input(tmp_path, valid=False))
+
+        results = list(ETLManager().process_many(input_files, workers=workers, max_in_flight=2))
+
+        assert [result.input_file for result in results] == input_files
+        assert [result.ok for result in results] == [True, True, False, True, True, True]
+        assert results[2].error_type == "ValueError"
+        assert "No valid DNA sequences" in results[2].error
+        assert all(result.processed for result in results if result.ok)
+
+    def test_as_completed_delivers_every_result(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(4)]
+        results = list(ETLManager().process_many(iter(input_files), workers=2, ordered=False))
+        assert sorted(result.input_file for result in results) == sorted(input_files)
+        assert all(result.ok and result.processed for result in results)
+
+    def test_matches_serial_processing(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        ETLManager().process(input_file)
+        result_file = next((tmp_path.glob("*/out/*_result.json")))
+        serial = json.loads(result_file.read_text())
+
+        [result] = ETLManager().process_many([input_file], workers=2)
+        assert result[:5] == ETLResult(input_file, True, True)[:5]
+        parallel = json.loads(result_file.read_text())
+        assert parallel["results"] == serial["results"]
+
+    def test_incremental_skips_are_reported(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(2)]
+        manager = ETLManager(incremental=True)
+        assert all(result.processed for result in manager.process_many(input_files, workers=2))
+        results = list(manager.process_many(input_files, workers=2))
+        assert [(result.ok, result.processed) for result in results] == [(True, False), (True, False)]
+
+    def test_inputs_are_consumed_lazily(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(3)]
+        consumed = []
+
+        def generate():
+            for input_file in input_files:
+                consumed.append(input_file)
+                yield input_file
+
+        results = ETLManager().process_many(generate(), workers=2, max_in_flight=1)
+        assert next(results).input_file == input_files[0]
+        assert len(consumed) < len(input_files)
+        assert len(list(results)) == 2
+
+    def test_closing_waits_for_running_inputs(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(6)]
+        submitted = []
+
+        class RecordingPool(ThreadPoolExecutor):
+
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(super().submit(fn, *args, **kwargs))
+                return submitted[-1]
+
+        with RecordingPool(max_workers=1) as pool:
+            results = ETLManager().process_many(input_files, workers=2, max_in_flight=3, pool=pool)
+            assert next(results).ok
+            results.close()
+            # Nothing is left running once the iterator is closed, and the inputs not started never run
+            assert len(submitted) == 3 and all(future.done() for future in submitted)
+            assert any(future.cancelled() for future in submitted)
+
+    def test_invalid_worker_count(self):
+        with pytest.raises(ValueError, match="number of workers"):
+            list(ETLManager().process_many([], workers=-1))
+
+
+class TestStageTimings:
+
+    STAGES = {"extract", "validate", "transform", "process.json", "process.txt", "lcs",
+              "load", "serialize", "write", "total"}
+
+    def test_timings_are_recorded(self, tmp_path):
+        manager = ETLManager()
+        manager.process(_make_input(tmp_path))
+        recorded = manager.timings.as_dict()
+        assert set(recorded) == self.STAGES
+        assert all(seconds >= 0 for seconds in recorded.values())
+        assert recorded["total"] >= recorded["extract"] + recorded["transform"] + recorded["load"]
+        assert recorded["extract"] >= recorded["validate"]
+
+    def test_timings_in_output_metadata(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        ETLManager().process(input_file)
+        result_file = next((tmp_path.glob("*/out/*_result.json")))
+        assert "timings" not in json.loads(result_file.read_text())["metadata"]
+
+        ETLManager(include_timings=True).process(input_file)
+        recorded = json.loads(result_file.read_text())["metadata"]["timings"]
+        assert set(recorded) == self.STAGES - {"load", "serialize", "write", "total"}
+
+    def test_multi_lane_timings(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        context_path = Path(json.loads(Path(input_file).read_text())["context_path"])
+        (context_path / f"{context_path.name}_lane2_dna.txt").write_text("GGCCATGCGTAC\n")
+        manager = ETLManager()
+        manager.process(input_file)
+        assert {"process.txt", "merge.txt", "lcs"} <= set(manager.timings.as_dict())
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_hooks(self, tmp_path, workers):
+        input_files = [_make_input(tmp_path) for _ in range(3)]
+        calls = []
+
+        def failing_hook(participant_id, stage_timings):
+            raise RuntimeError("monitoring is down")
+
+        manager = ETLManager(hooks=[failing_hook, lambda *args: calls.append(args)])
+        results = list(manager.process_many(input_files, workers=workers))
+
+        assert all(result.ok for result in results)
+        assert sorted(participant_id for participant_id, _ in calls) == sorted(r.participant_id for r in results)
+        assert all(timings.TOTAL in stage_timings for _, stage_timings in calls)
+
+    def test_progress(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        stages = []
+        ETLManager(progress=lambda *args: stages.append(args)).process(input_file)
+        assert stages == [(input_file, timings.EXTRACT), (input_file, timings.TRANSFORM), (input_file, timings.LOAD)]
+
+        def cancel(input_data_file, stage):
+            if stage == timings.TRANSFORM:
+                raise RuntimeError("cancelled")
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            ETLManager(progress=cancel).process(_make_input(tmp_path))
+
+    def test_measure_accumulates(self):
+        stage_timings = timings.StageTimings()
+        for _ in range(2):
+            with stage_timings.measure("a"):
+                pass
+        stage_timings.update({"process": 1.0, "lcs": 2.0}, suffix="txt")
+        recorded = stage_timings.as_dict()
+        assert set(recorded) == {"a", "process.txt", "lcs"}
+        assert recorded["process.txt"] == 1.0
+
+
+class TestWorkCounters:
+
+    def test_counters_in_output_metadata_and_results(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(2)]
+        results = list(ETLManager(include_counters=True).process_many(input_files, workers=2))
+
+        for result in results:
+            context_path = Path(json.loads(Path(result.input_file).read_text())["context_path"])
+            bytes_read = sum(path.stat().st_size for path in context_path.glob("*_dna.*"))
+            expected = {"bytes_read": bytes_read, "bases_scanned": 26, "pairs_compared": 1, "dp_cells": 14 * 12}
+            assert result.counters == expected
+            result_file = next(context_path.glob("out/*_result.json"))
+            assert json.loads(result_file.read_text())["metadata"]["counters"] == expected
+
+    def test_counters_are_omitted_by_default(self, tmp_path):
+        manager = ETLManager()
+        manager.process(_make_input(tmp_path))
+        assert manager.counters.as_dict()["bases_scanned"] == 26
+        result_file = next((tmp_path.glob("*/out/*_result.json")))
+        assert "counters" not in json.loads(result_file.read_text())["metadata"]
+
+
+class TestRegisteredProcessors:
+
+    @pytest.fixture(autouse=True)
+    def restore_registry(self):
+        registry = dict(FileProcessorFactory._registry)
+        yield
+        FileProcessorFactory._registry = registry
+
+    def test_registered_type_is_extracted_and_loaded(self, tmp_path):
+        FileProcessorFactory.register("meta", MetadataJsonProcessor)
+        input_file = _make_input(tmp_path)
+        context_path = Path(json.loads(Path(input_file).read_text())["context_path"])
+        (context_path / f"{context_path.name}_extra.meta").write_text(json.dumps({"test_metadata": {"_id": "x"}}))
+
+        ETLManager().process(input_file)
+        [result] = json.loads(next(tmp_path.glob("*/out/*_result.json")).read_text())["results"]
+        assert list(result) == ["participant", "txt", "json", "meta"]
+        assert result["meta"] == {"test_metadata": {}}
+
+    @pytest.mark.parametrize("missing", ["txt", "json"])
+    def test_builtin_types_are_required(self, tmp_path, missing):
+        input_file = _make_input(tmp_path)
+        context_path = Path(json.loads(Path(input_file).read_text())["context_path"])
+        (context_path / f"{context_path.name}_dna.{missing}").unlink()
+
+        with pytest.raises(ValueError, match=rf"ETL process failed: No \.{missing} file"):
+            ETLManager().process(input_file)
+        assert not list(tmp_path.glob("*/out/*_result.json"))
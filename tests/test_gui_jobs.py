@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pipeline import executors, timings
+from pipeline.extract import Extractor
+from pipeline.transform import Transformer
+from ui.gui import jobs
+from ui.gui.jobs import CANCELLED, COMPLETED, FAILED, BatchJobs
+from test_etl_manager import _make_input
+
+
+def _run(batch: BatchJobs, timeout: float = 60) -> list:
+    updates = []
+    deadline = time.monotonic() + timeout
+    while not batch.is_done() and time.monotonic() < deadline:
+        updates += batch.poll()
+        time.sleep(0.01)
+    return updates
+
+
+class TestBatchJobs:
+
+    def test_stages_and_outcomes(self, tmp_path):
+        input_files = [_make_input(tmp_path), _make_input(tmp_path, valid=False), _make_input(tmp_path)]
+        batch = BatchJobs(input_files)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batch.start(executor)
+            updates = _run(batch)
+
+        assert [status for index, status in updates if index == 0] == [
+            timings.EXTRACT, timings.TRANSFORM, timings.LOAD, COMPLETED]
+        assert [status for index, status in updates if index == 1][-1] == FAILED
+        assert list(batch.failed()) == [1] and "No valid DNA sequences" in str(batch.failed()[1])
+        assert batch.cancelled() == 0
+
+    def test_cancel(self, tmp_path, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+
+        class BlockingManager:
+
+            def __init__(self, executors, progress):
+                self.progress = progress
+
+            def process(self, input_data_file):
+                self.progress(input_data_file, timings.EXTRACT)
+                started.set()
+                release.wait(10)
+                self.progress(input_data_file, timings.TRANSFORM)
+                return True
+
+        monkeypatch.setattr(jobs, "ETLManager", BlockingManager)
+        batch = BatchJobs(["a_input.json", "b_input.json", "c_input.json"])
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            batch.start(executor)
+            assert started.wait(10)
+            # The running file stops before its next stage, the others never start
+            batch.cancel()
+            release.set()
+            updates = _run(batch)
+
+        assert updates[0] == (0, timings.EXTRACT)
+        assert sorted(updates[1:]) == [(0, CANCELLED), (1, CANCELLED), (2, CANCELLED)]
+        assert batch.cancelled() == 3 and batch.failed() == {}
+
+
+class TestProcessStartMethod:
+
+    @pytest.fixture(autouse=True)
+    def restore_start_method(self):
+        yield
+        executors.set_process_start_method(None)
+
+    def test_spawned_workers(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        files, _, input_data = Extractor(input_file).extract()
+        expected = Transformer(files, input_data, {"txt": executors.SERIAL}).transform()
+
+        executors.set_process_start_method("spawn")
+        assert Transformer(files, input_data, {"txt": executors.PROCESS}).transform() == expected
+
+    def test_unsupported_start_method(self):
+        with pytest.raises(ValueError, match="Unsupported start method"):
+            executors.set_process_start_method("teleport")
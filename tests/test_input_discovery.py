@@ -0,0 +1,50 @@
+import os
+import pytest
+from utils.input_discovery import iter_input_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative in (
+            "a_input.json", "notes.txt", "2024-01/b_input.json", "2024-01/p1/b_dna.json",
+            "2024-02/c_input.json", "2024-02/deep/d_input.json"):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{}")
+    return tmp_path
+
+
+def relative_paths(root, paths):
+    return sorted(os.path.relpath(path, root).replace(os.sep, "/") for path in paths)
+
+
+class TestIterInputFiles:
+
+    def test_flat_listing(self, tree):
+        assert relative_paths(tree, iter_input_files(str(tree))) == ["a_input.json"]
+
+    def test_recursive_with_filters(self, tree):
+        # Participant metadata files under the tree are not input files
+        assert relative_paths(tree, iter_input_files(str(tree), recursive=True)) == [
+            "2024-01/b_input.json", "2024-02/c_input.json", "2024-02/deep/d_input.json", "a_input.json"]
+        assert "2024-01/p1/b_dna.json" in relative_paths(tree, iter_input_files(str(tree), "*.json", recursive=True))
+        assert relative_paths(tree, iter_input_files(str(tree), "*_input.json", r"^2024-02/", True)) == [
+            "2024-02/c_input.json", "2024-02/deep/d_input.json"]
+
+    def test_files_are_yielded_before_the_walk_ends(self, tree):
+        files = iter_input_files(str(tree), recursive=True)
+        first = next(files)
+        assert relative_paths(tree, [first]) == ["a_input.json"]
+        # The subdirectories are listed only after the first file was yielded
+        (tree / "2024-02" / "deep" / "e_input.json").write_text("{}")
+        assert "2024-02/deep/e_input.json" in relative_paths(tree, files)
+
+    def test_symlinked_directories_are_not_followed(self, tree):
+        os.symlink(tree, tree / "2024-01" / "loop")
+        assert len(list(iter_input_files(str(tree), recursive=True))) == 4
+
+    def test_invalid_root_and_regex(self, tree):
+        with pytest.raises(FileNotFoundError):
+            list(iter_input_files(str(tree / "missing")))
+        with pytest.raises(ValueError, match="Invalid input path regular expression"):
+            list(iter_input_files(str(tree), match="("))
@@ -0,0 +1,81 @@
+import json
+import pytest
+from utils.json_codec import create_codec, get_codec, StdlibJsonCodec
+
+
+def _available_codecs():
+    codecs = [create_codec("json")]
+    try:
+        codecs.append(create_codec("orjson"))
+    except ImportError:
+        pass
+    return codecs
+
+
+@pytest.fixture(params=_available_codecs(), ids=lambda codec: codec.name)
+def codec(request):
+    return request.param
+
+
+class TestJsonCodec:
+
+    def test_loads_bytes(self, codec):
+        assert codec.loads(b'{"a": [1, 2, {"b": "c"}]}') == {"a": [1, 2, {"b": "c"}]}
+
+    def test_loads_str(self, codec):
+        assert codec.loads('{"a": 1}') == {"a": 1}
+
+    def test_dumps_returns_bytes(self, codec):
+        data = codec.dumps({"a": 1, "b": [1.5, None, True]})
+        assert isinstance(data, bytes)
+        assert json.loads(data) == {"a": 1, "b": [1.5, None, True]}
+
+    def test_dumps_indent(self, codec):
+        data = codec.dumps({"a": {"b": 1}}, indent=True)
+        assert b"\n" in data
+        assert json.loads(data) == {"a": {"b": 1}}
+
+    def test_dumps_unicode(self, codec):
+        assert codec.loads(codec.dumps({"name": "Zoë"})) == {"name": "Zoë"}
+
+    def test_invalid_json_raises_json_decode_error(self, codec):
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads(b'{"a": ')
+
+    @pytest.mark.parametrize("document", [
+        b'{"id": 29103830456733703613}', b'[-9223372036854775809]', b"[NaN, Infinity]", b'["\\ud800"]',
+        b"[" * 300 + b"]" * 300,
+    ], ids=["big_int", "negative_big_int", "nan", "lone_surrogate", "deep"])
+    def test_loads_what_stdlib_accepts(self, codec, document):
+        assert repr(codec.loads(document)) == repr(json.loads(document))
+
+    def test_dumps_matches_stdlib_bytes(self, codec):
+        document = {"name": "Zoë", "values": [1.5, 10 ** 20, None], "nested": {"a": []}}
+        assert codec.dumps(document) == json.dumps(document).encode("utf-8")
+        assert codec.dumps(document, indent=True) == json.dumps(document, indent=4).encode("utf-8")
+
+    def test_file_round_trip(self, codec, tmp_path):
+        file_path = str(tmp_path / "data.json")
+        codec.dump_file({"a": [1, 2, 3]}, file_path, indent=True)
+        assert codec.load_file(file_path) == {"a": [1, 2, 3]}
+
+    def test_load_missing_file(self, codec, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            codec.load_file(str(tmp_path / "missing.json"))
+
+
+class TestCreateCodec:
+
+    def test_create_stdlib(self):
+        assert isinstance(create_codec("json"), StdlibJsonCodec)
+
+    def test_create_unknown(self):
+        with pytest.raises(ValueError, match="Unsupported JSON codec"):
+            create_codec("yaml")
+
+    def test_auto_select_prefers_fastest_available(self):
+        expected = _available_codecs()[-1].name
+        assert create_codec().name == expected
+
+    def test_get_codec_is_cached(self):
+        assert get_codec() is get_codec()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+import pytest
+from pipeline import metrics as metrics_module
+from pipeline.etl_manager import ETLManager, ETLResult
+from pipeline.metrics import BatchMetrics, STAGE_BUCKETS
+from test_etl_manager import _make_input
+
+
+def _samples(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+class TestBatchMetrics:
+
+    def test_render(self, tmp_path):
+        metrics = BatchMetrics(str(tmp_path / "etl.prom"), interval=3600)
+        metrics.record(ETLResult("a.json", True, True, timings={"lcs": 0.5, "total": 2.0},
+                                 counters={"bytes_read": 100, "dp_cells": 1000}))
+        metrics.record(ETLResult("b.json", True, True, timings={"lcs": 1.5, "total": 4000.0},
+                                 counters={"bytes_read": 50, "dp_cells": 3000}))
+        metrics.record(ETLResult("c.json", True, False))
+        metrics.record(ETLResult("d.json", False, False, "bad", "ValueError"))
+
+        samples = _samples(metrics.render())
+        assert samples['etl_participants_total{outcome="processed"}'] == "2"
+        assert samples['etl_participants_total{outcome="skipped"}'] == "1"
+        assert samples['etl_participants_total{outcome="failed"}'] == "1"
+        assert samples['etl_failures_total{error_type="ValueError"}'] == "1"
+        assert samples["etl_bytes_read_total"] == "150"
+        assert samples['etl_work_total{counter="dp_cells"}'] == "4000"
+        assert samples["etl_lcs_cells_per_second"] == "2000"
+
+        # Buckets are cumulative, and durations above the largest bound only count in +Inf
+        assert samples['etl_stage_duration_seconds_bucket{stage="lcs",le="1"}'] == "1"
+        assert samples['etl_stage_duration_seconds_bucket{stage="lcs",le="5"}'] == "2"
+        assert samples[f'etl_stage_duration_seconds_bucket{{stage="total",le="{int(STAGE_BUCKETS[-1])}"}}'] == "1"
+        assert samples['etl_stage_duration_seconds_bucket{stage="total",le="+Inf"}'] == "2"
+        assert samples['etl_stage_duration_seconds_sum{stage="total"}'] == "4002"
+        assert samples['etl_stage_duration_seconds_count{stage="total"}'] == "2"
+
+        # Nothing is written before the interval elapsed
+        assert not (tmp_path / "etl.prom").exists()
+
+    def test_label_values_are_escaped(self, tmp_path):
+        metrics = BatchMetrics(str(tmp_path / "etl.prom"), interval=3600)
+        metrics.record(ETLResult("a.json", False, False, "bad", 'Odd"Error\\'))
+        assert 'etl_failures_total{error_type="Odd\\"Error\\\\"} 1' in metrics.render()
+
+    def test_write_is_atomic(self, tmp_path):
+        path = tmp_path / "textfile" / "etl.prom"
+        metrics = BatchMetrics(str(path), interval=0)
+        metrics.record(ETLResult("a.json", True, False))
+        assert _samples(path.read_text())['etl_participants_total{outcome="skipped"}'] == "1"
+        assert [p.name for p in path.parent.iterdir()] == ["etl.prom"]
+
+    def test_older_render_does_not_replace_newer_one(self, tmp_path, monkeypatch):
+        path = tmp_path / "etl.prom"
+        metrics = BatchMetrics(str(path), interval=3600)
+        renamed = threading.Event()
+        release = threading.Event()
+        replace = os.replace
+
+        def slow_first_replace(source, destination):
+            if not renamed.is_set():
+                renamed.set()
+                release.wait(10)
+            replace(source, destination)
+
+        monkeypatch.setattr(metrics_module.os, "replace", slow_first_replace)
+        older = threading.Thread(target=metrics.write)
+        older.start()
+        assert renamed.wait(10)
+        # A newer render written while the older one is still being renamed into place
+        metrics.record(ETLResult("a.json", True, False))
+        newer = threading.Thread(target=metrics.write)
+        newer.start()
+        time.sleep(0.2)
+        release.set()
+        older.join(10)
+        newer.join(10)
+
+        assert _samples(path.read_text())['etl_participants_total{outcome="skipped"}'] == "1"
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_manager_records_batch(self, tmp_path, workers):
+        input_files = [_make_input(tmp_path) for _ in range(3)] + [_make_input(tmp_path, valid=False)]
+        metrics = BatchMetrics(str(tmp_path / "etl.prom"), interval=0)
+        results = list(ETLManager(metrics=metrics).process_many(input_files, workers=workers))
+
+        samples = _samples((tmp_path / "etl.prom").read_text())
+        assert samples['etl_participants_total{outcome="processed"}'] == "3"
+        assert samples['etl_failures_total{error_type="ValueError"}'] == "1"
+        assert int(samples["etl_bytes_read_total"]) == sum(result.counters["bytes_read"] for result in results[:3])
+        assert samples['etl_stage_duration_seconds_count{stage="lcs"}'] == "3"
+
+    def test_manager_records_single_failure(self, tmp_path):
+        metrics = BatchMetrics(str(tmp_path / "etl.prom"))
+        with pytest.raises(FileNotFoundError):
+            ETLManager(metrics=metrics).process(str(tmp_path / "missing.json"))
+        assert _samples(metrics.render())['etl_failures_total{error_type="FileNotFoundError"}'] == "1"
@@ -0,0 +1,113 @@
+import json
+import os
+import uuid
+import pytest
+from pathlib import Path
+from utils.participant_manifest import ParticipantManifest
+from utils.file_hash import file_sha256
+
+
+def _age(path: Path, seconds: float = 60) -> None:
+    """Move a path's mtime into the past so it is outside the manifest's racy window."""
+    past = os.stat(path).st_mtime - seconds
+    os.utime(path, (past, past))
+
+
+@pytest.fixture
+def cohort(tmp_path):
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    participants = []
+    for _ in range(2):
+        participant_id = str(uuid.uuid4())
+        context_path = tmp_path / "participants" / participant_id
+        (context_path / "out").mkdir(parents=True)
+        (context_path / f"{participant_id}_dna.txt").write_text("ACGTACGT\n")
+        (context_path / f"{participant_id}_dna.json").write_text("{}")
+        (inputs_dir / f"{participant_id}_input.json").write_text(json.dumps(
+            {"context_path": str(context_path), "results_path": str(context_path / "out")}))
+        _age(context_path)
+        participants.append((participant_id, context_path))
+    (inputs_dir / "invalid_input.json").write_text("{not json")
+    _age(inputs_dir)
+    return inputs_dir, participants
+
+
+class TestParticipantManifest:
+
+    def test_first_refresh_indexes_everything(self, tmp_path, cohort):
+        inputs_dir, participants = cohort
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            counters = manifest.refresh(str(inputs_dir))
+
+            assert counters == {"inputs_scanned": 1, "participants_scanned": 2, "files_hashed": 4}
+            assert len(manifest.input_files(str(inputs_dir))) == 3
+
+            participant_id, context_path = participants[0]
+            record = manifest.participant(participant_id)
+            assert record.context_path == str(context_path)
+            txt_name = f"{participant_id}_dna.txt"
+            txt_record = [f for f in record.files if f.name == txt_name][0]
+            assert txt_record.size == 9
+            assert txt_record.sha256 == file_sha256(str(context_path / txt_name))
+
+    def test_second_refresh_skips_unchanged_directories(self, tmp_path, cohort):
+        inputs_dir, _ = cohort
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(inputs_dir))
+            counters = manifest.refresh(str(inputs_dir))
+        assert counters == {"inputs_scanned": 0, "participants_scanned": 0, "files_hashed": 0}
+
+    def test_manifest_persists_across_connections(self, tmp_path, cohort):
+        inputs_dir, _ = cohort
+        db_path = str(tmp_path / "manifest.db")
+        with ParticipantManifest(db_path) as manifest:
+            manifest.refresh(str(inputs_dir))
+        with ParticipantManifest(db_path) as manifest:
+            assert manifest.refresh(str(inputs_dir))["participants_scanned"] == 0
+            assert len(manifest.input_files(str(inputs_dir))) == 3
+
+    def test_changed_participant_is_rescanned_and_rehashed(self, tmp_path, cohort):
+        inputs_dir, participants = cohort
+        participant_id, context_path = participants[1]
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(inputs_dir))
+
+            (context_path / f"{participant_id}_lane2_dna.txt").write_text("GGCC\n")
+            _age(context_path, 30)
+            counters = manifest.refresh(str(inputs_dir))
+
+            assert counters == {"inputs_scanned": 0, "participants_scanned": 1, "files_hashed": 1}
+            assert len(manifest.participant(participant_id).files) == 3
+
+    def test_new_input_is_discovered(self, tmp_path, cohort):
+        inputs_dir, _ = cohort
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(inputs_dir))
+            os.remove(inputs_dir / "invalid_input.json")
+            _age(inputs_dir, 30)
+            assert manifest.refresh(str(inputs_dir))["inputs_scanned"] == 1
+            assert len(manifest.input_files(str(inputs_dir))) == 2
+
+    def test_snapshot_for_input(self, tmp_path, cohort):
+        inputs_dir, participants = cohort
+        participant_id, context_path = participants[0]
+        input_file = str(inputs_dir / f"{participant_id}_input.json")
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(inputs_dir))
+            snapshot = manifest.snapshot_for_input(input_file)
+            assert snapshot.path == str(context_path)
+            assert snapshot.files() == [f"{participant_id}_dna.json", f"{participant_id}_dna.txt"]
+
+            # A changed directory is not served from the manifest
+            (context_path / "extra.txt").touch()
+            assert manifest.snapshot_for_input(input_file) is None
+
+    def test_recent_directory_is_not_trusted(self, tmp_path, cohort):
+        inputs_dir, participants = cohort
+        participant_id, context_path = participants[0]
+        os.utime(context_path)
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(inputs_dir))
+            assert manifest.snapshot(str(context_path)) is None
+            assert manifest.refresh(str(inputs_dir))["participants_scanned"] == 1
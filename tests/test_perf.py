@@ -0,0 +1,90 @@
+import json
+import pytest
+from benchmarks import bench_kernels
+from benchmarks.perf_gate import PerfGate, PerfRegression
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
+
+# Benchmarked kernels and input sizes, large enough to be dominated by the kernel itself
+KERNEL_SIZES = [
+    ("gc_content", 100_000),
+    ("codon_frequency", 100_000),
+    ("most_frequent_codons", 1_000),
+    ("lcs_between_two", 200),
+    ("lcs_among_all", 16),
+    ("traverse_and_check_validations", 10_000),
+    ("remove_sensitive_data", 10_000),
+]
+KERNELS = {kernel.name: kernel for kernel in bench_kernels.KERNELS}
+PROCESSORS = {bench_kernels.DNA: bench_kernels.DNASequenceTxtProcessor, bench_kernels.METADATA: MetadataJsonProcessor}
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("name, size", KERNEL_SIZES)
+def test_kernel_performance(perf_gate, name, size):
+    kernel = KERNELS[name]
+    processor = PROCESSORS[kernel.processor]("perf")
+    perf_gate.measure(f"{name}[{size}]",
+                      lambda: bench_kernels.time_kernel(kernel, processor, size, min_time=0.1)["seconds_per_op"])
+
+
+@pytest.mark.perf
+def test_metadata_process_performance(perf_gate, tmp_path):
+    metadata_file = tmp_path / "metadata.json"
+    [document] = bench_kernels._metadata(1_000, bench_kernels.random.Random(0))
+    metadata_file.write_text(json.dumps(document))
+    kernel = bench_kernels.Kernel(
+        "metadata_process", bench_kernels.METADATA, "metadata fields", (1_000,), (1_000,),
+        lambda n, rng: (str(metadata_file),), lambda processor, path: MetadataJsonProcessor(path).process())
+    perf_gate.measure("metadata_process[1000]",
+                      lambda: bench_kernels.time_kernel(kernel, None, 1_000, min_time=0.1)["seconds_per_op"])
+
+
+class TestPerfGate:
+
+    def _baseline(self, tmp_path, benchmarks):
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps({"calibration_seconds": 0.01, "benchmarks": benchmarks}))
+        return str(path)
+
+    def test_check_normalizes_by_calibration(self, tmp_path):
+        gate = PerfGate(self._baseline(tmp_path, {"a": {"relative": 2.0, "tolerance": 0.2}}), calibration=0.5)
+        # 1.1 s on a machine twice as slow as the 2.0 units baseline is within 20%
+        assert gate.check("a", 1.1).ratio == pytest.approx(1.1)
+        with pytest.raises(PerfRegression, match="1.30x its baseline"):
+            gate.check("a", 1.3)
+        # A tolerance passed to check overrides the baseline's
+        assert not gate.check("a", 1.3, tolerance=0.5).regressed
+
+    def test_missing_baseline_fails(self, tmp_path):
+        gate = PerfGate(str(tmp_path / "missing.json"), calibration=1.0)
+        with pytest.raises(PerfRegression, match="No baseline"):
+            gate.check("a", 1.0)
+
+    def test_measure_retries_before_failing(self, tmp_path):
+        gate = PerfGate(self._baseline(tmp_path, {"a": {"relative": 1.0, "tolerance": 0.2}}), calibration=1.0)
+        timings = iter([2.0, 1.1])
+        # One slow attempt is taken for noise
+        assert gate.measure("a", lambda: next(timings)).relative == 1.1
+        with pytest.raises(PerfRegression):
+            gate.measure("a", lambda: 2.0, attempts=2)
+
+    def test_update_records_median_attempt(self, tmp_path):
+        gate = PerfGate(str(tmp_path / "baseline.json"), update=True, calibration=1.0)
+        timings = iter([3.0, 1.0, 2.0])
+        assert gate.measure("a", lambda: next(timings)).relative == 2.0
+        assert gate.results["a"].relative == 2.0
+
+    def test_update_keeps_tolerances_and_other_benchmarks(self, tmp_path):
+        path = self._baseline(tmp_path, {"a": {"relative": 2.0, "tolerance": 0.5}, "b": {"relative": 1.0}})
+        gate = PerfGate(path, update=True, calibration=0.5)
+        assert not gate.check("a", 10.0).regressed
+        gate.check("c", 1.0)
+        gate.save()
+
+        saved = json.loads(open(path).read())
+        assert saved["calibration_seconds"] == 0.5
+        assert saved["benchmarks"] == {
+            "a": {"relative": 20.0, "tolerance": 0.5},
+            "b": {"relative": 1.0},
+            "c": {"relative": 2.0, "tolerance": 0.5},
+        }
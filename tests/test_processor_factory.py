@@ -1,5 +1,10 @@
+import importlib.metadata
+import subprocess
+import sys
+from pathlib import Path
 import pytest
 from pipeline.processors.file_processor_factory import FileProcessorFactory
+from pipeline.processors.metadata_json_processor import MetadataJsonProcessor
 
 
 class TestProcessorFactory:
@@ -31,3 +36,75 @@ class TestProcessorFactory:
     def test_create_processor_invalid_case4(self):
         with pytest.raises(ValueError):
             FileProcessorFactory.create_processor('data.json', 'js')
+
+
+class TestProcessorRegistry:
+
+    @pytest.fixture(autouse=True)
+    def restore_registry(self):
+        registry = dict(FileProcessorFactory._registry)
+        sniffers = list(FileProcessorFactory._sniffers)
+        yield
+        FileProcessorFactory._registry = registry
+        FileProcessorFactory._sniffers = sniffers
+
+    def test_processors_are_imported_lazily(self):
+        code = (
+            "import sys\n"
+            "from pipeline.processors.file_processor_factory import FileProcessorFactory\n"
+            "assert 'pipeline.processors.dna_sequence_txt_processor' not in sys.modules\n"
+            "FileProcessorFactory.create_processor('data.json', 'json')\n"
+            "assert 'pipeline.processors.metadata_json_processor' in sys.modules\n"
+            "assert 'pipeline.processors.dna_sequence_txt_processor' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[1])
+
+    def test_register_by_dotted_path(self):
+        FileProcessorFactory.register("fasta", "pipeline.processors.dna_sequence_txt_processor:DNASequenceTxtProcessor")
+        processor = FileProcessorFactory.create_processor('data.fasta', 'FASTA')
+        assert processor.__class__.__name__ == 'DNASequenceTxtProcessor'
+        assert "fasta" in FileProcessorFactory.registered_types()
+
+    def test_register_class(self):
+        FileProcessorFactory.register("meta", MetadataJsonProcessor)
+        assert isinstance(FileProcessorFactory.create_processor('data.meta', 'meta'), MetadataJsonProcessor)
+
+    def test_register_unimportable_processor(self):
+        FileProcessorFactory.register("bad", "no_such_module:Processor")
+        with pytest.raises(ValueError, match="Cannot load the processor"):
+            FileProcessorFactory.create_processor('data.bad', 'bad')
+
+    def test_detect_json_by_content(self, tmp_path):
+        file_path = tmp_path / "metadata.dat"
+        file_path.write_text('  {"a": 1}')
+        assert FileProcessorFactory.detect_file_type(str(file_path)) == 'json'
+        assert isinstance(FileProcessorFactory.create_processor(str(file_path)), MetadataJsonProcessor)
+
+    def test_detect_dna_by_content(self, tmp_path):
+        file_path = tmp_path / "lane1.seq"
+        file_path.write_text("ACGTACGT\nGGCCNNA\n")
+        assert FileProcessorFactory.detect_file_type(str(file_path)) == 'txt'
+
+    def test_detect_unknown_content(self, tmp_path):
+        file_path = tmp_path / "notes.md"
+        file_path.write_text("# Notes\n")
+        with pytest.raises(ValueError, match="Could not detect the file type"):
+            FileProcessorFactory.create_processor(str(file_path))
+
+    def test_custom_sniffer(self, tmp_path):
+        FileProcessorFactory.register(
+            "fasta", "pipeline.processors.dna_sequence_txt_processor:DNASequenceTxtProcessor",
+            sniffer=lambda head: head.startswith(b">"))
+        file_path = tmp_path / "reads"
+        file_path.write_text(">read1\nACGT\n")
+        assert FileProcessorFactory.detect_file_type(str(file_path)) == 'fasta'
+
+    def test_entry_points_are_registered(self, monkeypatch):
+        class FakeEntryPoint:
+            name = "CSV"
+            value = "pipeline.processors.metadata_json_processor:MetadataJsonProcessor"
+
+        monkeypatch.setattr(FileProcessorFactory, "_entry_points_loaded", False)
+        monkeypatch.setattr(importlib.metadata, "entry_points", lambda **kwargs: [FakeEntryPoint()])
+        processor = FileProcessorFactory.create_processor('data.csv', 'csv')
+        assert isinstance(processor, MetadataJsonProcessor)
@@ -0,0 +1,52 @@
+import json
+import os
+import pstats
+import pytest
+from pipeline import executors, profiling
+from pipeline.etl_manager import ETLManager
+from test_etl_manager import _make_input
+
+
+def _name(input_file: str) -> str:
+    return os.path.splitext(os.path.basename(input_file))[0]
+
+
+class TestProfiling:
+
+    def test_process_writes_profiles(self, tmp_path):
+        input_file = _make_input(tmp_path)
+        profile_dir = tmp_path / "profile"
+        manager = ETLManager(executors={"txt": executors.PROCESS}, profile_dir=str(profile_dir))
+        assert manager.executors["txt"] == executors.SERIAL
+        assert manager.process(input_file) is True
+
+        stats = pstats.Stats(str(profile_dir / (_name(input_file) + profiling.PSTATS_SUFFIX)))
+        # The processor ran in the profiled thread
+        assert any(function == "_summarize" for _, _, function in stats.stats)
+
+        memory = json.loads((profile_dir / (_name(input_file) + profiling.MEMORY_SUFFIX)).read_text())
+        assert memory["participant"] == _name(input_file)
+        assert list(memory["stages"]) == ["extract", "transform", "load"]
+        assert all(stage["peak_bytes"] > 0 for stage in memory["stages"].values())
+
+    def test_failed_participant_is_profiled(self, tmp_path):
+        input_file = _make_input(tmp_path, valid=False)
+        profile_dir = tmp_path / "profile"
+        with pytest.raises(ValueError):
+            ETLManager(profile_dir=str(profile_dir)).process(input_file)
+        assert (profile_dir / (_name(input_file) + profiling.PSTATS_SUFFIX)).exists()
+
+    def test_batch_report(self, tmp_path):
+        input_files = [_make_input(tmp_path) for _ in range(3)]
+        profile_dir = tmp_path / "profile"
+        manager = ETLManager(profile_dir=str(profile_dir))
+        assert all(result.ok for result in manager.process_many(input_files, workers=2))
+
+        report_path = profiling.write_report(str(profile_dir), top=5)
+        report = open(report_path).read()
+        assert report.startswith("Hotspots of 3 participants")
+        assert "Top 5 functions by cumulative time" in report
+        assert "transform: " in report
+
+    def test_report_without_profiles(self, tmp_path):
+        assert profiling.write_report(str(tmp_path)) is None
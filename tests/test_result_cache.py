@@ -0,0 +1,131 @@
+import json
+import os
+import pytest
+from pipeline.result_cache import ResultCache
+from pipeline.transform import Transformer
+from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
+from pipeline import executors
+
+SERIAL = {"json": executors.SERIAL, "txt": executors.SERIAL}
+
+
+class TestResultCache:
+
+    def test_put_and_get(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        key = cache.key(["abc"], "Processor", "1")
+        assert cache.get(key) is None
+        cache.put(key, {"a": [1, 2.5, "x"]})
+        assert cache.get(key) == {"a": [1, 2.5, "x"]}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_on_all_parts(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        key = cache.key(["abc"], "Processor", "1")
+        assert key == cache.key(["abc"], "Processor", "1")
+        assert key != cache.key(["abd"], "Processor", "1")
+        assert key != cache.key(["abc"], "Other", "1")
+        assert key != cache.key(["abc"], "Processor", "2")
+        assert key != cache.key(["abc"], "Processor", "1", kind="part")
+
+    def test_entries_persist(self, tmp_path):
+        key = ResultCache(str(tmp_path)).key(["abc"], "Processor", "1")
+        ResultCache(str(tmp_path)).put(key, [1])
+        assert ResultCache(str(tmp_path)).get(key) == [1]
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_bytes=350)
+        keys = [cache.key([str(i)], "Processor", "1") for i in range(3)]
+        for age, key in enumerate(keys):
+            cache.put(key, "x" * 100)
+            entry_path = cache._entry_path(key)
+            os.utime(entry_path, (1000 + age, 1000 + age))
+
+        # Touch the oldest entry so the second one becomes the least recently used
+        assert cache.get(keys[0]) is not None
+        cache.put(cache.key(["3"], "Processor", "1"), "x" * 100)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+
+    def test_overwritten_entry_is_counted_once(self, tmp_path, monkeypatch):
+        cache = ResultCache(str(tmp_path), max_bytes=250)
+        key = cache.key(["abc"], "Processor", "1")
+        other_key = cache.key(["abd"], "Processor", "1")
+        cache.put(other_key, "x" * 100)
+        evictions = []
+        monkeypatch.setattr(cache, "_evict", lambda: evictions.append(cache._size))
+
+        cache.put(key, "y" * 100)
+        cache.put(key, "z" * 100)
+
+        assert cache._size == os.path.getsize(cache._entry_path(key)) + os.path.getsize(cache._entry_path(other_key))
+        assert evictions == []
+        assert cache.get(key) == "z" * 100
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        key = cache.key(["abc"], "Processor", "1")
+        cache.put(key, [1])
+        with open(cache._entry_path(key), "w") as file:
+            file.write("{")
+        assert cache.get(key) is None
+
+
+class TestTransformerCache:
+
+    @pytest.fixture
+    def participant(self, tmp_path):
+        context_path = tmp_path / "participant"
+        context_path.mkdir()
+        (context_path / "p_lane1_dna.txt").write_text("ATGCGTACGTTAGC\nATGCGTTTACGA\n")
+        (context_path / "p_lane2_dna.txt").write_text("TTAGCATGCGT\n")
+        (context_path / "p_dna.json").write_text(json.dumps({"meta": {"date": "2020-01-01", "_id": "x"}}))
+        return context_path
+
+    def _count_calls(self, monkeypatch, method):
+        calls = []
+        original = getattr(DNASequenceTxtProcessor, method)
+
+        def counting(self, *args):
+            calls.append(self.file_path)
+            return original(self, *args)
+
+        monkeypatch.setattr(DNASequenceTxtProcessor, method, counting)
+        return calls
+
+    def test_hit_skips_processing(self, tmp_path, participant, monkeypatch):
+        cache = ResultCache(str(tmp_path / "cache"))
+        files = ["p_dna.json", "p_lane1_dna.txt"]
+        input_data = {"context_path": str(participant)}
+        first = Transformer(files, input_data, SERIAL, cache).transform()
+
+        calls = self._count_calls(monkeypatch, "process")
+        second = Transformer(files, input_data, SERIAL, cache).transform()
+
+        assert second == first
+        assert calls == []
+
+    def test_only_changed_lane_is_reprocessed(self, tmp_path, participant, monkeypatch):
+        cache = ResultCache(str(tmp_path / "cache"))
+        files = ["p_dna.json", "p_lane1_dna.txt", "p_lane2_dna.txt"]
+        input_data = {"context_path": str(participant)}
+        Transformer(files, input_data, SERIAL, cache).transform()
+
+        (participant / "p_lane2_dna.txt").write_text("GGGCCCATG\n")
+        calls = self._count_calls(monkeypatch, "process_part")
+        result = Transformer(files, input_data, SERIAL, cache).transform()
+
+        assert calls == [str(participant / "p_lane2_dna.txt")]
+        uncached = Transformer(files, input_data, SERIAL).transform()
+        assert result == uncached
+
+    def test_unchanged_lanes_reuse_merged_result(self, tmp_path, participant, monkeypatch):
+        cache = ResultCache(str(tmp_path / "cache"))
+        files = ["p_lane1_dna.txt", "p_lane2_dna.txt"]
+        input_data = {"context_path": str(participant)}
+        first = Transformer(files, input_data, SERIAL, cache).transform()
+
+        calls = self._count_calls(monkeypatch, "process_part")
+        assert Transformer(files, input_data, SERIAL, cache).transform() == first
+        assert calls == []
@@ -0,0 +1,138 @@
+import json
+import os
+import uuid
+from pathlib import Path
+from pipeline.etl_manager import ETLManager
+from pipeline.run_journal import RunJournal, JOURNAL_FILE_NAME
+from utils.participant_manifest import ParticipantManifest
+
+
+def _make_participant(tmp_path: Path):
+    participant_id = str(uuid.uuid4())
+    context_path = tmp_path / participant_id
+    results_path = context_path / "out"
+    results_path.mkdir(parents=True)
+    (context_path / f"{participant_id}_dna.txt").write_text("ATGCGTACGTTAGC\nATGCGTTTACGA\n")
+    (context_path / f"{participant_id}_dna.json").write_text(json.dumps({
+        "test_metadata": {"date_requested": "2020-01-01", "_id": "secret"},
+        "individual_metadata": {"date_of_birth": "1970-01-01"},
+    }))
+    input_file = tmp_path / f"{participant_id}_input.json"
+    input_file.write_text(json.dumps({"context_path": str(context_path), "results_path": str(results_path)}))
+    return participant_id, context_path, results_path, input_file
+
+
+class TestRunJournal:
+
+    def test_record_and_is_current(self, tmp_path):
+        result_file = tmp_path / "result.json"
+        result_file.write_text("{}")
+        journal = RunJournal(str(tmp_path))
+        journal.record("p1", "abc", str(result_file))
+
+        reloaded = RunJournal(str(tmp_path))
+        assert reloaded.is_current("p1", "abc", str(result_file))
+        assert not reloaded.is_current("p1", "def", str(result_file))
+        assert not reloaded.is_current("p2", "abc", str(result_file))
+
+    def test_missing_result_file_is_not_current(self, tmp_path):
+        journal = RunJournal(str(tmp_path))
+        journal.record("p1", "abc", str(tmp_path / "result.json"))
+        assert not journal.is_current("p1", "abc", str(tmp_path / "result.json"))
+
+    def test_torn_last_line_is_ignored_and_repaired(self, tmp_path):
+        result_file = tmp_path / "result.json"
+        result_file.write_text("{}")
+        RunJournal(str(tmp_path)).record("p1", "abc", str(result_file))
+        with open(tmp_path / JOURNAL_FILE_NAME, "ab") as file:
+            file.write(b'{"participant_id": "p2", "finger')
+
+        journal = RunJournal(str(tmp_path))
+        assert journal.is_current("p1", "abc", str(result_file))
+        assert not journal.is_current("p2", "abc", str(result_file))
+
+        journal.record("p2", "abc", str(result_file))
+        assert RunJournal(str(tmp_path)).is_current("p2", "abc", str(result_file))
+
+    def test_fingerprint_changes_with_file_content(self, tmp_path):
+        participant_id, context_path, _, input_file = _make_participant(tmp_path)
+        files = [f"{participant_id}_dna.txt", f"{participant_id}_dna.json"]
+        journal = RunJournal(str(tmp_path))
+
+        before = journal.fingerprint(str(input_file), str(context_path), files)
+        assert before == journal.fingerprint(str(input_file), str(context_path), list(reversed(files)))
+
+        assert before != journal.fingerprint(
+            str(input_file), str(context_path), files, options={"include_timings": True})
+
+        (context_path / f"{participant_id}_dna.txt").write_text("GGGG\n")
+        assert before != journal.fingerprint(str(input_file), str(context_path), files)
+
+
+class TestIncrementalETL:
+
+    def test_unchanged_participant_is_skipped(self, tmp_path):
+        participant_id, context_path, results_path, input_file = _make_participant(tmp_path)
+
+        assert ETLManager(incremental=True).process(str(input_file)) is True
+        result_file = results_path / f"{participant_id}_result.json"
+        first_result = result_file.read_bytes()
+
+        assert ETLManager(incremental=True).process(str(input_file)) is False
+        assert result_file.read_bytes() == first_result
+
+    def test_changed_participant_is_reprocessed(self, tmp_path):
+        participant_id, context_path, results_path, input_file = _make_participant(tmp_path)
+
+        assert ETLManager(incremental=True).process(str(input_file)) is True
+        (context_path / f"{participant_id}_dna.txt").write_text("ATGATGATG\nATGATGCCC\n")
+        assert ETLManager(incremental=True).process(str(input_file)) is True
+
+        result = json.loads((results_path / f"{participant_id}_result.json").read_text())
+        assert result["results"][0]["txt"]["most_common_codon"] == ["ATG"]
+
+    def test_rewritten_file_is_reprocessed_with_manifest(self, tmp_path):
+        participant_id, context_path, results_path, input_file = _make_participant(tmp_path)
+        # Old enough directories are trusted by the manifest without listing them again
+        for directory in (context_path, tmp_path):
+            past = os.stat(directory).st_mtime - 60
+            os.utime(directory, (past, past))
+
+        with ParticipantManifest(str(tmp_path / "manifest.db")) as manifest:
+            manifest.refresh(str(tmp_path))
+            assert ETLManager(manifest, incremental=True).process(str(input_file)) is True
+
+            # Rewriting the file in place leaves the directory mtime unchanged
+            directory_mtime = os.stat(context_path).st_mtime_ns
+            with open(context_path / f"{participant_id}_dna.txt", "w") as file:
+                file.write("ATGATGATG\nATGATGCCC\n")
+            assert os.stat(context_path).st_mtime_ns == directory_mtime
+
+            manifest.refresh(str(tmp_path))
+            assert ETLManager(manifest, incremental=True).process(str(input_file)) is True
+
+        result = json.loads((results_path / f"{participant_id}_result.json").read_text())
+        assert result["results"][0]["txt"]["most_common_codon"] == ["ATG"]
+
+    def test_changed_output_options_are_reprocessed(self, tmp_path):
+        participant_id, _, results_path, input_file = _make_participant(tmp_path)
+
+        assert ETLManager(incremental=True).process(str(input_file)) is True
+        assert ETLManager(incremental=True, include_timings=True).process(str(input_file)) is True
+        result = json.loads((results_path / f"{participant_id}_result.json").read_text())
+        assert "timings" in result["metadata"]
+        assert ETLManager(incremental=True, include_timings=True).process(str(input_file)) is False
+        assert ETLManager(incremental=True, include_timings=True, include_counters=True).process(
+            str(input_file)) is True
+
+    def test_missing_result_is_reprocessed(self, tmp_path):
+        participant_id, _, results_path, input_file = _make_participant(tmp_path)
+
+        ETLManager(incremental=True).process(str(input_file))
+        os.remove(results_path / f"{participant_id}_result.json")
+        assert ETLManager(incremental=True).process(str(input_file)) is True
+
+    def test_non_incremental_always_processes(self, tmp_path):
+        _, _, _, input_file = _make_participant(tmp_path)
+        assert ETLManager().process(str(input_file)) is True
+        assert ETLManager().process(str(input_file)) is True
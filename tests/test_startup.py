@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import time budget of the CLI cold start, interpreter startup included. It is several times the time measured
+# on a developer machine so only real regressions fail, the modules below are checked exactly.
+STARTUP_BUDGET_MS = 250
+# Modules the CLI must not import at startup: the GUI, and what only the asyncio API or profile mode needs
+FORBIDDEN_MODULES = ("tkinter", "asyncio", "pstats", "tracemalloc")
+
+
+def _import_times():
+    """
+    Runs `main.py --help` under `python -X importtime` and returns the cumulative import time of each top-level
+    import in microseconds.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", "--help"], cwd=REPO_ROOT, capture_output=True, text=True,
+        check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+
+    def test_cli_does_not_import_unused_modules(self):
+        imported = {name.strip().split(".")[0] for name in _import_times()}
+        assert not imported & set(FORBIDDEN_MODULES)
+
+    def test_cli_cold_start_within_budget(self):
+        # Top-level imports are not indented, their cumulative times add up to the whole import time
+        best = min(sum(time for name, time in _import_times().items() if not name.startswith("  "))
+                   for _ in range(3))
+        assert best / 1000 < STARTUP_BUDGET_MS, f"CLI imports took {best / 1000:.0f} ms"
@@ -0,0 +1,87 @@
+import json
+import pytest
+from pipeline import executors, tracing
+from pipeline.etl_manager import ETLManager
+from test_etl_manager import _make_input
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+def _names_by_pid(tracer):
+    names = {}
+    for event in tracer.events:
+        names.setdefault(event["pid"], set()).add(event["name"])
+    return names
+
+
+class TestTracing:
+
+    def test_span_is_a_shared_no_op_when_off(self):
+        assert not tracing.is_enabled()
+        assert tracing.span("a", x=1) is tracing.span("b")
+        with tracing.span("a") as span:
+            span.set(y=2)
+
+    def test_span_records_complete_event(self, tracer):
+        with tracing.span("outer", x=1) as span:
+            with tracing.span("inner"):
+                pass
+            span.set(y=2)
+
+        inner, outer = tracer.events
+        assert (inner["name"], outer["name"]) == ("inner", "outer")
+        assert outer["ph"] == "X" and outer["args"] == {"x": 1, "y": 2}
+        assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+    def test_span_records_errors(self, tracer):
+        with pytest.raises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+        assert tracer.events[0]["args"]["error"] == "ValueError: boom"
+
+    def test_collect_in_owning_process_records_directly(self, tracer):
+        with tracing.collect(True) as events:
+            with tracing.span("a"):
+                pass
+        assert events == []
+        assert [event["name"] for event in tracer.events] == ["a"]
+
+    def test_collect_without_tracer(self):
+        with tracing.collect(True) as events:
+            with tracing.span("a"):
+                pass
+        assert [event["name"] for event in events] == ["a"]
+        assert not tracing.is_enabled()
+
+    def test_pipeline_spans_include_worker_processes(self, tmp_path, tracer):
+        ETLManager(executors={"txt": executors.PROCESS}).process(_make_input(tmp_path))
+
+        names = _names_by_pid(tracer)
+        assert {"participant", "extract", "validate", "transform", "load", "serialize", "write"} <= names[tracer.pid]
+        workers = [pid for pid in names if pid != tracer.pid]
+        assert len(workers) == 1
+        assert {"process", "lcs"} <= names[workers[0]]
+
+    def test_batch_spans_include_worker_processes(self, tmp_path, tracer):
+        input_files = [_make_input(tmp_path) for _ in range(3)]
+        assert all(result.ok for result in ETLManager().process_many(input_files, workers=2))
+
+        participants = [event for event in tracer.events if event["name"] == "participant"]
+        assert sorted(event["args"]["input_file"] for event in participants) == sorted(input_files)
+        assert all(event["pid"] != tracer.pid for event in participants)
+
+    def test_export(self, tmp_path, tracer):
+        with tracing.span("a"):
+            pass
+        tracer.add({"name": "b", "ph": "X", "ts": 0, "dur": 1, "pid": tracer.pid + 1, "tid": 1, "args": {}})
+        tracer.export(str(tmp_path / "trace.json"))
+
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        process_names = {event["pid"]: event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        assert process_names == {tracer.pid: "etl", tracer.pid + 1: f"worker {tracer.pid + 1}"}
+        assert [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"] == ["a", "b"]
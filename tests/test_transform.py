@@ -0,0 +1,94 @@
+import json
+import os
+import pytest
+from pipeline.transform import Transformer
+from pipeline import executors
+from utils.directory_snapshot import DirectorySnapshot
+
+
+@pytest.fixture
+def participant(tmp_path):
+    (tmp_path / "p_dna.txt").write_text("ATGCGTACGTTAGC\nATGCGTTTACGA\nTTAGCATG\n")
+    (tmp_path / "p_dna.json").write_text(json.dumps({
+        "test_metadata": {"date_requested": "2020-01-01", "_id": "secret"},
+        "individual_metadata": {"date_of_birth": "1970-01-01"},
+    }))
+    return ["p_dna.json", "p_dna.txt"], {"context_path": str(tmp_path)}
+
+
+class TestTransformerExecutors:
+
+    @pytest.mark.parametrize("kind", [executors.SERIAL, executors.THREAD, executors.PROCESS])
+    def test_results_do_not_depend_on_executor(self, participant, kind):
+        files, input_data = participant
+        serial = Transformer(files, input_data, {"json": executors.SERIAL, "txt": executors.SERIAL}).transform()
+        result = Transformer(files, input_data, {"json": kind, "txt": kind}).transform()
+        assert result == serial
+        assert set(result) == {"json", "txt"}
+        assert result["json"] == {"test_metadata": {"date_requested": "2020-01-01"},
+                                  "individual_metadata": {"date_of_birth": "1970-01-01"}}
+
+    def test_default_executors(self, participant):
+        files, input_data = participant
+        transformer = Transformer(files, input_data)
+        # A single participant starts no worker process
+        assert transformer.executors == {"json": executors.THREAD, "txt": executors.SERIAL}
+        executors.shutdown_executors()
+        assert set(transformer.transform()) == {"json", "txt"}
+        assert executors.PROCESS not in executors._executors
+
+    def test_processor_error_is_raised(self, participant, tmp_path):
+        files, input_data = participant
+        (tmp_path / "p_dna.txt").write_text("\n\n")
+        with pytest.raises(ValueError, match="No valid DNA sequences"):
+            Transformer(files, input_data, {"txt": executors.PROCESS}).transform()
+
+    def test_unknown_executor_kind(self, participant):
+        files, input_data = participant
+        with pytest.raises(ValueError, match="Unsupported executor kind"):
+            Transformer(files, input_data, {"txt": "gpu"}).transform()
+
+
+    def test_bytes_read_come_from_the_snapshot(self, participant, tmp_path, monkeypatch):
+        files, input_data = participant
+        snapshot = DirectorySnapshot.scan(str(tmp_path))
+        expected = sum(snapshot.entry(file).size for file in files)
+        monkeypatch.setattr(os.path, "getsize", None)
+        transformer = Transformer(files, input_data, {"json": executors.SERIAL, "txt": executors.SERIAL},
+                                  snapshot=snapshot)
+        transformer.transform()
+        assert transformer.counters.as_dict()["bytes_read"] == expected
+
+
+class TestSerialExecutor:
+
+    def test_submit_runs_immediately(self):
+        future = executors.SerialExecutor().submit(lambda x: x * 2, 21)
+        assert future.done()
+        assert future.result() == 42
+
+    def test_submit_captures_exceptions(self):
+        future = executors.SerialExecutor().submit(lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            future.result()
+
+
+class TestMultipleFilesPerType:
+
+    @pytest.mark.parametrize("kind", [executors.SERIAL, executors.PROCESS])
+    def test_lanes_are_merged(self, participant, tmp_path, kind):
+        files, input_data = participant
+        (tmp_path / "p_lane2_dna.txt").write_text("GGCCATGCGTAC\n")
+
+        result = Transformer(files + ["p_lane2_dna.txt"], input_data, {"txt": kind}).transform()
+
+        (tmp_path / "all.txt").write_text((tmp_path / "p_dna.txt").read_text() + "GGCCATGCGTAC\n")
+        expected = Transformer(["all.txt"], input_data, {"txt": executors.SERIAL}).transform()
+        assert result["txt"] == expected["txt"]
+        assert len(result["txt"]["sequences"]) == 4
+
+    def test_multiple_json_files_are_rejected(self, participant, tmp_path):
+        files, input_data = participant
+        (tmp_path / "p_extra.json").write_text("{}")
+        with pytest.raises(ValueError, match="supports only one file per participant"):
+            Transformer(files + ["p_extra.json"], input_data).transform()
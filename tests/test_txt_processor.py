@@ -1,4 +1,7 @@
+import os
+import random
 import pytest
+from pipeline.counters import WorkCounters
 from pipeline.processors.dna_sequence_txt_processor import DNASequenceTxtProcessor
 
 
@@ -622,3 +625,114 @@ class TestProcessDNATxtFile:
             },
             case_name="Another long sequence",
         )
+
+
+class TestMergeLanes:
+
+    LANES = [
+        "ATGCGTACGTTAGC\nATGCGTTTACGA\n",
+        "\nTTAGCATGCGT\n",
+        "GGGCCCATGATG\nATGCGTACG\n",
+    ]
+
+    def _write_lanes(self, tmp_path, lanes):
+        paths = []
+        for index, content in enumerate(lanes, start=1):
+            path = tmp_path / f"lane{index}_dna.txt"
+            path.write_text(content)
+            paths.append(str(path))
+        return paths
+
+    def test_merge_matches_processing_the_concatenated_file(self, tmp_path):
+        paths = self._write_lanes(tmp_path, self.LANES)
+        parts = [DNASequenceTxtProcessor(path).process_part() for path in paths]
+        merged = DNASequenceTxtProcessor.merge(paths, parts)
+
+        concatenated = tmp_path / "all_dna.txt"
+        concatenated.write_text("".join(self.LANES))
+        assert merged == DNASequenceTxtProcessor(str(concatenated)).process()
+
+    def test_lcs_indices_span_lanes(self, tmp_path):
+        paths = self._write_lanes(tmp_path, ["AAAAGGGG\n", "CCCC\n", "TTGGGGTT\n"])
+        parts = [DNASequenceTxtProcessor(path).process_part() for path in paths]
+        merged = DNASequenceTxtProcessor.merge(paths, parts)
+        assert merged["lcs"] == [{"value": "GGGG", "sequences": [1, 3], "length": 4}]
+
+    def test_codon_totals_are_accumulated(self, tmp_path):
+        paths = self._write_lanes(tmp_path, ["ATGATG\n", "CCCATG\n"])
+        parts = [DNASequenceTxtProcessor(path).process_part() for path in paths]
+        assert parts[0]["codon_totals"] == {"ATG": 2}
+        assert DNASequenceTxtProcessor.merge(paths, parts)["most_common_codon"] == ["ATG"]
+
+    def test_merge_does_not_read_the_lanes_again(self, tmp_path):
+        paths = self._write_lanes(tmp_path, self.LANES)
+        parts = [DNASequenceTxtProcessor(path).process_part() for path in paths]
+        expected = DNASequenceTxtProcessor.merge(paths, parts)
+        for path in paths:
+            os.remove(path)
+        assert DNASequenceTxtProcessor.merge(paths, parts) == expected
+
+    def test_empty_lane_raises(self, tmp_path):
+        paths = self._write_lanes(tmp_path, ["ATGATG\n", "\n"])
+        with pytest.raises(ValueError, match="No valid DNA sequences"):
+            DNASequenceTxtProcessor(paths[1]).process_part()
+
+
+class TestWorkCounters:
+
+    @staticmethod
+    def _exhaustive_lcs(processor):
+        # The LCS search without pruning or caching, comparing every pair
+        lcs_dict, max_len = {}, 0
+        sequences = processor.dna_sequences
+        for i in range(len(sequences)):
+            for j in range(i + 1, len(sequences)):
+                candidate = processor._lcs_between_two(sequences[i], sequences[j])
+                if len(candidate) > max_len:
+                    max_len, lcs_dict = len(candidate), {candidate: [i + 1, j + 1]}
+                elif len(candidate) == max_len and max_len:
+                    lcs_dict.setdefault(candidate, []).extend([i + 1, j + 1])
+        return [{"value": lcs, "sequences": list(set(indices)), "length": len(lcs)}
+                for lcs, indices in lcs_dict.items()]
+
+    def test_pruning_and_cache_do_not_change_the_lcs(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            sequences = ["".join(rng.choice("ACGT") for _ in range(rng.randint(1, 30)))
+                         for _ in range(rng.randint(2, 12))]
+            sequences += rng.sample(sequences, rng.randint(0, 2))
+            processor = DNASequenceTxtProcessor("dummy_path")
+            processor.dna_sequences = sequences
+            assert processor._longest_common_subsequence_among_all() == self._exhaustive_lcs(processor)
+
+    def test_lcs_counters(self):
+        processor = DNASequenceTxtProcessor("dummy_path")
+        processor.dna_sequences = ["ATGCATGC", "ATGCATGC", "TTGCA", "ATGCATGC", "GC"]
+        processor._longest_common_subsequence_among_all()
+        counts = processor.counters.as_dict()
+        # Pair (1, 2) finds the 8-base LCS, every pair with the 5- or 2-base sequences is pruned,
+        # and pairs (1, 4) and (2, 4) repeat pair (1, 2)
+        assert counts == {"pairs_compared": 1, "dp_cells": 64, "pairs_pruned": 7, "cache_hits": 2}
+
+    def test_process_counters(self, tmp_path):
+        path = tmp_path / "dna.txt"
+        path.write_text("ATGCGT\nATGCGA\n\nAT\n")
+        processor = DNASequenceTxtProcessor(str(path))
+        processor.process()
+        counts = processor.counters.as_dict()
+        assert counts["bases_scanned"] == 14
+        # The LCS of the first pair is longer than the third sequence, so both pairs with it are pruned
+        assert counts["pairs_compared"] == 1
+        assert counts["pairs_pruned"] == 2
+        assert counts["dp_cells"] == 36
+
+    def test_merge_counters(self, tmp_path):
+        paths = []
+        for index, content in enumerate(["ATGCGT\n", "ATGCGA\n"]):
+            path = tmp_path / f"lane{index}_dna.txt"
+            path.write_text(content)
+            paths.append(str(path))
+        parts = [DNASequenceTxtProcessor(path).process_part() for path in paths]
+        counters = WorkCounters()
+        DNASequenceTxtProcessor.merge(paths, parts, counters=counters)
+        assert counters.as_dict() == {"pairs_compared": 1, "dp_cells": 36}
@@ -0,0 +1,198 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import pytest
+from pipeline.watch import LEDGER_FILE_NAME, InputWatcher, WatchLedger
+from utils.cohort_generator import generate_cohort
+from utils.directory_watcher import DirectoryWatcher
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cohort(tmp_path):
+    input_files = generate_cohort(str(tmp_path), 2, seed=3)
+    return str(tmp_path / "inputs"), input_files
+
+
+class TestInputWatcher:
+
+    def test_inputs_are_ready_once_settled(self, cohort):
+        inputs_dir, input_files = cohort
+        clock = FakeClock()
+        watcher = InputWatcher(inputs_dir, settle=2.0, clock=clock)
+
+        assert watcher.poll() == []
+        assert watcher.next_deadline() == 2.0
+        clock.now = 1.0
+        assert watcher.poll() == []
+        clock.now = 2.0
+        assert watcher.poll() == sorted(input_files)
+        # Returned inputs are not returned again while in flight, nor once done
+        assert watcher.poll() == [] and watcher.next_deadline() is None
+        for input_file in input_files:
+            watcher.done(input_file, True)
+        assert watcher.poll() == []
+
+    def test_participant_changes_restart_the_wait(self, cohort):
+        inputs_dir, input_files = cohort
+        clock = FakeClock()
+        watcher = InputWatcher(inputs_dir, settle=2.0, clock=clock)
+        watcher.poll()
+
+        # A participant file still being copied
+        participant_dir = os.path.join(os.path.dirname(inputs_dir), "participants")
+        participant = sorted(os.listdir(participant_dir))[0]
+        with open(os.path.join(participant_dir, participant, "late_dna.txt"), "w") as file:
+            file.write("ACGT")
+        clock.now = 2.0
+        ready = watcher.poll()
+        assert len(ready) == 1 and participant not in ready[0]
+        clock.now = 3.0
+        assert watcher.poll() == []
+        clock.now = 4.0
+        assert len(watcher.poll()) == 1
+
+    def test_restart_skips_handled_inputs(self, cohort):
+        inputs_dir, input_files = cohort
+        watcher = InputWatcher(inputs_dir, settle=0)
+        watcher.poll()
+        ready = watcher.poll()
+        watcher.done(ready[0], True)
+        watcher.done(ready[1], False)
+
+        # Failed inputs are not retried while neither they nor their participant files change
+        restarted = InputWatcher(inputs_dir, settle=0)
+        restarted.poll()
+        assert restarted.poll() == []
+        stat = os.stat(input_files[1])
+        os.utime(input_files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        restarted.poll()
+        assert restarted.poll() == [input_files[1]]
+
+    def test_input_waits_for_its_participant_files(self, tmp_path):
+        clock = FakeClock()
+        context_path = tmp_path / "participant"
+        (tmp_path / "inputs").mkdir()
+        input_file = tmp_path / "inputs" / "a_input.json"
+        input_file.write_text(json.dumps({"context_path": str(context_path), "results_path": str(tmp_path)}))
+        watcher = InputWatcher(str(tmp_path / "inputs"), settle=1.0, clock=clock, recheck=3.0)
+
+        assert watcher.poll() == [] and watcher.next_deadline() == 3.0
+        clock.now = 10.0
+        assert watcher.poll() == []
+        context_path.mkdir()
+        clock.now = 20.0
+        # An empty participant directory is still incomplete
+        assert watcher.poll() == []
+        (context_path / "a_dna.txt").write_text("ACGT")
+        watcher.poll()
+        clock.now = 21.0
+        assert watcher.poll() == [str(input_file)]
+
+    def test_failed_input_is_retried_when_its_participant_changes(self, cohort):
+        inputs_dir, input_files = cohort
+        watcher = InputWatcher(inputs_dir, settle=0)
+        watcher.poll()
+        ready = watcher.poll()
+        watcher.done(ready[0], False)
+        watcher.done(ready[1], True)
+
+        restarted = InputWatcher(inputs_dir, settle=0, recheck=3.0)
+        restarted.poll()
+        assert restarted.poll() == [] and restarted.next_deadline() == 3.0
+        # The missing file arrives in the participant directory
+        with open(ready[0]) as file:
+            context_path = json.load(file)["context_path"]
+        with open(os.path.join(context_path, "late_dna.txt"), "w") as file:
+            file.write("ACGT")
+        restarted.poll()
+        assert restarted.poll() == [ready[0]]
+
+    def test_removed_and_unreadable_inputs(self, tmp_path):
+        clock = FakeClock()
+        watcher = InputWatcher(str(tmp_path), settle=1.0, clock=clock)
+        (tmp_path / "a_input.json").write_text('{"context_path": ')
+        (tmp_path / "b_input.json").write_text("{}")
+        (tmp_path / "notes.json").write_text("{}")
+        watcher.poll()
+        os.remove(tmp_path / "b_input.json")
+        clock.now = 1.0
+        # A half-written input is submitted once stable, so its error is reported
+        assert watcher.poll() == [str(tmp_path / "a_input.json")]
+
+    def test_invalid_settle(self, tmp_path):
+        with pytest.raises(ValueError, match="must not be negative"):
+            InputWatcher(str(tmp_path), settle=-1)
+
+
+class TestWatchLedger:
+
+    def test_torn_line_is_ignored(self, tmp_path):
+        ledger_file = str(tmp_path / LEDGER_FILE_NAME)
+        WatchLedger(ledger_file).record("/in/a_input.json", (10, 20), True)
+        with open(ledger_file, "ab") as file:
+            file.write(b'{"input_file": "b_input.js')
+
+        ledger = WatchLedger(ledger_file)
+        assert ledger.entry("/elsewhere/a_input.json", (10, 20))["ok"] is True
+        assert ledger.entry("/in/a_input.json", (10, 21)) is None
+        assert ledger.entry("/in/b_input.json", (10, 20)) is None
+        ledger.record("/in/b_input.json", (1, 2), False, "digest")
+        entry = WatchLedger(ledger_file).entry("/in/b_input.json", (1, 2))
+        assert entry["ok"] is False and entry["context"] == "digest"
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+def test_directory_watcher(tmp_path, use_inotify):
+    with DirectoryWatcher(str(tmp_path), poll_interval=0.05, use_inotify=use_inotify) as watcher:
+        if use_inotify and not watcher.uses_inotify:
+            pytest.skip("inotify is not available")
+        if watcher.uses_inotify:
+            assert watcher.wait(0.05) is False
+        (tmp_path / "a_input.json").write_text("{}")
+        assert watcher.wait(5) is True
+    assert not watcher.uses_inotify
+
+
+def test_directory_watcher_invalid(tmp_path):
+    with pytest.raises(ValueError, match="must be a directory"):
+        DirectoryWatcher(str(tmp_path / "missing"))
+    with pytest.raises(ValueError, match="must be positive"):
+        DirectoryWatcher(str(tmp_path), poll_interval=0)
+
+
+def test_watch_mode_processes_arriving_inputs(tmp_path):
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--watch", str(inputs_dir), "--watch-settle", "0.2", "--watch-poll", "0.1"],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        input_files = generate_cohort(str(tmp_path), 2, seed=4)
+        results = [
+            os.path.join(str(tmp_path), "participants", os.path.basename(path)[:-len("_input.json")], "out")
+            for path in input_files
+        ]
+        deadline = time.monotonic() + 60
+        while not all(os.listdir(result) for result in results) and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        process.send_signal(signal.SIGINT)
+        output, _ = process.communicate(timeout=30)
+
+    assert all(os.listdir(result) for result in results), output
+    assert "2 files processed, 0 failed" in output
+    assert len((inputs_dir / LEDGER_FILE_NAME).read_text().splitlines()) == 2
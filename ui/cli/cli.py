@@ -1,6 +1,17 @@
 import argparse
+import itertools
 import os
-from pipeline.etl_manager import ETLManager
+import re
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from pipeline.etl_manager import ETLManager, ETLResult
+from pipeline.result_cache import ResultCache
+from pipeline.counters import WorkCounters
+from pipeline.metrics import DEFAULT_WRITE_INTERVAL, BatchMetrics
+from pipeline import tracing
+from utils.input_discovery import DEFAULT_INCLUDE, DEFAULT_RECURSIVE_INCLUDE, iter_input_files
+from utils.participant_manifest import ParticipantManifest
 
 
 class ETLAppCli:
@@ -12,14 +23,29 @@ class ETLAppCli:
 
     Attributes:
         parser (argparse.ArgumentParser): Argument parser for handling CLI arguments.
+        incremental (bool): Whether unchanged participants are skipped.
+        cache (ResultCache): The processor output cache, if enabled.
+        workers (int): The number of worker processes used in folder mode.
+        include_timings (bool): Whether the stage timings are included in the output metadata.
+        include_counters (bool): Whether the work counters are included in the output metadata and summarized.
+        counters (WorkCounters): The work counters summed over the participants of the run.
+        profile_dir (str): The directory participant profiles are written to, if profiling is on.
+        metrics (BatchMetrics): The batch metrics written to a textfile, if enabled.
+        discovery (dict): The filters of input files in folder mode, see `iter_input_files`.
 
     Methods:
         run() -> None:
             Parses the CLI arguments and executes the appropriate ETL process based on the input.
-        _run_etl(file_path: str) -> None:
+        _run_etl(file_path: str, manifest: ParticipantManifest = None) -> None:
             Executes the ETL process for a single JSON file.
-        _run_etl_for_directory(directory_path: str) -> None:
+        _run_etl_for_directory(directory_path: str, manifest: ParticipantManifest = None) -> None:
             Executes the ETL process for all JSON files in a specified directory.
+        _run_watch(directory_path: str, settle: float, poll_interval: float) -> None:
+            Keeps processing the input files that arrive in a directory until interrupted.
+        _print_result(result: ETLResult) -> None:
+            Prints the outcome of the ETL process for one input file of a batch.
+        _print_counters(participants: int) -> None:
+            Prints the work counters summed over the batch.
     """
 
     def __init__(self) -> None:
@@ -27,6 +53,15 @@ class ETLAppCli:
         Initializes the ETLAppCli class by setting up the argument parser.
         """
         self.parser = self._create_parser()
+        self.incremental = False
+        self.cache = None
+        self.workers = 1
+        self.include_timings = False
+        self.include_counters = False
+        self.counters = WorkCounters()
+        self.profile_dir = None
+        self.metrics = None
+        self.discovery = {}
 
     def _create_parser(self) -> argparse.ArgumentParser:
         """
@@ -36,12 +71,130 @@ class ETLAppCli:
         :rtype: argparse.ArgumentParser
         """
         parser = argparse.ArgumentParser(description="ETL CLI for processing JSON files.")
-        parser.add_argument(
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
             "-i", "--input",
             type=str,
-            required=True,
             help="Path to the input JSON file or a folder containing multiple JSON files."
         )
+        source.add_argument(
+            "--watch",
+            type=str,
+            default=None,
+            metavar="DIR",
+            help="Keep running and process each *_input.json that arrives in this folder once its participant "
+                 "files are complete. Handled inputs are recorded in DIR/.etl_watch.jsonl and skipped on restart."
+        )
+        parser.add_argument(
+            "--watch-settle",
+            type=float,
+            default=2.0,
+            help="Seconds an arriving input and its participant files must stay unchanged before they are "
+                 "processed in watch mode (default: 2)."
+        )
+        parser.add_argument(
+            "--watch-poll",
+            type=float,
+            default=2.0,
+            help="Seconds between two scans of the watched folder where inotify is not available, and between two "
+                 "checks of participant folders that inputs wait for in watch mode (default: 2)."
+        )
+        parser.add_argument(
+            "--manifest",
+            type=str,
+            default=None,
+            help="Path to a SQLite participant manifest used to discover inputs incrementally in folder mode."
+        )
+        parser.add_argument(
+            "-r", "--recursive",
+            action="store_true",
+            help="Discover input files in the subdirectories of the input folder as well."
+        )
+        parser.add_argument(
+            "--include",
+            type=str,
+            default=None,
+            metavar="GLOB",
+            help=f"Glob pattern the names of input files must match in folder mode (default: {DEFAULT_INCLUDE}, "
+                 f"or {DEFAULT_RECURSIVE_INCLUDE} with --recursive)."
+        )
+        parser.add_argument(
+            "--match",
+            type=str,
+            default=None,
+            metavar="REGEX",
+            help="Regular expression searched in the path of each input file relative to the input folder, "
+                 "e.g. '^2024-0[1-3]/'."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Skip participants whose inputs did not change since their result was written."
+        )
+        parser.add_argument(
+            "--cache-dir",
+            type=str,
+            default=None,
+            help="Directory of a cache of processor outputs keyed by file content, reused across runs."
+        )
+        parser.add_argument(
+            "--cache-max-mb",
+            type=int,
+            default=1024,
+            help="Size limit of the processor output cache in megabytes (default: 1024)."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of participants processed in parallel in folder mode, 0 for one per CPU (default: 1)."
+        )
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="Include the duration of each pipeline stage in the metadata of the output files."
+        )
+        parser.add_argument(
+            "--trace",
+            type=str,
+            default=None,
+            help="Write a Chrome Trace Event JSON file of the run, including worker processes, to this path."
+        )
+        parser.add_argument(
+            "--counters",
+            action="store_true",
+            help="Include work counters (bases scanned, LCS pairs and cells, ...) in the metadata of the output "
+                 "files and print their totals after a folder run."
+        )
+        parser.add_argument(
+            "--profile",
+            type=str,
+            default=None,
+            metavar="DIR",
+            help="Profile each participant with cProfile and tracemalloc, write the profiles to this directory "
+                 "and aggregate them into a hotspot report. Processors run serially while profiling."
+        )
+        parser.add_argument(
+            "--profile-top",
+            type=int,
+            default=25,
+            help="Number of functions listed per ranking in the hotspot report (default: 25)."
+        )
+        parser.add_argument(
+            "--metrics",
+            type=str,
+            default=None,
+            metavar="FILE",
+            help="Write batch metrics (participants, failures, bytes read, stage latency histograms, LCS cell "
+                 "rate) to this textfile for node_exporter's textfile collector, e.g. etl.prom."
+        )
+        parser.add_argument(
+            "--metrics-interval",
+            type=float,
+            default=DEFAULT_WRITE_INTERVAL,
+            help=f"Minimum number of seconds between two writes of the metrics file (default: "
+                 f"{DEFAULT_WRITE_INTERVAL:g})."
+        )
         return parser
 
     def run(self) -> None:
@@ -52,50 +205,232 @@ class ETLAppCli:
         """
         args = self.parser.parse_args()
         input_path = args.input
+        self.incremental = args.incremental
+        self.workers = args.workers
+        self.include_timings = args.timings
+        self.include_counters = args.counters
+        self.profile_dir = args.profile
+        if self.workers < 0:
+            self.parser.error("--workers must not be negative")
+        if args.profile_top < 1:
+            self.parser.error("--profile-top must be positive")
+        if args.metrics_interval < 0:
+            self.parser.error("--metrics-interval must not be negative")
+        if args.watch_settle < 0:
+            self.parser.error("--watch-settle must not be negative")
+        if args.watch_poll <= 0:
+            self.parser.error("--watch-poll must be positive")
+        if args.manifest and (args.recursive or args.match or args.include is not None):
+            self.parser.error("--recursive, --include and --match cannot be used with --manifest")
+        if args.match:
+            try:
+                re.compile(args.match)
+            except re.error as e:
+                self.parser.error(f"Invalid --match: {e}")
+        self.discovery = {"include": args.include, "match": args.match, "recursive": args.recursive}
+        if args.metrics:
+            self.metrics = BatchMetrics(args.metrics, args.metrics_interval)
+        if args.cache_dir:
+            self.cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
 
-        if os.path.isfile(input_path):
-            # Run ETL for a single file
-            self._run_etl(input_path)
-        elif os.path.isdir(input_path):
-            # Run ETL for all JSON files in the directory
-            self._run_etl_for_directory(input_path)
-        else:
-            print(f"Error: {input_path} is neither a valid file nor a directory.")
+        if args.trace:
+            tracing.enable()
+        try:
+            if args.watch:
+                if os.path.isdir(args.watch):
+                    self._run_watch(args.watch, args.watch_settle, args.watch_poll)
+                else:
+                    print(f"Error: {args.watch} is not a directory.")
+            elif os.path.isfile(input_path):
+                # Run ETL for a single file
+                self._run_etl(input_path)
+            elif os.path.isdir(input_path):
+                # Run ETL for all JSON files in the directory
+                if args.manifest:
+                    with ParticipantManifest(args.manifest) as manifest:
+                        self._run_etl_for_directory(input_path, manifest)
+                else:
+                    self._run_etl_for_directory(input_path)
+            else:
+                print(f"Error: {input_path} is neither a valid file nor a directory.")
+        finally:
+            if args.trace:
+                # Export whatever was traced, even if the run was interrupted
+                tracing.disable().export(args.trace)
+                print(f"Trace written to {args.trace}")
+            if self.metrics:
+                # The final write, so the file holds the totals of the whole run
+                self.metrics.write()
+                print(f"Metrics written to {args.metrics}")
+            if self.profile_dir:
+                from pipeline import profiling
+                report_path = profiling.write_report(self.profile_dir, args.profile_top)
+                if report_path:
+                    print(f"Profile report written to {report_path}")
 
-    def _run_etl_for_directory(self, directory_path: str) -> None:
+    def _run_etl_for_directory(self, directory_path: str, manifest: Optional[ParticipantManifest] = None) -> None:
         """
         Executes the ETL process for all JSON files in the specified directory.
 
+        When a manifest is given, it is refreshed incrementally and queried for the input files instead of
+        listing the directory and every participant directory again. Otherwise the directory (and, if
+        recursive, its subdirectories) is listed lazily with the discovery filters, so processing starts with
+        the first matching file instead of after a full walk. The files are processed by `self.workers` worker
+        processes and their outcome is printed as each one completes.
+
         :param directory_path: The path to the directory containing JSON files.
         :type directory_path: str
+        :param manifest: A participant manifest to discover inputs with. (optional)
+        :type manifest: ParticipantManifest
         :return: None
         """
-        json_files = [f for f in os.listdir(directory_path) if f.endswith(".json")]
-        if not json_files:
+        if manifest is not None:
+            manifest.refresh(directory_path)
+            file_paths = iter(manifest.input_files(directory_path))
+        else:
+            file_paths = iter_input_files(directory_path, **self.discovery)
+        first_path = next(file_paths, None)
+        if first_path is None:
             print(f"No JSON files found in the folder: {directory_path}")
             return
+        # The folder is still being listed while the first files are processed
+        file_paths = itertools.chain([first_path], file_paths)
+
+        if self.workers == 1:
+            count = 0
+            for file_path in file_paths:
+                print(f"Running ETL for file: {file_path}...")
+                self._run_etl(file_path, manifest)
+                count += 1
+            self._print_counters(count)
+            return
 
-        for json_file in json_files:
-            file_path = os.path.join(directory_path, json_file)
-            print(f"Running ETL for file: {file_path}...")
-            self._run_etl(file_path)
+        print(f"Running ETL for the files in {directory_path} with {self.workers or os.cpu_count()} workers...")
+        etl_manager = ETLManager(
+            manifest, incremental=self.incremental, cache=self.cache, include_timings=self.include_timings,
+            include_counters=self.include_counters, profile_dir=self.profile_dir,
+            metrics=self.metrics)
+        count = failed = 0
+        for result in etl_manager.process_many(file_paths, workers=self.workers or None, ordered=False):
+            self._print_result(result)
+            count += 1
+            failed += not result.ok
+            if result.counters:
+                self.counters.update(result.counters)
+        print(f"ETL finished for {count} files, {failed} failed.")
+        self._print_counters(count)
 
-    def _run_etl(self, file_path: str) -> None:
+    def _run_watch(self, directory_path: str, settle: float, poll_interval: float) -> None:
+        """
+        Keeps processing the input files that arrive in the specified directory until interrupted.
+
+        New `*_input.json` files are processed once they and their participant files stopped changing for
+        `settle` seconds. The directory is watched with inotify where available and scanned every
+        `poll_interval` seconds otherwise. With several workers, the worker processes are started once and kept
+        for the whole session. Handled inputs are recorded in a ledger, so a restarted watch only processes the
+        inputs that arrived or changed since.
+
+        :param directory_path: The path to the directory to watch.
+        :type directory_path: str
+        :param settle: The number of seconds an input must stay unchanged before it is processed.
+        :type settle: float
+        :param poll_interval: The number of seconds between two scans when inotify is not available, and between
+            two checks of the participant directories that inputs wait for.
+        :type poll_interval: float
+        :return: None
+        """
+        from pipeline.watch import InputWatcher
+        from utils.directory_watcher import DirectoryWatcher
+
+        workers = self.workers or os.cpu_count() or 1
+        etl_manager = ETLManager(
+            incremental=self.incremental, cache=self.cache, include_timings=self.include_timings,
+            include_counters=self.include_counters, profile_dir=self.profile_dir,
+            metrics=self.metrics)
+        # Participant directories are not watched, the inputs waiting for them are rechecked at the poll interval
+        input_watcher = InputWatcher(directory_path, settle, recheck=poll_interval)
+        pool = None
+        if workers > 1:
+            # Ctrl+C reaches the whole process group: only the watch stops, running participants complete
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN))
+        processed = failed = 0
+        try:
+            with DirectoryWatcher(directory_path, poll_interval) as directory_watcher:
+                mode = "inotify" if directory_watcher.uses_inotify else f"polling every {poll_interval:g}s"
+                print(f"Watching {directory_path} for new inputs ({mode}), press Ctrl+C to stop...")
+                while True:
+                    ready = input_watcher.poll()
+                    if not ready:
+                        directory_watcher.wait(input_watcher.next_deadline())
+                        continue
+                    for result in etl_manager.process_many(ready, workers=workers, ordered=False, pool=pool):
+                        self._print_result(result)
+                        input_watcher.done(result.input_file, result.ok)
+                        processed += 1
+                        failed += not result.ok
+                        if result.counters:
+                            self.counters.update(result.counters)
+        except KeyboardInterrupt:
+            print(f"Stopped watching {directory_path}: {processed} files processed, {failed} failed.")
+            self._print_counters(processed)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _run_etl(self, file_path: str, manifest: Optional[ParticipantManifest] = None) -> None:
         """
         Executes the ETL process for the given JSON file.
 
         :param file_path: The path to the input JSON file.
         :type file_path: str
+        :param manifest: A participant manifest to query for directory listings. (optional)
+        :type manifest: ParticipantManifest
         :return: None
         """
         try:
-            etl_manager = ETLManager()
+            etl_manager = ETLManager(
+                manifest, incremental=self.incremental, cache=self.cache, include_timings=self.include_timings,
+                include_counters=self.include_counters, profile_dir=self.profile_dir,
+                metrics=self.metrics)
             # Pass the file path directly to the ETL manager
-            etl_manager.process(file_path)
-            print(f"ETL process completed successfully for {file_path}\n")
+            if etl_manager.process(file_path):
+                self.counters.update(etl_manager.counters.as_dict())
+                print(f"ETL process completed successfully for {file_path}\n")
+            else:
+                print(f"Skipped unchanged participant for {file_path}\n")
         except Exception as e:
             print(f"Error during ETL process for {file_path}: {e}\n")
 
+    def _print_result(self, result: ETLResult) -> None:
+        """
+        Prints the outcome of the ETL process for one input file of a batch.
+
+        :param result: The outcome of the ETL process.
+        :type result: ETLResult
+        :return: None
+        """
+        if not result.ok:
+            print(f"Error during ETL process for {result.input_file}: {result.error}\n")
+        elif result.processed:
+            print(f"ETL process completed successfully for {result.input_file}\n")
+        else:
+            print(f"Skipped unchanged participant for {result.input_file}\n")
+
+    def _print_counters(self, participants: int) -> None:
+        """
+        Prints the work counters summed over the batch, if they were requested.
+
+        :param participants: The number of input files in the batch.
+        :type participants: int
+        :return: None
+        """
+        if not self.include_counters:
+            return
+        print(f"Work counters for {participants} files:")
+        for name, value in self.counters.as_dict().items():
+            print(f"  {name}: {value}")
+
 
 def run() -> None:
     """
@@ -0,0 +1,116 @@
+"""
+A thin client of the local ETL service (see `ui.daemon.daemon`).
+
+It only imports the standard library, so submitting a job costs an interpreter start and a socket round trip
+instead of loading the pipeline.
+
+Usage:
+    python -m ui.daemon.client --socket /tmp/etl.sock inputs/a_input.json inputs/b_input.json
+    python -m ui.daemon.client --socket /tmp/etl.sock --payload '{"context_path": "...", "results_path": "..."}'
+    python -m ui.daemon.client --socket /tmp/etl.sock --status
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+def request(socket_path: str, message: Dict, timeout: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Sends a request to the service and yields the events it streams back, until the last event of the request.
+
+    :param socket_path: The path of the Unix domain socket of the service.
+    :type socket_path: str
+    :param message: The request.
+    :type message: Dict
+    :param timeout: The maximum number of seconds to wait for each event. (optional)
+    :type timeout: float
+    :return: An iterator of the events of the request.
+    :rtype: Iterator[Dict]
+    :raises ConnectionError: If the service is not running or closes the connection early.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise ConnectionError(f"No ETL service is listening on {socket_path}")
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as events:
+            for line in events:
+                event = json.loads(line)
+                yield event
+                if event["event"] in ("done", "status", "stopping", "error"):
+                    return
+        raise ConnectionError("The ETL service closed the connection before the request completed")
+
+
+def submit(
+        socket_path: str, inputs: Sequence[str] = (), payloads: Sequence[Dict] = (), ordered: bool = False,
+        timeout: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Submits a job to the service and yields its events: "accepted", one "result" per input, then "done".
+
+    :param socket_path: The path of the Unix domain socket of the service.
+    :type socket_path: str
+    :param inputs: Input JSON files, relative paths are resolved against the current directory. (optional)
+    :type inputs: Sequence[str]
+    :param payloads: Input documents, with "context_path" and "results_path". (optional)
+    :type payloads: Sequence[Dict]
+    :param ordered: Receive the results in input order instead of as they complete. (optional)
+    :type ordered: bool
+    :param timeout: The maximum number of seconds to wait for each event. (optional)
+    :type timeout: float
+    :return: An iterator of the events of the job.
+    :rtype: Iterator[Dict]
+    :raises ConnectionError: If the service is not running or closes the connection early.
+    """
+    message = {"inputs": [os.path.abspath(path) for path in inputs], "payloads": list(payloads), "ordered": ordered}
+    return request(socket_path, message, timeout)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Submit ETL jobs to a local ETL service.")
+    parser.add_argument("inputs", nargs="*", help="Input JSON files to process.")
+    parser.add_argument("--socket", type=str, required=True, help="Path of the Unix domain socket of the service.")
+    parser.add_argument("--payload", type=str, action="append", default=[],
+                        help="An input document given inline as JSON, may be repeated.")
+    parser.add_argument("--ordered", action="store_true", help="Print the results in input order.")
+    parser.add_argument("--status", action="store_true", help="Print the status of the service.")
+    parser.add_argument("--shutdown", action="store_true", help="Stop the service.")
+    args = parser.parse_args(argv)
+
+    if args.status or args.shutdown:
+        message = {"command": "status" if args.status else "shutdown"}
+        for event in request(args.socket, message):
+            print(json.dumps(event))
+        return 0
+    if not args.inputs and not args.payload:
+        parser.error("Nothing to submit: give input files or --payload")
+    try:
+        payloads = [json.loads(payload) for payload in args.payload]
+    except json.JSONDecodeError as e:
+        parser.error(f"Invalid --payload: {e}")
+
+    failed = 0
+    for event in submit(args.socket, args.inputs, payloads, args.ordered):
+        if event["event"] == "result":
+            failed += not event["ok"]
+            if not event["ok"]:
+                print(f"Error during ETL process for {event['input_file']}: {event['error']}")
+            elif event["processed"]:
+                print(f"ETL process completed successfully for {event['input_file']}")
+            else:
+                print(f"Skipped unchanged participant for {event['input_file']}")
+        elif event["event"] == "done":
+            print(f"Job {event['job']} finished for {event['inputs']} inputs, {event['failed']} failed.")
+        elif event["event"] == "error":
+            print(f"Error: {event['error']}")
+            return 2
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+A long-running local ETL service that keeps its interpreter, imports and worker pools warm across jobs.
+
+The service listens on a Unix domain socket, so it is only reachable from the same machine, and speaks
+newline-delimited JSON. Each request is one JSON object on one line:
+
+    {"inputs": ["/abs/path/a_input.json"], "payloads": [{"context_path": "...", "results_path": "..."}]}
+    {"command": "status"}
+    {"command": "shutdown"}
+
+A job (the default command, "submit") processes input JSON files given by path and inline input documents,
+and streams back one line per event as it happens: "accepted", one "result" per input as it completes, then
+"done". Several clients can submit jobs at the same time; their participants share the worker pool.
+
+Usage:
+    python -m ui.daemon.daemon --socket /tmp/etl.sock [--workers 4] [--cache-dir DIR] [--metrics etl.prom]
+    python -m ui.daemon.client --socket /tmp/etl.sock inputs/*.json
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from pipeline.etl_manager import ETLManager, ETLResult
+from pipeline import executors
+from pipeline.metrics import DEFAULT_WRITE_INTERVAL, BatchMetrics
+from pipeline.result_cache import ResultCache
+from pipeline.transform import BATCH_EXECUTORS
+from utils.json_codec import get_codec
+
+SUBMIT = "submit"
+STATUS = "status"
+SHUTDOWN = "shutdown"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Serves the requests of one client connection.
+    """
+
+    def handle(self) -> None:
+        self.server.etl_daemon.handle_connection(self.rfile, self.wfile)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ETLDaemon:
+    """
+    A local ETL service running jobs submitted over a Unix domain socket on warm worker pools.
+
+    With one worker, participants are processed in the service process and their DNA processors run on the
+    shared process pool (see `pipeline.executors`). With more workers, whole participants are spread over a
+    pool of worker processes that is started once and kept for the lifetime of the service.
+
+    Attributes:
+        socket_path (str): The path of the Unix domain socket.
+        workers (int): The number of worker processes participants are spread over.
+        incremental (bool): Whether unchanged participants are skipped.
+        cache (ResultCache): The processor output cache shared by the jobs, if enabled.
+        include_timings (bool): Whether the stage timings are included in the output metadata.
+        include_counters (bool): Whether the work counters are included in the output metadata.
+        metrics (BatchMetrics): The batch metrics of every job, if enabled.
+        jobs (int): The number of jobs accepted so far.
+        participants (int): The number of inputs processed so far, including failed ones.
+
+    Methods:
+        serve_forever() -> None:
+            Starts the worker pool, listens on the socket and serves jobs until `shutdown` is called.
+        wait_ready(timeout: float = None) -> bool:
+            Waits until the service listens on its socket.
+        shutdown() -> None:
+            Stops serving, from another thread than the one serving.
+        handle_connection(rfile, wfile) -> None:
+            Serves the requests read from a client connection.
+        run_job(request: Dict, send: Callable[[Dict], None]) -> None:
+            Processes the inputs of a job request and sends its events.
+    """
+
+    def __init__(
+            self, socket_path: str, workers: int = 1, incremental: bool = False, cache: Optional[ResultCache] = None,
+            include_timings: bool = False, include_counters: bool = False,
+            metrics: Optional[BatchMetrics] = None) -> None:
+        """
+        Initializes the ETLDaemon class.
+
+        :param socket_path: The path of the Unix domain socket to listen on.
+        :type socket_path: str
+        :param workers: The number of worker processes participants are spread over. (optional)
+        :type workers: int
+        :param incremental: Skip participants whose inputs did not change since their result was written. (optional)
+        :type incremental: bool
+        :param cache: A cache of processor outputs shared by the jobs. (optional)
+        :type cache: ResultCache
+        :param include_timings: Include the stage timings in the output metadata. (optional)
+        :type include_timings: bool
+        :param include_counters: Include the work counters in the output metadata. (optional)
+        :type include_counters: bool
+        :param metrics: Batch metrics recording the outcome of every input. (optional)
+        :type metrics: BatchMetrics
+        :raises ValueError: If the number of workers is not positive.
+        """
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive: {workers}")
+        self.socket_path = socket_path
+        self.workers = workers
+        self.incremental = incremental
+        self.cache = cache
+        self.include_timings = include_timings
+        self.include_counters = include_counters
+        self.metrics = metrics
+        self.jobs = 0
+        self.participants = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._pool = None
+        self._payload_dir = None
+        self._started = None
+        self._ready = threading.Event()
+
+    def serve_forever(self) -> None:
+        """
+        Starts the worker pool, listens on the socket and serves jobs until `shutdown` is called. The socket,
+        the worker pool and the shared executors are cleaned up on return.
+
+        Jobs are served from threads, so worker processes are started with a start method that does not fork
+        this process.
+
+        :raises RuntimeError: If another service is already listening on the socket.
+        """
+        self._remove_stale_socket()
+        # Before the first connection thread starts, so no worker process is ever forked from one
+        previous_start_method = executors.set_process_start_method(executors.THREAD_SAFE_START_METHOD)
+        # Only the owner of the service may connect to it
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(previous_umask)
+        self._server.etl_daemon = self
+        self._payload_dir = tempfile.mkdtemp(prefix="etl_daemon_")
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(executors.THREAD_SAFE_START_METHOD))
+            # Start the worker processes now, before the first job waits for them
+            for future in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+        self._started = time.monotonic()
+        self._ready.set()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+            executors.shutdown_executors()
+            executors.set_process_start_method(previous_start_method)
+            shutil.rmtree(self._payload_dir, ignore_errors=True)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            if self.metrics:
+                self.metrics.write()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the service listens on its socket.
+
+        :param timeout: The maximum number of seconds to wait. (optional)
+        :type timeout: float
+        :return: Whether the service is listening.
+        :rtype: bool
+        """
+        return self._ready.wait(timeout)
+
+    def shutdown(self) -> None:
+        """
+        Stops serving. Jobs in progress are not waited for. Can be called from any thread, but not from the
+        thread running `serve_forever`.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+
+    def handle_connection(self, rfile, wfile) -> None:
+        """
+        Serves the requests read from a client connection, one JSON object per line, until the client closes it.
+
+        :param rfile: The binary stream the requests are read from.
+        :param wfile: The binary stream the events are written to.
+        """
+        codec = get_codec()
+
+        def send(event: Dict) -> None:
+            wfile.write(codec.dumps(event) + b"\n")
+            wfile.flush()
+
+        for line in rfile:
+            if not line.strip():
+                continue
+            try:
+                request = codec.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("A request must be a JSON object.")
+                command = request.get("command", SUBMIT)
+                if command == SUBMIT:
+                    self.run_job(request, send)
+                elif command == STATUS:
+                    send(self._status())
+                elif command == SHUTDOWN:
+                    send({"event": "stopping"})
+                    # shutdown() waits for the serving loop, which must not be this thread
+                    threading.Thread(target=self.shutdown, daemon=True).start()
+                    return
+                else:
+                    raise ValueError(f"Unknown command: {command}")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away, its remaining results are dropped
+                return
+            except Exception as e:
+                # The connection stays open for the next request of the client
+                try:
+                    send({"event": "error", "error": str(e), "error_type": type(e).__name__})
+                except OSError:
+                    return
+
+    def run_job(self, request: Dict, send: Callable[[Dict], None]) -> None:
+        """
+        Processes the inputs of a job request and sends its events: "accepted", one "result" per input as it
+        completes, and "done". If the job stops early, e.g. because the client went away, the inputs not started
+        are skipped and the running ones are waited for before the input documents are removed.
+
+        :param request: The job request, with the absolute paths of input JSON files in "inputs" and input
+            documents in "payloads". Results are sent as they complete unless "ordered" is true.
+        :type request: Dict
+        :param send: Sends an event to the client.
+        :type send: Callable[[Dict], None]
+        :raises ValueError: If the request is malformed.
+        :raises OSError: If the events cannot be sent to the client.
+        """
+        paths = request.get("inputs", [])
+        payloads = request.get("payloads", [])
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            raise ValueError("'inputs' must be a list of paths.")
+        if not isinstance(payloads, list) or not all(isinstance(payload, dict) for payload in payloads):
+            raise ValueError("'payloads' must be a list of input documents.")
+        relative = [path for path in paths if not os.path.isabs(path)]
+        if relative:
+            raise ValueError(f"Input paths must be absolute: {', '.join(relative)}")
+
+        with self._lock:
+            self.jobs += 1
+            job = self.jobs
+        # Inline documents are processed from files, labelled by their position in the request
+        payload_files = self._write_payloads(job, payloads)
+        labels = dict(zip(payload_files, (f"payload:{index}" for index in range(len(payloads)))))
+        send({"event": "accepted", "job": job, "inputs": len(paths) + len(payloads)})
+
+        manager = ETLManager(
+            incremental=self.incremental, executors=BATCH_EXECUTORS, cache=self.cache,
+            include_timings=self.include_timings, include_counters=self.include_counters, metrics=self.metrics)
+        failed = 0
+        results = manager.process_many(
+            paths + payload_files, workers=self.workers, ordered=bool(request.get("ordered")), pool=self._pool)
+        try:
+            for result in results:
+                failed += not result.ok
+                with self._lock:
+                    self.participants += 1
+                send(self._result_event(job, result, labels))
+        finally:
+            # Stops the remaining inputs and waits for the running ones, which read the input documents
+            results.close()
+            for payload_file in payload_files:
+                os.remove(payload_file)
+        send({"event": "done", "job": job, "inputs": len(paths) + len(payloads), "failed": failed})
+
+    def _write_payloads(self, job: int, payloads: List[Dict]) -> List[str]:
+        """
+        Writes the input documents of a job to files in the payload directory of the service.
+        """
+        codec = get_codec()
+        payload_files = []
+        for index, payload in enumerate(payloads):
+            payload_file = os.path.join(self._payload_dir, f"job{job}_payload{index}_input.json")
+            codec.dump_file(payload, payload_file)
+            payload_files.append(payload_file)
+        return payload_files
+
+    @staticmethod
+    def _result_event(job: int, result: ETLResult, labels: Dict[str, str]) -> Dict:
+        event = {"event": "result", "job": job}
+        event.update(result._asdict())
+        event["input_file"] = labels.get(result.input_file, result.input_file)
+        return event
+
+    def _status(self) -> Dict:
+        with self._lock:
+            return {
+                "event": "status", "pid": os.getpid(), "workers": self.workers, "jobs": self.jobs,
+                "participants": self.participants, "uptime_seconds": round(time.monotonic() - self._started, 3),
+            }
+
+    def _remove_stale_socket(self) -> None:
+        """
+        Removes the socket file left behind by a service that is no longer running.
+
+        :raises RuntimeError: If a service is listening on the socket.
+        """
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"An ETL service is already listening on {self.socket_path}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline as a local service on a Unix socket.")
+    parser.add_argument("--socket", type=str, required=True, help="Path of the Unix domain socket to listen on.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes participants are spread over, 0 for one per CPU "
+                             "(default: 1).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip participants whose inputs did not change since their result was written.")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Directory of a cache of processor outputs keyed by file content.")
+    parser.add_argument("--cache-max-mb", type=int, default=1024,
+                        help="Size limit of the processor output cache in megabytes (default: 1024).")
+    parser.add_argument("--timings", action="store_true",
+                        help="Include the duration of each pipeline stage in the metadata of the output files.")
+    parser.add_argument("--counters", action="store_true",
+                        help="Include work counters in the metadata of the output files.")
+    parser.add_argument("--metrics", type=str, default=None, metavar="FILE",
+                        help="Write the metrics of every job to this textfile for node_exporter.")
+    parser.add_argument("--metrics-interval", type=float, default=DEFAULT_WRITE_INTERVAL,
+                        help=f"Minimum number of seconds between two writes of the metrics file (default: "
+                             f"{DEFAULT_WRITE_INTERVAL:g}).")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+
+    service = ETLDaemon(
+        os.path.abspath(args.socket), args.workers or os.cpu_count() or 1, args.incremental,
+        ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None,
+        args.timings, args.counters, BatchMetrics(args.metrics, args.metrics_interval) if args.metrics else None)
+
+    def stop(signum, frame):
+        # serve_forever runs in this thread, so it is stopped from another one
+        threading.Thread(target=service.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"ETL service listening on {service.socket_path} with {service.workers} workers")
+    service.serve_forever()
+    print("ETL service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
+import os
 import tkinter as tk
-from tkinter import filedialog, messagebox
-from pipeline.etl_manager import ETLManager
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import filedialog, messagebox, ttk
+from typing import List
+from pipeline import executors
+from ui.gui.jobs import FINISHED, BatchJobs
+
+# Milliseconds between two updates of the processing window from the background jobs
+POLL_INTERVAL_MS = 100
+# Participants processed at the same time. The DNA processors already run on the shared process pool, so a few
+# threads are enough to keep it busy.
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
 
 
 class ETLApp:
@@ -11,26 +21,48 @@ class ETLApp:
     and execute the ETL process. The application includes a main window with options
     to start the ETL process and exit the application.
 
+    The selected files are processed in parallel on a background thread pool, so the window stays responsive.
+    The jobs (see `ui.gui.jobs`) only report to a queue, which the Tk main loop polls with `root.after` to update
+    the progress bar and the current stage of each file. Cancelling skips the files that did not start yet and
+    stops the running ones before their next stage.
+
     Attributes:
         root (tk.Tk): The main Tkinter window for the application.
         instructions (tk.Label): A label displaying instructions to the user.
         start_button (tk.Button): A button to start the ETL process.
         exit_button (tk.Button): A button to exit the application.
+        workers (int): The number of files processed in parallel.
 
     Methods:
         run() -> None:
             Runs the ETL application.
+        close() -> None:
+            Cancels the running batch and stops the background threads.
     """
 
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, workers: int = DEFAULT_WORKERS) -> None:
         """
         Initializes the ETLApp class and sets up the main application window.
 
         :param root: The main Tkinter window for the application.
         :type root: tk.Tk
+        :param workers: The number of files processed in parallel. (optional)
+        :type workers: int
+        :raises ValueError: If the number of workers is not positive.
         """
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive: {workers}")
         self.root = root
         self.root.title("ETL Process")
+        self.workers = workers
+        self._executor = None
+        # The jobs of the running batch
+        self._batch = None
+        self._processing_window = None
+        self._status_label = None
+        self._progress_bar = None
+        self._stage_list = None
+        self._cancel_button = None
 
         # Instructions label
         self.instructions = tk.Label(
@@ -46,36 +78,48 @@ class ETLApp:
         self.exit_button = tk.Button(self.root, text="Exit", command=self.root.quit)
         self.exit_button.pack(pady=10)
 
+    def close(self) -> None:
+        """
+        Cancels the running batch and waits for the background threads to stop.
+
+        :return: None
+        """
+        if self._batch is not None:
+            self._batch.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
     def _on_start_etl(self) -> None:
         """
-        Handler for the "Start ETL" button. Prompts the user to select a JSON file
-        and starts the ETL process if a file is selected.
+        Handler for the "Start ETL" button. Prompts the user to select JSON files
+        and starts the ETL process if files are selected.
 
         :return: None
         """
-        json_file = self._select_json_file()
-        if json_file:
-            self._run_etl_process(json_file)
+        json_files = self._select_json_files()
+        if json_files:
+            self._run_etl_process(json_files)
 
-    def _select_json_file(self) -> str:
+    def _select_json_files(self) -> List[str]:
         """
-        Opens a file dialog to allow the user to select a JSON file.
+        Opens a file dialog to allow the user to select one or more JSON files.
 
-        :return: The path to the selected JSON file.
-        :rtype: str
+        :return: The paths to the selected JSON files.
+        :rtype: List[str]
         """
-        file_path = filedialog.askopenfilename(
-            title="Select a JSON file",
+        file_paths = filedialog.askopenfilenames(
+            title="Select JSON files",
             filetypes=(("JSON Files", "*.json"), ("All Files", "*.*"))
         )
-        return file_path
+        return list(file_paths)
 
     def _create_processing_window(self) -> tk.Toplevel:
         """
         Creates and displays a "Processing..." window while the ETL process is running.
 
-        The processing window prevents interaction with the main application window
-        and shows a simple "Processing..." message.
+        The window shows a progress bar over the selected files, the current stage of each file and a
+        "Cancel" button. Closing the window cancels the batch as well.
 
         :return: The processing window instance.
         :rtype: tk.Toplevel
@@ -83,44 +127,102 @@ class ETLApp:
         # Create a processing window
         processing_window = tk.Toplevel(self.root)
         processing_window.title("Processing")
-        processing_window.geometry("200x100")
         processing_window.resizable(False, False)
-
-        # Disable interaction with the main window
         processing_window.transient(self.root)
-        processing_window.grab_set()
+        processing_window.protocol("WM_DELETE_WINDOW", self._on_cancel)
+
+        self._status_label = tk.Label(processing_window, text="Processing...", font=("Arial", 10))
+        self._status_label.pack(padx=10, pady=(10, 5))
 
-        # Add a label with the text "Processing..."
-        label = tk.Label(processing_window, text="Processing...", font=("Arial", 10))
-        label.pack(pady=20)
+        self._progress_bar = ttk.Progressbar(
+            processing_window, length=360, mode="determinate", maximum=len(self._batch.file_paths))
+        self._progress_bar.pack(padx=10, pady=5)
 
-        # Ensure the window and its contents are fully rendered
-        processing_window.update_idletasks()
+        # One line per file with its current stage
+        self._stage_list = tk.Listbox(processing_window, width=60, height=min(len(self._batch.file_paths), 10))
+        for file_path in self._batch.file_paths:
+            self._stage_list.insert(tk.END, f"{os.path.basename(file_path)}: waiting")
+        self._stage_list.pack(padx=10, pady=5)
+
+        self._cancel_button = tk.Button(processing_window, text="Cancel", command=self._on_cancel)
+        self._cancel_button.pack(pady=(5, 10))
 
         return processing_window
 
-    def _run_etl_process(self, file_path: str) -> None:
+    def _run_etl_process(self, file_paths: List[str]) -> None:
         """
-        Executes the ETL process using the provided JSON file and closes the
-        processing window upon completion.
+        Starts the ETL process of the selected files in the background and the polling of their progress.
 
-        :param file_path: The path to the input JSON file for the ETL process.
-        :type file_path: str
+        :param file_paths: The paths to the input JSON files for the ETL process.
+        :type file_paths: List[str]
+        :return: None
+        """
+        self.start_button.config(state=tk.DISABLED)
+        self._batch = BatchJobs(file_paths)
+        self._processing_window = self._create_processing_window()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="etl-gui")
+        self._batch.start(self._executor)
+        self.root.after(POLL_INTERVAL_MS, self._poll_events)
+
+    def _poll_events(self) -> None:
+        """
+        Applies the status changes of the jobs to the processing window, then polls again until every job is done.
 
-        :raises Exception: If an error occurs during the ETL process.
         :return: None
         """
-        processing_window = self._create_processing_window()
+        batch = self._batch
+        for index, status in batch.poll():
+            self._stage_list.delete(index)
+            self._stage_list.insert(index, f"{os.path.basename(batch.file_paths[index])}: {status}")
+            if status in FINISHED:
+                self._progress_bar["value"] = len(batch.errors)
+                self._status_label.config(text=f"Processed {len(batch.errors)} of {len(batch.file_paths)} files")
+
+        if batch.is_done():
+            self._finish()
+        else:
+            self.root.after(POLL_INTERVAL_MS, self._poll_events)
+
+    def _on_cancel(self) -> None:
+        """
+        Handler for the "Cancel" button. Skips the files that did not start and stops the running ones before
+        their next stage.
 
-        try:
-            # Create the ETL manager and process the input file
-            etl_manager = ETLManager()
-            etl_manager.process(file_path)
-            processing_window.destroy()
-            messagebox.showinfo("Success", f"ETL process completed successfully for {file_path}")
-        except Exception as e:
-            processing_window.destroy()
-            messagebox.showerror("Error", e)
+        :return: None
+        """
+        self._batch.cancel()
+        self._cancel_button.config(state=tk.DISABLED)
+        self._status_label.config(text="Cancelling...")
+
+    def _finish(self) -> None:
+        """
+        Closes the processing window and reports the outcome of the batch.
+
+        :return: None
+        """
+        self._processing_window.destroy()
+        self._processing_window = None
+        self.start_button.config(state=tk.NORMAL)
+
+        file_paths = self._batch.file_paths
+        failed = self._batch.failed()
+        cancelled = self._batch.cancelled()
+        if len(file_paths) == 1 and not cancelled:
+            if failed:
+                messagebox.showerror("Error", failed[0])
+            else:
+                messagebox.showinfo("Success", f"ETL process completed successfully for {file_paths[0]}")
+        elif failed or cancelled:
+            completed = len(file_paths) - len(failed) - cancelled
+            lines = [f"ETL process completed successfully for {completed} of {len(file_paths)} files."]
+            lines += [f"{os.path.basename(file_paths[index])}: {error}" for index, error in failed.items()]
+            if cancelled:
+                lines.append(f"{cancelled} files were cancelled.")
+            messagebox.showerror("Error", "\n".join(lines))
+        else:
+            messagebox.showinfo("Success", f"ETL process completed successfully for {len(file_paths)} files")
 
 
 def run() -> None:
@@ -130,6 +232,11 @@ def run() -> None:
 
     :return: None
     """
+    # Tk and the jobs run threads, so the DNA worker processes are not forked from them
+    executors.set_process_start_method(executors.THREAD_SAFE_START_METHOD)
     root = tk.Tk()
-    ETLApp(root)
-    root.mainloop()
+    app = ETLApp(root)
+    try:
+        root.mainloop()
+    finally:
+        app.close()
@@ -0,0 +1,156 @@
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Dict, List, Optional, Tuple
+from pipeline.etl_manager import ETLManager
+from pipeline.transform import BATCH_EXECUTORS
+
+# The statuses of a finished file
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+# The event queued by a job once it completed, after its stage events
+_DONE = "done"
+
+
+def process_file(index: int, file_path: str, events: queue.Queue, cancel: threading.Event) -> bool:
+    """
+    Runs the ETL process of one file of a batch, queuing each stage as it starts.
+
+    :param index: The position of the file in the batch.
+    :type index: int
+    :param file_path: The input JSON file.
+    :type file_path: str
+    :param events: The queue receiving (index, stage) events.
+    :type events: queue.Queue
+    :param cancel: Set to stop the file before its next stage.
+    :type cancel: threading.Event
+    :return: True if the file was processed, False if it was cancelled before one of its stages.
+    :rtype: bool
+    """
+    cancelled = []
+
+    def progress(input_data_file: str, stage: str) -> None:
+        if cancel.is_set():
+            cancelled.append(stage)
+            raise RuntimeError("Cancelled by the user")
+        events.put((index, stage))
+
+    try:
+        # A manager per job, since a manager holds the state of the participant it processes
+        ETLManager(executors=BATCH_EXECUTORS, progress=progress).process(file_path)
+    except Exception:
+        if cancelled:
+            return False
+        raise
+    return True
+
+
+class BatchJobs:
+    """
+    The background jobs of a batch of input files started from the GUI, kept apart from the Tk widgets.
+
+    Each file is processed by a job on an executor. The jobs only report to a queue, which the Tk main loop
+    drains with `poll`, so no widget is touched outside the main thread. Cancelling skips the files that did
+    not start yet and stops the running ones before their next stage.
+
+    Attributes:
+        file_paths (List[str]): The input JSON files of the batch.
+        errors (Dict[int, Exception]): The error of each finished file by position, None if it did not fail.
+
+    Methods:
+        start(executor: Executor) -> None:
+            Submits a job per file.
+        poll() -> List[Tuple[int, str]]:
+            Returns the status changes queued by the jobs since the last poll.
+        cancel() -> None:
+            Cancels the batch.
+        is_done() -> bool:
+            Returns whether every file finished.
+        failed() -> Dict[int, Exception]:
+            Returns the errors of the failed files.
+        cancelled() -> int:
+            Returns the number of cancelled files.
+    """
+
+    def __init__(self, file_paths: List[str]) -> None:
+        """
+        Initializes the BatchJobs class.
+
+        :param file_paths: The input JSON files of the batch.
+        :type file_paths: List[str]
+        """
+        self.file_paths = file_paths
+        self.errors: Dict[int, Optional[Exception]] = {}
+        self._futures: List[Future] = []
+        self._events = queue.Queue()
+        self._cancel = threading.Event()
+
+    def start(self, executor: Executor) -> None:
+        """
+        Submits a job per file to the executor.
+
+        :param executor: The executor running the jobs.
+        :type executor: Executor
+        """
+        for index, file_path in enumerate(self.file_paths):
+            future = executor.submit(process_file, index, file_path, self._events, self._cancel)
+            # Done callbacks run in the job thread, so they only queue the event for the Tk main loop
+            future.add_done_callback(lambda future, index=index: self._events.put((index, _DONE)))
+            self._futures.append(future)
+
+    def poll(self) -> List[Tuple[int, str]]:
+        """
+        Drains the events queued by the jobs.
+
+        :return: The position and new status of each file that changed, in queue order: the stage it started,
+            or "completed", "failed" or "cancelled" once it finished.
+        :rtype: List[Tuple[int, str]]
+        """
+        updates = []
+        while True:
+            try:
+                index, event = self._events.get_nowait()
+            except queue.Empty:
+                return updates
+            if event == _DONE:
+                future = self._futures[index]
+                self.errors[index] = None if future.cancelled() else future.exception()
+                event = self._status(future)
+            updates.append((index, event))
+
+    def cancel(self) -> None:
+        """
+        Skips the files that did not start and stops the running ones before their next stage.
+        """
+        self._cancel.set()
+        for future in self._futures:
+            future.cancel()
+
+    def is_done(self) -> bool:
+        """
+        Returns whether every file finished and was reported by `poll`.
+        """
+        return len(self.errors) == len(self.file_paths)
+
+    def failed(self) -> Dict[int, Exception]:
+        """
+        Returns the errors of the failed files by position.
+        """
+        return {index: error for index, error in self.errors.items() if error is not None}
+
+    def cancelled(self) -> int:
+        """
+        Returns the number of files that were cancelled.
+        """
+        return sum(self._status(future) == CANCELLED for future in self._futures if future.done())
+
+    @staticmethod
+    def _status(future: Future) -> str:
+        """
+        Returns the status of a finished job.
+        """
+        if future.cancelled() or (future.exception() is None and not future.result()):
+            return CANCELLED
+        return FAILED if future.exception() is not None else COMPLETED
@@ -0,0 +1,289 @@
+"""
+Generator of synthetic participant cohorts for load and scale testing of the ETL pipeline.
+
+It writes N participant directories with valid metadata JSON and DNA txt files, plus an input JSON per
+participant pointing at them, laid out as:
+
+    <output>/inputs/<uuid>_input.json
+    <output>/participants/<uuid>/<uuid>_dna.json
+    <output>/participants/<uuid>/<uuid>_dna.txt (or <uuid>_lane<n>_dna.txt with several lanes)
+    <output>/participants/<uuid>/out/
+
+The cohort is deterministic: each participant is generated from its own random generator seeded with the
+cohort seed and its index, so the same seed always writes the same files, and any range of participants can
+be generated on its own (e.g. by several worker processes) with identical results.
+
+Usage:
+    python -m utils.cohort_generator -o /tmp/cohort -n 100000 [--seed 0] [--workers 8] [--reads-min 2] ...
+"""
+import argparse
+import os
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+from utils.json_codec import get_codec
+
+# Dates in the metadata must fall in this range, except the date of birth (see MetadataJsonProcessor)
+_FIRST_DATE = date(2014, 1, 1)
+_LAST_DATE = date(2024, 12, 31)
+# Participants must be at least 40 years old
+_FIRST_BIRTH_DATE = date(1930, 1, 1)
+_LAST_BIRTH_DATE = date(1975, 12, 31)
+
+# Metadata strings must not exceed 64 characters
+_WORDS = ("alpha", "beta", "gamma", "delta", "sample", "panel", "exome", "genome", "saliva", "blood", "lab", "run")
+
+# Number of participants generated per task in a worker process
+_CHUNK_SIZE = 500
+
+
+class CohortConfig(NamedTuple):
+    """
+    The shape of a synthetic cohort.
+
+    Attributes:
+        reads_min (int): The minimum number of DNA reads (lines) per lane.
+        reads_max (int): The maximum number of DNA reads per lane.
+        length_mean (float): The mean read length.
+        length_sd (float): The standard deviation of the normally distributed read length, 0 for a fixed length.
+        length_min (int): The shortest read length.
+        length_max (int): The longest read length.
+        gc_content (float): The probability of a base being G or C, 0.5 for an unbiased genome.
+        motif_rate (float): The probability of injecting a cohort-wide shared motif into a read, which gives
+            the LCS search long common substrings to find.
+        motif_count (int): The number of distinct shared motifs.
+        motif_length (int): The length of the shared motifs.
+        repeat_rate (float): The probability of a read repeating an earlier read of its participant.
+        lanes (int): The number of DNA txt files per participant.
+        metadata_depth (int): The nesting depth of the extra metadata sections.
+        metadata_width (int): The number of extra metadata sections, and of fields per nesting level.
+        sensitive_keys (int): The number of extra underscore-prefixed keys the pipeline must remove.
+    """
+    reads_min: int = 2
+    reads_max: int = 4
+    length_mean: float = 80.0
+    length_sd: float = 20.0
+    length_min: int = 10
+    length_max: int = 200
+    gc_content: float = 0.5
+    motif_rate: float = 0.3
+    motif_count: int = 8
+    motif_length: int = 12
+    repeat_rate: float = 0.0
+    lanes: int = 1
+    metadata_depth: int = 2
+    metadata_width: int = 3
+    sensitive_keys: int = 2
+
+
+def validate_config(config: CohortConfig) -> None:
+    """
+    Checks that a cohort configuration describes participants the pipeline accepts.
+
+    :param config: The cohort configuration.
+    :type config: CohortConfig
+    :raises ValueError: If a setting is out of range.
+    """
+    if not 1 <= config.reads_min <= config.reads_max:
+        raise ValueError(f"Invalid read count range: {config.reads_min}..{config.reads_max}")
+    if not 1 <= config.length_min <= config.length_max:
+        raise ValueError(f"Invalid read length range: {config.length_min}..{config.length_max}")
+    if config.length_sd < 0:
+        raise ValueError(f"The read length standard deviation must not be negative: {config.length_sd}")
+    for name in ("gc_content", "motif_rate", "repeat_rate"):
+        if not 0 <= getattr(config, name) <= 1:
+            raise ValueError(f"{name} must be between 0 and 1: {getattr(config, name)}")
+    if config.motif_count < 1 or config.motif_length < 1:
+        raise ValueError("The motif count and length must be positive.")
+    if config.lanes < 1:
+        raise ValueError(f"The number of lanes must be positive: {config.lanes}")
+    if config.metadata_depth < 0 or config.metadata_width < 0 or config.sensitive_keys < 0:
+        raise ValueError("The metadata depth, width and number of sensitive keys must not be negative.")
+
+
+def generate_cohort(
+        output_dir: str, participants: int, config: CohortConfig = CohortConfig(), seed: int = 0,
+        start: int = 0, workers: int = 1) -> List[str]:
+    """
+    Writes a synthetic cohort of participants and their input files.
+
+    :param output_dir: The directory the `inputs` and `participants` directories are written to.
+    :type output_dir: str
+    :param participants: The number of participants.
+    :type participants: int
+    :param config: The shape of the cohort. (optional)
+    :type config: CohortConfig
+    :param seed: The cohort seed. (optional)
+    :type seed: int
+    :param start: The index of the first participant, to extend a cohort generated with the same seed. (optional)
+    :type start: int
+    :param workers: The number of worker processes. (optional)
+    :type workers: int
+    :return: The input JSON files, in participant order.
+    :rtype: List[str]
+    :raises ValueError: If the configuration or the number of participants or workers is invalid.
+    """
+    validate_config(config)
+    if participants < 0:
+        raise ValueError(f"The number of participants must not be negative: {participants}")
+    if workers < 1:
+        raise ValueError(f"The number of workers must be positive: {workers}")
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(os.path.join(output_dir, "inputs"), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "participants"), exist_ok=True)
+
+    chunks = [(first, min(first + _CHUNK_SIZE, start + participants))
+              for first in range(start, start + participants, _CHUNK_SIZE)]
+    if workers == 1 or len(chunks) <= 1:
+        return [path for chunk in chunks for path in _generate_range(output_dir, chunk, config, seed)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_generate_range, *zip(*((output_dir, chunk, config, seed) for chunk in chunks)))
+        return [path for paths in results for path in paths]
+
+
+def _generate_range(output_dir: str, chunk: Tuple[int, int], config: CohortConfig, seed: int) -> List[str]:
+    """
+    Writes the participants of an index range. Module level so it can be sent to worker processes.
+    """
+    motifs = _motifs(config, seed)
+    return [_write_participant(output_dir, index, config, seed, motifs) for index in range(*chunk)]
+
+
+def _motifs(config: CohortConfig, seed: int) -> List[str]:
+    """
+    Returns the cohort-wide motifs injected into the reads.
+    """
+    rng = random.Random(f"{seed}:motifs")
+    return [_bases(rng, config.motif_length, config.gc_content) for _ in range(config.motif_count)]
+
+
+def _write_participant(output_dir: str, index: int, config: CohortConfig, seed: int, motifs: List[str]) -> str:
+    """
+    Writes the files of one participant and returns its input JSON file.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    participant_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    context_path = os.path.join(output_dir, "participants", participant_id)
+    results_path = os.path.join(context_path, "out")
+    os.makedirs(results_path, exist_ok=True)
+
+    codec = get_codec()
+    with open(os.path.join(context_path, f"{participant_id}_dna.json"), "wb") as file:
+        file.write(codec.dumps(_metadata(rng, config), indent=True))
+    for lane in range(1, config.lanes + 1):
+        file_name = f"{participant_id}_dna.txt" if config.lanes == 1 else f"{participant_id}_lane{lane}_dna.txt"
+        with open(os.path.join(context_path, file_name), "w") as file:
+            file.write("\n".join(_reads(rng, config, motifs)) + "\n")
+
+    input_file = os.path.join(output_dir, "inputs", f"{participant_id}_input.json")
+    with open(input_file, "wb") as file:
+        file.write(codec.dumps({"context_path": context_path, "results_path": results_path}, indent=True))
+    return input_file
+
+
+def _bases(rng: random.Random, length: int, gc_content: float) -> str:
+    """
+    Returns random bases with the given probability of G or C.
+    """
+    at = (1 - gc_content) / 2
+    return "".join(rng.choices("ATGC", cum_weights=(at, 2 * at, 2 * at + gc_content / 2, 1), k=length))
+
+
+def _reads(rng: random.Random, config: CohortConfig, motifs: List[str]) -> Iterator[str]:
+    """
+    Yields the DNA reads of one lane.
+    """
+    reads = []
+    for _ in range(rng.randint(config.reads_min, config.reads_max)):
+        if reads and rng.random() < config.repeat_rate:
+            read = rng.choice(reads)
+        else:
+            length = round(rng.gauss(config.length_mean, config.length_sd)) if config.length_sd else config.length_mean
+            length = min(max(int(length), config.length_min), config.length_max)
+            read = _bases(rng, length, config.gc_content)
+            if rng.random() < config.motif_rate:
+                # Overwrite a random window of the read with a motif, keeping the read length
+                motif = rng.choice(motifs)[:length]
+                position = rng.randint(0, length - len(motif))
+                read = read[:position] + motif + read[position + len(motif):]
+        reads.append(read)
+        yield read
+
+
+def _random_date(rng: random.Random, first: date, last: date) -> str:
+    return (first + timedelta(days=rng.randint(0, (last - first).days))).isoformat()
+
+
+def _random_text(rng: random.Random) -> str:
+    return " ".join(rng.choices(_WORDS, k=rng.randint(1, 4)))
+
+
+def _metadata(rng: random.Random, config: CohortConfig) -> Dict:
+    """
+    Returns the metadata document of one participant.
+    """
+    requested = _random_date(rng, _FIRST_DATE, _LAST_DATE)
+    metadata = {
+        "test_metadata": {
+            "test_id": f"GEN{rng.randint(0, 999999):06d}",
+            "test_type": "Genetic Test",
+            "date_requested": requested,
+            "date_completed": _random_date(rng, date.fromisoformat(requested), _LAST_DATE),
+            "status": "Completed",
+        },
+        "individual_metadata": {
+            "_individual_id": f"IND{rng.randint(0, 999999):06d}",
+            "_name": _random_text(rng).title(),
+            "date_of_birth": _random_date(rng, _FIRST_BIRTH_DATE, _LAST_BIRTH_DATE),
+            "gender": rng.choice(("Female", "Male")),
+        },
+    }
+
+    # Extra sections nested `metadata_depth` levels deep, with `metadata_width` fields per level
+    levels = []
+    for section in range(config.metadata_width):
+        node = metadata[f"section_{section}"] = {}
+        for depth in range(config.metadata_depth):
+            levels.append(node)
+            for field in range(config.metadata_width):
+                node[f"field_{field}"] = (
+                    _random_date(rng, _FIRST_DATE, _LAST_DATE) if field % 3 == 2
+                    else rng.randint(0, 10000) if field % 3 == 1 else _random_text(rng))
+            node["readings"] = [rng.randint(0, 100) for _ in range(config.metadata_width)]
+            if depth + 1 < config.metadata_depth:
+                node[f"level_{depth + 1}"] = {}
+                node = node[f"level_{depth + 1}"]
+    levels = levels or [metadata["test_metadata"]]
+    for key in range(config.sensitive_keys):
+        rng.choice(levels)[f"_private_{key}"] = _random_text(rng)
+    return metadata
+
+
+def main() -> None:
+    defaults = CohortConfig()
+    parser = argparse.ArgumentParser(description="Generate a synthetic participant cohort for load testing.")
+    parser.add_argument("-o", "--output", type=str, required=True, help="Directory the cohort is written to.")
+    parser.add_argument("-n", "--participants", type=int, required=True, help="Number of participants.")
+    parser.add_argument("--seed", type=int, default=0, help="Cohort seed (default: 0).")
+    parser.add_argument("--start", type=int, default=0, help="Index of the first participant (default: 0).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes, 0 for one per CPU (default: 1).")
+    for field in CohortConfig._fields:
+        default = getattr(defaults, field)
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default,
+                            help=f"See CohortConfig (default: {default}).")
+    args = parser.parse_args()
+
+    config = CohortConfig(**{field: getattr(args, field) for field in CohortConfig._fields})
+    try:
+        input_files = generate_cohort(
+            args.output, args.participants, config, args.seed, args.start, args.workers or os.cpu_count() or 1)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Generated {len(input_files)} participants, inputs in {os.path.join(args.output, 'inputs')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import stat
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+class SnapshotEntry(NamedTuple):
+    """
+    Cached information about a single directory entry.
+
+    Attributes:
+        name (str): The entry name (no directory component).
+        is_file (bool): Whether the entry is a regular file (symlinks are followed).
+        is_dir (bool): Whether the entry is a directory (symlinks are followed).
+        size (int): The size of the entry in bytes.
+        mtime (float): The modification time of the entry.
+        mtime_ns (int): The modification time of the entry in nanoseconds.
+    """
+    name: str
+    is_file: bool
+    is_dir: bool
+    size: int
+    mtime: float
+    mtime_ns: int = 0
+
+
+class DirectorySnapshot:
+    """
+    A cached, point-in-time listing of a single directory.
+
+    The directory is listed with one `os.scandir` pass and the type, size and modification time of every
+    entry are cached, so validation, extraction and later stages can query the same listing without
+    issuing further `listdir`/`stat` calls. This matters on network file systems where every stat is a
+    round trip.
+
+    Attributes:
+        path (str): The path of the directory that was scanned.
+        mtime (float): The modification time of the directory at scan time.
+        entries (Dict[str, SnapshotEntry]): The cached entries keyed by name.
+
+    Methods:
+        scan(path: str, dir_stat: os.stat_result = None) -> DirectorySnapshot:
+            Scans a directory and returns its snapshot.
+        files(extensions: Iterable[str] = None) -> List[str]:
+            Returns the sorted names of regular files, optionally filtered by extension.
+        entry(name: str) -> SnapshotEntry:
+            Returns the cached entry for a name.
+        file_path(name: str) -> str:
+            Returns the full path of an entry.
+    """
+
+    def __init__(self, path: str, mtime: float, entries: Dict[str, SnapshotEntry]) -> None:
+        """
+        Initialize the snapshot from already collected entries.
+
+        :param path: The path of the directory.
+        :type path: str
+        :param mtime: The modification time of the directory.
+        :type mtime: float
+        :param entries: The entries keyed by name.
+        :type entries: Dict[str, SnapshotEntry]
+        """
+        self.path = path
+        self.mtime = mtime
+        self.entries = entries
+
+    @classmethod
+    def scan(cls, path: str, dir_stat: Optional[os.stat_result] = None) -> "DirectorySnapshot":
+        """
+        Lists a directory once with `os.scandir` and caches every entry.
+
+        :param path: The path of the directory to scan.
+        :type path: str
+        :param dir_stat: An already obtained stat result of the directory, to avoid statting it again. (optional)
+        :type dir_stat: os.stat_result
+        :return: The snapshot of the directory.
+        :rtype: DirectorySnapshot
+        :raises FileNotFoundError: If the directory does not exist.
+        :raises NotADirectoryError: If the path is not a directory.
+        """
+        if dir_stat is None:
+            dir_stat = os.stat(path)
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            raise NotADirectoryError(f"Not a directory: {path}")
+
+        entries = {}
+        with os.scandir(path) as iterator:
+            for dir_entry in iterator:
+                try:
+                    # DirEntry caches its stat result, and follows symlinks like os.path.isfile does
+                    entry_stat = dir_entry.stat()
+                except OSError:
+                    # Dangling symlinks and entries removed during the scan are neither files nor directories
+                    entries[dir_entry.name] = SnapshotEntry(dir_entry.name, False, False, 0, 0.0)
+                    continue
+                entries[dir_entry.name] = SnapshotEntry(
+                    dir_entry.name,
+                    stat.S_ISREG(entry_stat.st_mode),
+                    stat.S_ISDIR(entry_stat.st_mode),
+                    entry_stat.st_size,
+                    entry_stat.st_mtime,
+                    entry_stat.st_mtime_ns,
+                )
+        return cls(path, dir_stat.st_mtime, entries)
+
+    def files(self, extensions: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Returns the sorted names of the regular files in the directory.
+
+        :param extensions: Only return files whose last extension is in this collection. (optional)
+        :type extensions: Iterable[str]
+        :return: The sorted list of file names.
+        :rtype: List[str]
+        """
+        if extensions is not None:
+            extensions = set(extensions)
+        return sorted(
+            name for name, entry in self.entries.items()
+            if entry.is_file and (extensions is None or name.split('.')[-1] in extensions)
+        )
+
+    def entry(self, name: str) -> SnapshotEntry:
+        """
+        Returns the cached entry for the given name.
+
+        :param name: The entry name.
+        :type name: str
+        :return: The cached entry.
+        :rtype: SnapshotEntry
+        :raises KeyError: If the entry was not present at scan time.
+        """
+        return self.entries[name]
+
+    def file_path(self, name: str) -> str:
+        """
+        Returns the full path of an entry in the directory.
+
+        :param name: The entry name.
+        :type name: str
+        :return: The path of the entry.
+        :rtype: str
+        """
+        return os.path.join(self.path, name)
+
+    def total_size(self) -> int:
+        """
+        Returns the total size in bytes of the regular files in the directory.
+
+        :rtype: int
+        """
+        return sum(entry.size for entry in self.entries.values() if entry.is_file)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,121 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from typing import Optional
+
+# inotify_init1 flags and the events that can make a new input file appear or complete
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_WATCHED_EVENTS = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """
+    Returns the C library if it provides inotify, otherwise None.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class DirectoryWatcher:
+    """
+    Waits for files to be created in or moved into a directory.
+
+    On Linux the directory is watched with inotify (through ctypes, without extra dependencies), so `wait`
+    returns as soon as a file is written. Elsewhere, or if inotify cannot be used (e.g. the watch limit is
+    reached), `wait` simply sleeps for the poll interval and the caller rescans the directory.
+
+    Attributes:
+        directory (str): The watched directory.
+        poll_interval (float): The number of seconds between two scans when polling.
+        uses_inotify (bool): Whether the directory is watched with inotify.
+
+    Methods:
+        wait(timeout: float = None) -> bool:
+            Waits for a change, returning whether the directory should be rescanned.
+        close() -> None:
+            Stops watching the directory.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 2.0, use_inotify: bool = True) -> None:
+        """
+        Initializes the DirectoryWatcher class.
+
+        :param directory: The directory to watch.
+        :type directory: str
+        :param poll_interval: The number of seconds between two scans when polling. (optional)
+        :type poll_interval: float
+        :param use_inotify: Use inotify where available. (optional)
+        :type use_inotify: bool
+        :raises ValueError: If the directory does not exist or the poll interval is not positive.
+        """
+        if not os.path.isdir(directory):
+            raise ValueError(f"Invalid watch directory: {directory} must be a directory.")
+        if poll_interval <= 0:
+            raise ValueError(f"The poll interval must be positive: {poll_interval}")
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._fd = None
+        libc = _load_inotify() if use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd >= 0 and libc.inotify_add_watch(fd, os.fsencode(directory), _WATCHED_EVENTS) >= 0:
+                self._fd = fd
+            elif fd >= 0:
+                os.close(fd)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until a file is written to the directory or the timeout expires.
+
+        :param timeout: The maximum number of seconds to wait, by default until a change (or, when polling,
+            the poll interval). (optional)
+        :type timeout: float
+        :return: True if the directory changed or may have changed (always when polling), False if the timeout
+            expired without a change.
+        :rtype: bool
+        """
+        if self._fd is None:
+            time.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+            return True
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # Drain the queued events, the caller rescans the directory anyway
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        """
+        Stops watching the directory.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
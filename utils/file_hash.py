@@ -0,0 +1,23 @@
+import hashlib
+
+# Read files in 1 MiB chunks so large DNA files are never held in memory just to be hashed
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Computes the SHA-256 content hash of a file.
+
+    :param file_path: The path of the file to hash.
+    :type file_path: str
+    :param chunk_size: The number of bytes read per chunk. (optional)
+    :type chunk_size: int
+    :return: The hexadecimal SHA-256 digest of the file contents.
+    :rtype: str
+    :raises FileNotFoundError: If the file does not exist.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
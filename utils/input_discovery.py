@@ -0,0 +1,74 @@
+import fnmatch
+import os
+import re
+from typing import Iterator, Optional
+
+DEFAULT_INCLUDE = "*.json"
+# Participant directories hold "*_dna.json" metadata files, so a recursive walk only picks up input files
+DEFAULT_RECURSIVE_INCLUDE = "*_input.json"
+
+
+def iter_input_files(
+        root: str, include: Optional[str] = None, match: Optional[str] = None,
+        recursive: bool = False) -> Iterator[str]:
+    """
+    Yields the input files of a directory while it is being listed.
+
+    The directories are listed with `os.scandir`, one at a time and depth first, and each matching file is
+    yielded as soon as its entry is read. The caller can start processing the first input files before the
+    rest of the tree is walked, and memory does not grow with the number of entries. The files are yielded
+    in directory order, not sorted. Symlinked directories are not followed, so links cannot cause cycles.
+    Subdirectories that disappear or cannot be listed during the walk are skipped, like `os.walk` does.
+
+    :param root: The directory to list.
+    :type root: str
+    :param include: A glob pattern the file names must match, by default `DEFAULT_INCLUDE`, or
+        `DEFAULT_RECURSIVE_INCLUDE` when listing the subdirectories too. (optional)
+    :type include: str
+    :param match: A regular expression searched in the path of each file relative to the root, with "/"
+        separators, e.g. "^2024-0[1-3]/". (optional)
+    :type match: str
+    :param recursive: List the subdirectories as well. (optional)
+    :type recursive: bool
+    :return: An iterator of the paths of the matching files.
+    :rtype: Iterator[str]
+    :raises FileNotFoundError: If the root directory does not exist.
+    :raises NotADirectoryError: If the root is not a directory.
+    :raises ValueError: If the regular expression is invalid.
+    """
+    try:
+        pattern = re.compile(match) if match is not None else None
+    except re.error as e:
+        raise ValueError(f"Invalid input path regular expression {match!r}: {e}")
+    if include is None:
+        include = DEFAULT_RECURSIVE_INCLUDE if recursive else DEFAULT_INCLUDE
+
+    # Directories still to list, with their path relative to the root
+    stack = [(root, "")]
+    while stack:
+        directory, relative = stack.pop()
+        subdirectories = []
+        try:
+            iterator = os.scandir(directory)
+        except OSError:
+            if directory is root:
+                raise
+            continue
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            subdirectories.append((entry.path, relative + entry.name + "/"))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if not fnmatch.fnmatchcase(entry.name, include):
+                    continue
+                if pattern is not None and not pattern.search(relative + entry.name):
+                    continue
+                yield entry.path
+        # Visit the subdirectories in listing order
+        stack.extend(reversed(subdirectories))
@@ -1,8 +1,10 @@
 import os
+import stat
 import uuid
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
+from utils.directory_snapshot import DirectorySnapshot
 
 
 class InputValidator:
@@ -22,7 +24,7 @@ class InputValidator:
         file_mapping (dict): A mapping of UUIDs to their associated file paths.
         files (list): List of files in the 'context_path' directory.
         current_uuid (str): The UUID extracted from the context_path and results_path.
-
+        snapshot (DirectorySnapshot): The cached listing of the context_path directory, shared with later stages.
 
     Methods:
         validate() -> dict:
@@ -31,7 +33,8 @@ class InputValidator:
 
     def __init__(
                 self, input_data: Dict, validate_extentions: List[str],
-                num_of_files: int = 0, LIMIT_FILES: bool = False) -> None:
+                num_of_files: int = 0, LIMIT_FILES: bool = False,
+                snapshot: Optional[DirectorySnapshot] = None) -> None:
         """
         Initialize the validator with the input data.
 
@@ -42,6 +45,8 @@ class InputValidator:
         :param num_of_files: The maximum number of files to validate for each UUID. (optional)
         :type num_of_files: int
         :param LIMIT_FILES: A boolean flag to limit the number of files to validate. (optional)
+        :param snapshot: An existing listing of the context_path directory to reuse instead of scanning. (optional)
+        :type snapshot: DirectorySnapshot
         """
 
         self.input_data = input_data
@@ -52,6 +57,8 @@ class InputValidator:
         self.files = []
         self.num_of_files = num_of_files
         self.LIMIT_FILES = LIMIT_FILES
+        self.snapshot = snapshot
+        self._context_stat = None
 
     def validate(self) -> None:
         """
@@ -178,21 +185,9 @@ class InputValidator:
         if not self.results_path:
             raise ValueError("results_path is empty.")
 
-        # Check if context_path exists
-        if not os.path.exists(self.context_path):
-            raise ValueError(f"Invalid context_path: {self.context_path} does not exist.")
-
-        # Check if context_path is a directory
-        if not os.path.isdir(self.context_path):
-            raise ValueError(f"Invalid context_path: {self.context_path} must be a directory.")
-
-        # Check if results_path exists
-        if not os.path.exists(self.results_path):
-            raise ValueError(f"Invalid results_path: {self.results_path} does not exist.")
-
-        # Check if results_path is a directory
-        if not os.path.isdir(self.results_path):
-            raise ValueError(f"Invalid results_path: {self.results_path} must be a directory.")
+        # Check that both paths exist and are directories, with a single stat call each
+        self._context_stat = self._stat_directory(self.context_path, "context_path")
+        self._stat_directory(self.results_path, "results_path")
 
         # Validate the structure of context_path
         context_path_parts = Path(self.context_path).parts
@@ -209,6 +204,44 @@ class InputValidator:
                             f"Invalid results_path structure: {self.results_path}. "
                             f"It must have a UUID as the grandparent directory and 'out' as the parent directory.")
 
+    def _stat_directory(self, path: str, label: str) -> os.stat_result:
+        """
+        Stat a path once and check that it is an existing directory.
+
+        :param path: The path to check.
+        :type path: str
+        :param label: The name of the input key the path came from, used in error messages.
+        :type label: str
+        :return: The stat result of the directory.
+        :rtype: os.stat_result
+        :raises ValueError: If the path does not exist or is not a directory.
+        """
+        try:
+            path_stat = os.stat(path)
+        except OSError:
+            raise ValueError(f"Invalid {label}: {path} does not exist.")
+        if not stat.S_ISDIR(path_stat.st_mode):
+            raise ValueError(f"Invalid {label}: {path} must be a directory.")
+        return path_stat
+
+    def _scan_context_path(self) -> DirectorySnapshot:
+        """
+        Return the listing of the context_path directory, scanning it only if no snapshot of that directory
+        exists yet. A given snapshot of another directory (e.g. the input's context_path changed since the
+        manifest listed it) is replaced.
+
+        :return: The snapshot of the context_path directory.
+        :rtype: DirectorySnapshot
+        :raises ValueError: If the context_path directory cannot be listed.
+        """
+        # The snapshot path is either the context_path as given in the input or its resolved form
+        if self.snapshot is None or self.snapshot.path not in (self.context_path, self.input_data["context_path"]):
+            try:
+                self.snapshot = DirectorySnapshot.scan(self.context_path, self._context_stat)
+            except OSError as e:
+                raise ValueError(f"Invalid context_path: {self.context_path} cannot be listed: {e}")
+        return self.snapshot
+
     def _validate_files(self):
         """
         Validate files in the context_path and organize them by UUID.
@@ -236,11 +269,8 @@ class InputValidator:
         Raises:
             ValueError: If the context_path directory is empty
         """
-        # List all files in the context_path directory that have valid extensions
-        self.files = [
-            f for f in os.listdir(self.context_path)
-            if os.path.isfile(os.path.join(self.context_path, f))
-        ]
+        # List all files in the context_path directory from the cached snapshot
+        self.files = self._scan_context_path().files()
         # Raise an error if there are no files in the context_path directory
         if not self.files:
             raise ValueError(f"The context_path directory is empty: {self.context_path}")
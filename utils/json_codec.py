@@ -0,0 +1,187 @@
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+
+class JsonCodec(ABC):
+    """
+    Abstract Base Class for JSON codecs.
+
+    A codec converts between Python objects and JSON documents. All codecs work on bytes so callers can
+    read and write files in binary mode and skip the intermediate str decode/encode round trip.
+
+    Attributes:
+        name (str): The short name of the codec backend (e.g. "orjson" or "json").
+
+    Methods:
+        loads(data: Union[bytes, str]) -> Any:
+            Parses a JSON document.
+        dumps(obj: Any, indent: bool = False) -> bytes:
+            Serializes an object to a JSON document.
+        load_file(file_path: str) -> Any:
+            Reads and parses a JSON file.
+        dump_file(obj: Any, file_path: str, indent: bool = False) -> None:
+            Serializes an object and writes it to a JSON file.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Parses a JSON document.
+
+        :param data: The JSON document as bytes or str.
+        :type data: Union[bytes, str]
+        :return: The parsed Python object.
+        :raises json.JSONDecodeError: If the document is not valid JSON.
+        """
+        pass
+
+    @abstractmethod
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        """
+        Serializes an object to a JSON document.
+
+        :param obj: The object to serialize.
+        :param indent: Whether to pretty-print the document.
+        :type indent: bool
+        :return: The UTF-8 encoded JSON document.
+        :rtype: bytes
+        """
+        pass
+
+    def load_file(self, file_path: str) -> Any:
+        """
+        Reads a JSON file in binary mode and parses it.
+
+        :param file_path: The path of the JSON file.
+        :type file_path: str
+        :return: The parsed Python object.
+        :raises FileNotFoundError: If the file does not exist.
+        :raises json.JSONDecodeError: If the file is not valid JSON.
+        """
+        with open(file_path, "rb") as file:
+            return self.loads(file.read())
+
+    def dump_file(self, obj: Any, file_path: str, indent: bool = False) -> None:
+        """
+        Serializes an object and writes it to a file in binary mode.
+
+        :param obj: The object to serialize.
+        :param file_path: The path of the output file.
+        :type file_path: str
+        :param indent: Whether to pretty-print the document.
+        :type indent: bool
+        """
+        data = self.dumps(obj, indent=indent)
+        with open(file_path, "wb") as file:
+            file.write(data)
+
+
+class StdlibJsonCodec(JsonCodec):
+    """
+    JSON codec backed by the standard library `json` module. Always available.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=4 if indent else None).encode("utf-8")
+
+
+# Integers of 19 digits or more may not fit the 64 bits orjson supports, and some versions silently read them as
+# floats. Documents with such a run of digits anywhere (even in a string) are parsed with the standard library.
+_LONG_DIGITS = re.compile(rb"\d{19}")
+_LONG_DIGITS_STR = re.compile(r"\d{19}")
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    JSON codec backed by `orjson`. Only usable when `orjson` is importable.
+
+    orjson only speeds up parsing, and it must read exactly what the standard library codec reads. orjson
+    rejects some valid documents that `json` accepts (nesting deeper than 255 levels, NaN and Infinity, lone
+    surrogates): those are parsed again with `json`, which also raises the usual error for invalid JSON.
+    Integers beyond 64 bits may be read as floats instead of failing, so documents that could hold one are
+    parsed with `json` directly. Documents are serialized by the standard library codec, because orjson can
+    neither indent by four spaces nor escape non-ASCII characters, so the output files stay byte for byte the
+    same whichever codec is installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+        self._stdlib = StdlibJsonCodec()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        long_digits = _LONG_DIGITS if isinstance(data, (bytes, bytearray)) else _LONG_DIGITS_STR
+        if long_digits.search(data):
+            return self._stdlib.loads(data)
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            return self._stdlib.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        return self._stdlib.dumps(obj, indent=indent)
+
+
+# Backends in order of preference
+_CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    StdlibJsonCodec.name: StdlibJsonCodec,
+}
+
+# Environment variable that forces a specific backend (e.g. "json")
+CODEC_ENV_VAR = "ETL_JSON_CODEC"
+
+_default_codec: Optional[JsonCodec] = None
+
+
+def create_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    Creates a JSON codec.
+
+    When no name is given the fastest importable backend is chosen, falling back to the standard library.
+
+    :param name: The backend name ("orjson" or "json"), or None to auto-select.
+    :type name: Optional[str]
+    :return: A codec instance.
+    :rtype: JsonCodec
+    :raises ValueError: If the backend name is unknown.
+    :raises ImportError: If the requested backend is not installed.
+    """
+    if name is not None:
+        if name not in _CODECS:
+            raise ValueError(f"Unsupported JSON codec: {name}")
+        return _CODECS[name]()
+
+    for codec_class in _CODECS.values():
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+    return StdlibJsonCodec()
+
+
+def get_codec() -> JsonCodec:
+    """
+    Returns the process-wide default codec, creating it on first use.
+
+    The backend can be forced through the `ETL_JSON_CODEC` environment variable.
+
+    :return: The default codec.
+    :rtype: JsonCodec
+    """
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = create_codec(os.environ.get(CODEC_ENV_VAR) or None)
+    return _default_codec
@@ -0,0 +1,393 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from utils.directory_snapshot import DirectorySnapshot, SnapshotEntry
+from utils.file_hash import file_sha256
+from utils.json_codec import get_codec
+
+# Directories modified this recently may still change within the same mtime tick,
+# so they are recorded as stale and rescanned on the next refresh.
+RACY_WINDOW_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inputs (
+    input_file TEXT PRIMARY KEY,
+    inputs_dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    context_path TEXT,
+    results_path TEXT
+);
+CREATE INDEX IF NOT EXISTS inputs_by_dir ON inputs (inputs_dir);
+CREATE TABLE IF NOT EXISTS participants (
+    context_path TEXT PRIMARY KEY,
+    participant_id TEXT NOT NULL,
+    dir_mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS participants_by_id ON participants (participant_id);
+CREATE TABLE IF NOT EXISTS files (
+    context_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (context_path, name)
+);
+"""
+
+
+class FileRecord(NamedTuple):
+    """
+    A participant file as recorded in the manifest.
+
+    Attributes:
+        name (str): The file name.
+        size (int): The file size in bytes.
+        mtime_ns (int): The file modification time in nanoseconds.
+        sha256 (Optional[str]): The SHA-256 content hash, or None if hashing was disabled.
+    """
+    name: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str]
+
+
+class ParticipantRecord(NamedTuple):
+    """
+    A participant directory as recorded in the manifest.
+
+    Attributes:
+        participant_id (str): The participant UUID (the context directory name).
+        context_path (str): The context path exactly as given in the input JSON.
+        dir_mtime_ns (int): The directory modification time at the last scan.
+        files (List[FileRecord]): The regular files in the directory, sorted by name.
+    """
+    participant_id: str
+    context_path: str
+    dir_mtime_ns: int
+    files: List[FileRecord]
+
+
+class ParticipantManifest:
+    """
+    A persistent SQLite index of input files and participant directories.
+
+    The manifest maps every input JSON to its participant and every participant UUID to its context path
+    and files (sizes, mtimes and content hashes). It is built once and then refreshed incrementally:
+    a directory is only listed again when its modification time changed since the previous refresh, so
+    repeated batch runs do not walk every participant directory.
+
+    Files replaced in place without a directory change (e.g. rewritten rather than renamed into place)
+    are only listed again by a full refresh, but `file_hashes` stats every file before trusting its hash.
+
+    A manifest can be used from several threads, e.g. from the thread pool of the asyncio pipeline: its
+    database accesses are serialized.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+
+    Methods:
+        refresh(inputs_dir: str, hash_files: bool = True, full: bool = False) -> Dict[str, int]:
+            Brings the manifest up to date with an inputs directory and its participants.
+        input_files(inputs_dir: str) -> List[str]:
+            Returns the input JSON files recorded for an inputs directory.
+        participant(participant_id: str) -> Optional[ParticipantRecord]:
+            Returns the record of a participant.
+        snapshot(context_path: str) -> Optional[DirectorySnapshot]:
+            Returns a directory snapshot built from the manifest if the directory is unchanged.
+        snapshot_for_input(input_file: str) -> Optional[DirectorySnapshot]:
+            Returns the snapshot of the participant an input file points to.
+        file_hashes(context_path: str) -> Dict[str, str]:
+            Returns the recorded content hashes of a participant's files.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Open (and create if needed) the manifest database.
+
+        :param db_path: The path of the SQLite database file.
+        :type db_path: str
+        """
+        self.db_path = db_path
+        # The connection is shared by the threads using the manifest, one at a time under the lock
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "ParticipantManifest":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def refresh(self, inputs_dir: str, hash_files: bool = True, full: bool = False) -> Dict[str, int]:
+        """
+        Bring the manifest up to date with an inputs directory and the participant directories it references.
+
+        The inputs directory and each participant directory are only listed again when their modification
+        time changed. Content hashes are only recomputed for files whose size or mtime changed.
+
+        :param inputs_dir: The directory containing input JSON files.
+        :type inputs_dir: str
+        :param hash_files: Whether to compute content hashes of participant files. (optional)
+        :type hash_files: bool
+        :param full: Rescan every directory regardless of its modification time. (optional)
+        :type full: bool
+        :return: Counters of the work done: "inputs_scanned", "participants_scanned" and "files_hashed".
+        :rtype: Dict[str, int]
+        :raises FileNotFoundError: If the inputs directory does not exist.
+        """
+        inputs_dir = os.path.abspath(inputs_dir)
+        counters = {"inputs_scanned": 0, "participants_scanned": 0, "files_hashed": 0}
+
+        with self._lock, self._connection:
+            if self._refresh_inputs(inputs_dir, full):
+                counters["inputs_scanned"] = 1
+
+            context_paths = [
+                row[0] for row in self._connection.execute(
+                    "SELECT DISTINCT context_path FROM inputs WHERE inputs_dir = ? AND context_path IS NOT NULL",
+                    (inputs_dir,))
+            ]
+            for context_path in context_paths:
+                files_hashed = self._refresh_participant(context_path, hash_files, full)
+                if files_hashed is not None:
+                    counters["participants_scanned"] += 1
+                    counters["files_hashed"] += files_hashed
+
+        return counters
+
+    def input_files(self, inputs_dir: str) -> List[str]:
+        """
+        Return the input JSON files recorded for an inputs directory, sorted by path.
+
+        :param inputs_dir: The directory containing input JSON files.
+        :type inputs_dir: str
+        :return: The absolute paths of the input files.
+        :rtype: List[str]
+        """
+        rows = self._fetch(
+            "SELECT input_file FROM inputs WHERE inputs_dir = ? ORDER BY input_file", (os.path.abspath(inputs_dir),))
+        return [row[0] for row in rows]
+
+    def participant(self, participant_id: str) -> Optional[ParticipantRecord]:
+        """
+        Return the record of a participant.
+
+        :param participant_id: The participant UUID.
+        :type participant_id: str
+        :return: The participant record, or None if the participant is unknown.
+        :rtype: Optional[ParticipantRecord]
+        """
+        rows = self._fetch(
+            "SELECT context_path, dir_mtime_ns FROM participants WHERE participant_id = ?", (participant_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        return ParticipantRecord(participant_id, row[0], row[1], self._files(row[0]))
+
+    def snapshot(self, context_path: str) -> Optional[DirectorySnapshot]:
+        """
+        Return a directory snapshot of a participant built from the manifest, without listing the directory.
+
+        The directory is statted once to make sure it did not change since it was recorded.
+
+        :param context_path: The context path exactly as given in the input JSON.
+        :type context_path: str
+        :return: The snapshot, or None if the directory is unknown or changed since the last refresh.
+        :rtype: Optional[DirectorySnapshot]
+        """
+        rows = self._fetch("SELECT dir_mtime_ns FROM participants WHERE context_path = ?", (context_path,))
+        if not rows:
+            return None
+        try:
+            dir_stat = os.stat(context_path)
+        except OSError:
+            return None
+        if dir_stat.st_mtime_ns != rows[0][0]:
+            return None
+
+        entries = {
+            record.name: SnapshotEntry(record.name, True, False, record.size, record.mtime_ns / 1e9, record.mtime_ns)
+            for record in self._files(context_path)
+        }
+        return DirectorySnapshot(context_path, dir_stat.st_mtime, entries)
+
+    def snapshot_for_input(self, input_file: str) -> Optional[DirectorySnapshot]:
+        """
+        Return the snapshot of the participant directory referenced by an input file.
+
+        :param input_file: The path of the input JSON file.
+        :type input_file: str
+        :return: The snapshot, or None if the input or its participant is unknown or changed.
+        :rtype: Optional[DirectorySnapshot]
+        """
+        rows = self._fetch("SELECT context_path FROM inputs WHERE input_file = ?", (os.path.abspath(input_file),))
+        if not rows or rows[0][0] is None:
+            return None
+        return self.snapshot(rows[0][0])
+
+    def file_hashes(self, context_path: str) -> Dict[str, str]:
+        """
+        Return the recorded content hashes of a participant directory's files that are still current.
+
+        Rewriting a file in place does not change the modification time of its directory, so each file is
+        statted and its hash is only returned if its size and modification time match the record. The
+        caller hashes the other files itself.
+
+        :param context_path: The context path exactly as given in the input JSON.
+        :type context_path: str
+        :return: The SHA-256 hashes keyed by file name, for the files that were hashed and did not change.
+        :rtype: Dict[str, str]
+        """
+        file_hashes = {}
+        for record in self._files(context_path):
+            if not record.sha256:
+                continue
+            try:
+                file_stat = os.stat(os.path.join(context_path, record.name))
+            except OSError:
+                continue
+            if (file_stat.st_size, file_stat.st_mtime_ns) == (record.size, record.mtime_ns):
+                file_hashes[record.name] = record.sha256
+        return file_hashes
+
+    def _files(self, context_path: str) -> List[FileRecord]:
+        """
+        Return the recorded files of a participant directory, sorted by name.
+        """
+        rows = self._fetch(
+            "SELECT name, size, mtime_ns, sha256 FROM files WHERE context_path = ? ORDER BY name", (context_path,))
+        return [FileRecord(*row) for row in rows]
+
+    def _fetch(self, query: str, parameters: tuple) -> List[tuple]:
+        """
+        Run a query under the lock and return all its rows.
+        """
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def _recorded_mtime(self, dir_stat: os.stat_result) -> int:
+        """
+        Return the mtime to record for a directory, or -1 if it is too recent to be trusted.
+        """
+        if time.time() - dir_stat.st_mtime < RACY_WINDOW_SECONDS:
+            return -1
+        return dir_stat.st_mtime_ns
+
+    def _refresh_inputs(self, inputs_dir: str, full: bool) -> bool:
+        """
+        Re-list the inputs directory if it changed and reconcile the recorded input files.
+
+        :return: True if the directory was listed, False if the recorded listing was still current.
+        """
+        dir_stat = os.stat(inputs_dir)
+        row = self._connection.execute(
+            "SELECT mtime_ns FROM directories WHERE path = ?", (inputs_dir,)).fetchone()
+        if not full and row is not None and row[0] == dir_stat.st_mtime_ns:
+            return False
+
+        recorded = {
+            input_file: (size, mtime_ns) for input_file, size, mtime_ns in self._connection.execute(
+                "SELECT input_file, size, mtime_ns FROM inputs WHERE inputs_dir = ?", (inputs_dir,))
+        }
+
+        snapshot = DirectorySnapshot.scan(inputs_dir, dir_stat)
+        current = set()
+        for name in snapshot.files(["json"]):
+            input_file = snapshot.file_path(name)
+            current.add(input_file)
+            entry = snapshot.entry(name)
+            mtime_ns = entry.mtime_ns
+            if recorded.get(input_file) == (entry.size, mtime_ns):
+                continue
+            context_path, results_path = self._read_input_paths(input_file)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO inputs VALUES (?, ?, ?, ?, ?, ?)",
+                (input_file, inputs_dir, entry.size, mtime_ns, context_path, results_path))
+
+        removed = [(input_file,) for input_file in recorded if input_file not in current]
+        self._connection.executemany("DELETE FROM inputs WHERE input_file = ?", removed)
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?)", (inputs_dir, self._recorded_mtime(dir_stat)))
+        return True
+
+    def _read_input_paths(self, input_file: str):
+        """
+        Read the context and results paths from an input file.
+
+        Invalid input files are still recorded, with no paths, so that batch runs report them.
+
+        :return: A tuple of (context_path, results_path), each None if missing or invalid.
+        """
+        try:
+            data = get_codec().load_file(input_file)
+        except (OSError, ValueError):
+            return None, None
+        if not isinstance(data, dict):
+            return None, None
+        context_path = data.get("context_path")
+        results_path = data.get("results_path")
+        return (
+            context_path if isinstance(context_path, str) and context_path else None,
+            results_path if isinstance(results_path, str) and results_path else None,
+        )
+
+    def _refresh_participant(self, context_path: str, hash_files: bool, full: bool) -> Optional[int]:
+        """
+        Re-list a participant directory if it changed and reconcile its recorded files.
+
+        :return: The number of files hashed, or None if the recorded listing was still current.
+        """
+        try:
+            dir_stat = os.stat(context_path)
+            row = self._connection.execute(
+                "SELECT dir_mtime_ns FROM participants WHERE context_path = ?", (context_path,)).fetchone()
+            if not full and row is not None and row[0] == dir_stat.st_mtime_ns:
+                return None
+            snapshot = DirectorySnapshot.scan(context_path, dir_stat)
+        except OSError:
+            # The directory disappeared or is not a directory, forget it
+            self._connection.execute("DELETE FROM participants WHERE context_path = ?", (context_path,))
+            self._connection.execute("DELETE FROM files WHERE context_path = ?", (context_path,))
+            return 0
+
+        recorded = {record.name: record for record in self._files(context_path)}
+        files_hashed = 0
+        rows = []
+        for name in snapshot.files():
+            entry = snapshot.entry(name)
+            mtime_ns = entry.mtime_ns
+            previous = recorded.get(name)
+            if previous is not None and (previous.size, previous.mtime_ns) == (entry.size, mtime_ns) \
+                    and (previous.sha256 is not None or not hash_files):
+                sha256 = previous.sha256
+            elif hash_files:
+                sha256 = file_sha256(snapshot.file_path(name))
+                files_hashed += 1
+            else:
+                sha256 = None
+            rows.append((context_path, name, entry.size, mtime_ns, sha256))
+
+        self._connection.execute("DELETE FROM files WHERE context_path = ?", (context_path,))
+        self._connection.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)", rows)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO participants VALUES (?, ?, ?)",
+            (context_path, Path(context_path).name, self._recorded_mtime(dir_stat)))
+        return files_hashed